@@ -1,9 +1,14 @@
 import numpy as np
+import sys
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 import os
 
+# Forward file reader lives with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForwardArray
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 22.0
@@ -24,12 +29,12 @@ labels = ["$Q = 10^4$", "$Q = 10^5$", "$Q = 10^6$", "$Q = 10^7$"]
 colors = ["C%d" % ii for ii in range(len(tides_50_dirs))]
 
 # Extract data
-notides = np.genfromtxt(os.path.join(path,"NoTides","notides.secondary.forward"))
+notides = readForwardArray(os.path.join(path,"NoTides","notides.secondary.forward"))
 
 tides_50 = []
 
 for direct in tides_50_dirs:
-    tides_50.append(np.genfromtxt(os.path.join(path,direct,"tides.secondary.forward")))
+    tides_50.append(readForwardArray(os.path.join(path,direct,"tides.secondary.forward")))
 
 # Path to sim results
 cplDir = "../Sims/StellarTidalExample/CPL"
@@ -41,8 +46,8 @@ ctlLock = 3.126642e+07
 
 # Load data
 # saOutputOrder	Time -TotEn -TotAngMom -Semim -Radius -RotPer Ecce -RotRate -MeanMotion -OrbPer RadGyra -SurfEnFluxTotal
-cpl = np.genfromtxt(os.path.join(cplDir,"bintide.secondary.forward"))
-ctl = np.genfromtxt(os.path.join(ctlDir,"bintide.secondary.forward"))
+cpl = readForwardArray(os.path.join(cplDir,"bintide.secondary.forward"))
+ctl = readForwardArray(os.path.join(ctlDir,"bintide.secondary.forward"))
 
 fig = plt.figure(figsize=(19,6))
 gs = GridSpec(1, 5, width_ratios=[1, 0.01, 1, 0.2, 1])
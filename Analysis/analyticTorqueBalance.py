@@ -12,7 +12,7 @@ import os
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
-from scipy.optimize import fsolve
+from torqueBalance import ctlMatt2015
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 22.0
@@ -21,56 +21,12 @@ mpl.rcParams['font.size'] = 22.0
 mpl.rc('font',**{'family':'serif'})
 mpl.rc('text', usetex=True)
 
-DAYSEC = 86400.0 # Number of seconds in a day
-
-def ctlMatt2015Obj(Prot, Porb, k2Tau):
-    """
-    CTL, Matt+2015 torque balance with Matt+2019 T0 correction
-    """
-
-    return (Prot**3 / Porb**5) * (1.0 - Porb/Prot) - 4.96e-16/k2Tau
-# end function
-
-
-def ctlMatt2015(Porb, logK2Tau):
-    """
-    Solve for the Prot such that dw/dt_tides + dw/dt_mg = 0
-
-    Parameters
-    ----------
-    Porb : float
-        Orbital period [d]
-    logK2Tau : float
-        log10(tidal time lag in s multipled by the Love number of degree 2, k2)
-
-    Returns
-    -------
-    Prot : float
-        rotation period [d] such that
-    """
-
-    # Convert Porb from [d] to [s]
-    Pb = Porb*DAYSEC
-
-    # Unlog k2Tau
-    k2Tau = 10**logK2Tau
-
-    # Solve assuming Porb as the initial guess
-    Pr = fsolve(ctlMatt2015Obj, Pb, args=(Pb, k2Tau))[0]
-
-    # Return Prot in [d]
-    return Pr/DAYSEC
-# end function
-
 nbins = 50
 logK2Taus = np.log10(0.5 * np.logspace(-1.8, -0.3, nbins))[::-1]
 Porbs = np.linspace(15, 80, nbins)
-res = np.zeros((nbins, nbins)) # = Prot/Peq
 
-for ii in range(nbins):
-    for jj in range(nbins):
-        # Since e = 0, psi = 0, Peq = Porb in CTL model
-        res[ii, jj] = ctlMatt2015(Porbs[ii], logK2Taus[jj])/Porbs[ii]
+# Solve the whole grid at once. Since e = 0, psi = 0, Peq = Porb in CTL model
+res = ctlMatt2015(Porbs[:,None], logK2Taus[None,:])/Porbs[:,None] # = Prot/Peq
 
 # Plot!
 fig, ax = plt.subplots()
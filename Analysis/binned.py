@@ -0,0 +1,140 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Statistics of ensemble quantities in joint 2D bins, e.g. the median Peq/Prot
+in every Porb/ecc bin.  Every row is assigned to its bin once, then counts and
+means come from np.bincount and medians and percentiles from a single sort by
+(bin, value), so all bins cost O(N log N) instead of one pass over the whole
+table per bin.
+
+Bins follow the masks the plotting scripts used to build by hand: row values
+must lie strictly between a bin's edges, so values on an edge, or outside the
+edges, belong to no bin.  Edges may be increasing or decreasing.  Empty bins
+give NaN, and rows whose value is NaN or infinite are ignored.
+
+    bins = Binned2D(cpl["Final_Porb"], cpl["Final_Ecc"], porbBinEdges, eccBinEdges)
+    ratio = cpl["Final_Peq"]/cpl["Pri_ProtFinal"]
+    med = bins.median(ratio) # (len(porbBinEdges)-1, len(eccBinEdges)-1)
+    down, up = bins.percentile(ratio, [16, 84])
+
+"""
+
+import numpy as np
+
+
+def binIndex(values, edges):
+    """
+    Bin number of each value, -1 for values on or outside the edges
+    """
+
+    values = np.asarray(values, dtype=float)
+    edges = np.asarray(edges, dtype=float)
+
+    # Decreasing edges are increasing ones for -values
+    if edges[-1] < edges[0]:
+        values = -values
+        edges = -edges
+
+    index = np.searchsorted(edges, values, side="left") - 1
+    inside = (index >= 0) & (index < len(edges) - 1)
+    inside[inside] = values[inside] > edges[index[inside]]
+    inside[inside] = values[inside] < edges[index[inside] + 1]
+
+    return np.where(inside, index, -1)
+# end function
+
+
+class Binned2D(object):
+    """
+    Rows of a table binned on two quantities, x (first axis of every result)
+    and y (second axis)
+    """
+
+    def __init__(self, x, y, xEdges, yEdges):
+        ii = binIndex(x, xEdges)
+        jj = binIndex(y, yEdges)
+
+        self.shape = (len(xEdges) - 1, len(yEdges) - 1)
+        self.bins = np.where((ii >= 0) & (jj >= 0), ii*self.shape[1] + jj, -1)
+
+    def _rows(self, values):
+        """
+        Bin and value of every row in a bin with a finite value
+        """
+
+        values = np.asarray(values, dtype=float)
+        keep = (self.bins >= 0) & np.isfinite(values)
+        return self.bins[keep], values[keep]
+
+    def count(self, values=None):
+        """
+        Number of rows in each bin, only counting rows with finite values if
+        values are given
+        """
+
+        if values is None:
+            bins = self.bins[self.bins >= 0]
+        else:
+            bins = self._rows(values)[0]
+
+        size = self.shape[0]*self.shape[1]
+        return np.bincount(bins, minlength=size).reshape(self.shape)
+
+    def mean(self, values):
+        """
+        Mean of values in each bin
+        """
+
+        bins, values = self._rows(values)
+        size = self.shape[0]*self.shape[1]
+        counts = np.bincount(bins, minlength=size)
+        sums = np.bincount(bins, weights=values, minlength=size)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums/counts, np.nan).reshape(self.shape)
+
+    def percentile(self, values, q):
+        """
+        q-th percentile(s) of values in each bin, interpolated linearly
+        between order statistics as np.percentile does.  For a sequence of q,
+        the result has a leading axis over q.
+        """
+
+        bins, values = self._rows(values)
+        size = self.shape[0]*self.shape[1]
+
+        # Sort by bin, then by value within each bin
+        order = np.lexsort((values, bins))
+        values = values[order]
+        counts = np.bincount(bins, minlength=size)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        result = np.full((len(qs), size), np.nan)
+        full = counts > 0
+        for kk, qq in enumerate(qs):
+            # Fractional position of the percentile within each bin
+            pos = qq/100.0*(counts[full] - 1)
+            lo = np.floor(pos).astype(int)
+            hi = np.minimum(lo + 1, counts[full] - 1)
+            v0 = values[starts[full] + lo]
+            v1 = values[starts[full] + hi]
+            result[kk, full] = v0 + (pos - lo)*(v1 - v0)
+
+        result = result.reshape((len(qs),) + self.shape)
+        return result[0] if np.ndim(q) == 0 else result
+
+    def median(self, values):
+        """
+        Median of values in each bin
+        """
+        return self.percentile(values, 50)
+
+    def members(self, ii, jj):
+        """
+        Row numbers in bin (ii, jj)
+        """
+        return np.nonzero(self.bins == ii*self.shape[1] + jj)[0]
+# end class
@@ -0,0 +1,220 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Bootstrap confidence intervals for ensemble statistics, e.g. the fraction of
+tidally locked binaries or the median Peq/Prot in each Porb/ecc bin.
+
+Rather than building B resampled tables, each resample is represented by how
+many times it draws each row, and a batch of resamples is a (batch, rows)
+array of those counts.  Statistics are written as functions of that array, so
+a whole batch is evaluated with a few array operations: fractions are matrix
+products, and binned means and percentiles reuse a single sort of the rows by
+(bin, value), see binned.py.  Batches can be spread over worker processes.
+Every batch draws from its own seeded stream, so the results depend only on
+the seed, not on the number of workers.
+
+    samples = bootstrap(fraction(cpl["Locked"]), len(cpl), num=1000, seed=42)
+    low, high = confidence(samples)
+
+"""
+
+import numpy as np
+import multiprocessing as mp
+
+
+def resampleCounts(n, size, rng):
+    """
+    (size, n) array of how many times each of n rows is drawn in each of size
+    bootstrap resamples
+    """
+
+    draws = rng.integers(0, n, size=(size, n)) + n*np.arange(size)[:,None]
+    return np.bincount(draws.ravel(), minlength=size*n).reshape(size, n)
+# end function
+
+
+def fraction(mask, among=None):
+    """
+    Statistic: fraction of rows where mask is True, out of all rows or out of
+    the rows where among is True
+    """
+
+    mask = np.asarray(mask, dtype=bool)
+    if among is None:
+        among = np.ones_like(mask)
+    among = np.asarray(among, dtype=bool)
+    selected = (mask & among).astype(float)
+    among = among.astype(float)
+
+    def statFn(counts):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (counts @ selected)/(counts @ among)
+    # end function
+
+    return statFn
+# end function
+
+
+def _sortedRows(binned, values):
+    """
+    Rows of a binned.Binned2D with finite values, sorted by (bin, value), and
+    where each bin's rows start and stop in that order
+    """
+
+    values = np.asarray(values, dtype=float)
+    rows = np.nonzero((binned.bins >= 0) & np.isfinite(values))[0]
+    rows = rows[np.lexsort((values[rows], binned.bins[rows]))]
+
+    size = binned.shape[0]*binned.shape[1]
+    stops = np.cumsum(np.bincount(binned.bins[rows], minlength=size))
+    starts = stops - np.bincount(binned.bins[rows], minlength=size)
+
+    return rows, values[rows], starts, stops
+# end function
+
+
+def binnedMean(binned, values):
+    """
+    Statistic: mean of values in each bin of a binned.Binned2D, NaN for bins a
+    resample leaves empty
+    """
+
+    rows, values, starts, stops = _sortedRows(binned, values)
+    full = stops > starts
+
+    def statFn(counts):
+        counts = counts[:,rows]
+        result = np.full((len(counts), len(starts)), np.nan)
+        if np.any(full):
+            totals = np.add.reduceat(counts, starts[full], axis=1)
+            sums = np.add.reduceat(counts*values, starts[full], axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[:,full] = np.where(totals > 0, sums/totals, np.nan)
+        return result.reshape((len(counts),) + binned.shape)
+    # end function
+
+    return statFn
+# end function
+
+
+def binnedPercentile(binned, values, q):
+    """
+    Statistic: q-th percentile(s) of values in each bin of a binned.Binned2D,
+    interpolated as np.percentile does, NaN for bins a resample leaves empty.
+    For a sequence of q, results have an axis over q after the resample axis.
+    """
+
+    rows, values, starts, stops = _sortedRows(binned, values)
+    qs = np.atleast_1d(np.asarray(q, dtype=float))
+
+    def statFn(counts):
+        counts = counts[:,rows]
+        num, width = counts.shape[0], counts.shape[1] + 1
+
+        # Cumulative draws before each sorted row, offset so every resample's
+        # run is increasing and separate from the others
+        cum = np.zeros((num, width))
+        np.cumsum(counts, axis=1, out=cum[:,1:])
+        offset = (np.arange(num)*(cum[:,-1].max() + 1.0))[:,None]
+        flat = (cum + offset).ravel()
+
+        # Draws before and within each bin
+        before = cum[:,starts]
+        total = cum[:,stops] - before
+
+        result = np.full((num, len(qs), len(starts)), np.nan)
+        full = total > 0
+        for kk, qq in enumerate(qs):
+            pos = qq/100.0*(total - 1)
+            lo = np.floor(pos)
+            hi = np.minimum(lo + 1, total - 1)
+
+            # Row holding the k-th draw of a bin: the last whose cumulative
+            # draws don't exceed it
+            def orderStat(k):
+                index = np.searchsorted(flat, (offset + before + k).ravel(), side="right") - 1
+                index = index.reshape(k.shape) - np.arange(num)[:,None]*width
+                return values[np.clip(index, 0, len(values) - 1)]
+            # end function
+
+            v0 = orderStat(lo)
+            v1 = orderStat(hi)
+            result[:,kk] = np.where(full, v0 + (pos - lo)*(v1 - v0), np.nan)
+
+        result = result.reshape((num, len(qs)) + binned.shape)
+        return result[:,0] if np.ndim(q) == 0 else result
+    # end function
+
+    return statFn
+# end function
+
+
+# Statistic and resample settings inherited by forked workers
+_job = {}
+
+
+def _runBatch(batch):
+    """
+    Evaluate the statistic on one batch of resamples
+    """
+
+    n, num, size, seed, statFn = (_job[key] for key in ("n", "num", "size", "seed", "statFn"))
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(batch,)))
+    return statFn(resampleCounts(n, min(size, num - batch*size), rng))
+# end function
+
+
+def bootstrap(statFn, n, num=1000, seed=None, batch=100, workers=1):
+    """
+    Bootstrap distribution of a statistic.
+
+    Parameters
+    ----------
+    statFn : callable
+        statFn(counts) returns the statistic for each resample in a batch,
+        given (resamples, n) counts of how often each row is drawn, e.g.
+        fraction, binnedMean or binnedPercentile
+    n : int
+        Number of rows
+    num : int, optional
+        Number of resamples. Defaults to 1000.
+    seed : int, optional
+        Random seed. Defaults to None, i.e. fresh entropy.
+    batch : int, optional
+        Number of resamples evaluated at once. Defaults to 100.
+    workers : int, optional
+        Number of processes evaluating batches. Defaults to 1.
+
+    Returns
+    -------
+    samples : array
+        The statistic for each resample, with a leading axis of length num
+    """
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    _job.update(n=n, num=num, size=batch, seed=seed, statFn=statFn)
+    batches = range((num + batch - 1)//batch)
+
+    if workers <= 1:
+        results = list(map(_runBatch, batches))
+    else:
+        # Fork so workers inherit the statistic, which needn't be picklable
+        with mp.get_context("fork").Pool(workers) as pool:
+            results = pool.map(_runBatch, batches)
+
+    return np.concatenate(results)
+# end function
+
+
+def confidence(samples, level=68.0):
+    """
+    Lower and upper bounds of the central level% interval of bootstrap
+    samples, ignoring resamples where the statistic is NaN
+    """
+
+    return tuple(np.nanpercentile(samples, [50.0 - level/2.0, 50.0 + level/2.0], axis=0))
+# end function
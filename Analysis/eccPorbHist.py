@@ -9,10 +9,14 @@ Joint distribution of median tidal locking time over binary ecc and Porb.
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from binned import Binned2D
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 20.0
@@ -23,42 +27,25 @@ mpl.rc('font',**{'family':'serif'})
 mpl.rc('text', usetex=True)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLTorque.csv")
-ctl = pd.read_csv("../Data/mcCTLTorque.csv")
+cpl = loadSummary("../Data/mcCPLTorque.csv")
+ctl = loadSummary("../Data/mcCTLTorque.csv")
 
 # Construct Porb, ecc bins based on assumed ranges
 num = 11
 porbBinEdges = np.linspace(0, 100, num)
 eccBinEdges = np.linspace(0, 0.3, num)
 
-# Array for joint locking time distribution
-cplJointPeq = np.zeros((num-1, num-1))
-ctlJointPeq = np.zeros_like(cplJointPeq)
-
-# Array for joint Prot/Porb distribution
-cplJointRatio = np.zeros_like(cplJointPeq)
-ctlJointRatio = np.zeros_like(cplJointPeq)
-
-# Loop over bins, compute median tidal locking time in joing Porb/ecc bins
-for ii in range(num-1):
-    for jj in range(num-1):
-        cplMask = (cpl["Final_Porb"] > porbBinEdges[ii])
-        cplMask = cplMask & (cpl["Final_Porb"] < porbBinEdges[ii + 1])
-        cplMask = cplMask & (cpl["Final_Ecc"] > eccBinEdges[jj])
-        cplMask = cplMask & (cpl["Final_Ecc"] < eccBinEdges[jj + 1])
-
-        ctlMask = (ctl["Final_Porb"] > porbBinEdges[ii])
-        ctlMask = ctlMask & (ctl["Final_Porb"] < porbBinEdges[ii + 1])
-        ctlMask = ctlMask & (ctl["Final_Ecc"] > eccBinEdges[jj])
-        ctlMask = ctlMask & (ctl["Final_Ecc"] < eccBinEdges[jj + 1])
-
-        # Populate array elements ctl["Pri_ProtFinal"][ctlMask]
-        cplJointPeq[ii, jj] = np.median(cpl["Final_Peq"][cplMask]/cpl["Pri_ProtFinal"][cplMask])
-        ctlJointPeq[ii, jj] = np.median(ctl["Final_Peq"][ctlMask]/ctl["Pri_ProtFinal"][ctlMask])
-
-        cplJointRatio[ii, jj] = np.median(cpl["Final_Porb"][cplMask]/cpl["Pri_ProtFinal"][cplMask])
-        ctlJointRatio[ii, jj] = np.median(ctl["Final_Porb"][ctlMask]/ctl["Pri_ProtFinal"][ctlMask])
-# end loop
+# Bin every system once in joint Porb/ecc bins
+cplBins = Binned2D(cpl["Final_Porb"], cpl["Final_Ecc"], porbBinEdges, eccBinEdges)
+ctlBins = Binned2D(ctl["Final_Porb"], ctl["Final_Ecc"], porbBinEdges, eccBinEdges)
+
+# Median Peq/Prot in each bin, NaN for empty bins
+cplJointPeq = cplBins.median(cpl["Final_Peq"]/cpl["Pri_ProtFinal"])
+ctlJointPeq = ctlBins.median(ctl["Final_Peq"]/ctl["Pri_ProtFinal"])
+
+# Median Porb/Prot in each bin
+cplJointRatio = cplBins.median(cpl["Final_Porb"]/cpl["Pri_ProtFinal"])
+ctlJointRatio = ctlBins.median(ctl["Final_Porb"]/ctl["Pri_ProtFinal"])
 
 ################################################################################
 #
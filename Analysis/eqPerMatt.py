@@ -9,9 +9,15 @@ This script plots stellar-tidal evolution
 
 import numpy as np
 import os
+import sys
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+# Forward file and log readers live with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForward
+from vplLog import parseLog
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 23.0
@@ -36,53 +42,39 @@ fig, axes = plt.subplots(ncols=2, figsize=(14, 6))
 for ii, dir in enumerate(dirs):
     # Load data
     # saOutputOrder	Time -TotEn -TotAngMom -Radius -RotPer -EqRotPer DRotPerDtEqtide DRotPerDtStellar Ecce -OrbPer RadGyra -SurfEnFluxTotal
-    cpl = np.genfromtxt(os.path.join(cplDir, dir, "bintides.secondary.forward"))
-    ctl = np.genfromtxt(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
-
-    # Pull LockTimes out of logfile
-    with open(os.path.join(os.path.join(cplDir, dir, logfile_name)), 'r') as f:
-        logfile_in = f.read()
-
-    matches = []
-    for line in logfile_in.split("\n"):
-        if line.startswith("(LockTime)"):
-            matches.append((line.split()[-1]))
-
-    # Convert lock times to years
-    dLockTimeCPL = float(matches[3])/YEARSEC
-
-    # Pull LockTimes out of logfile
-    with open(os.path.join(os.path.join(ctlDir, dir, logfile_name)), 'r') as f:
-        logfile_in = f.read()
+    cpl = readForward(os.path.join(cplDir, dir, "bintides.secondary.forward"))
+    ctl = readForward(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
 
-    matches = []
-    for line in logfile_in.split("\n"):
-        if line.startswith("(LockTime)"):
-            matches.append((line.split()[-1]))
+    # Pull secondary's LockTime out of logfile, convert to years
+    log = parseLog(os.path.join(cplDir, dir, logfile_name), keys=["LockTime"],
+                   stages=["FINAL"], bodies=["secondary"])
+    dLockTimeCPL = log["FINAL"]["secondary"]["LockTime"]/YEARSEC
 
-    # Convert lock times to years
-    dLockTimeCTL = float(matches[3])/YEARSEC
+    # Pull secondary's LockTime out of logfile, convert to years
+    log = parseLog(os.path.join(ctlDir, dir, logfile_name), keys=["LockTime"],
+                   stages=["FINAL"], bodies=["secondary"])
+    dLockTimeCTL = log["FINAL"]["secondary"]["LockTime"]/YEARSEC
 
     # Find index in time array that corresponds to when simulation tidally locks
     if dLockTimeCPL < 0:
         iLockIndCPL = -1
     else:
-        iLockIndCPL = np.argmin(np.fabs(cpl[:,0]-dLockTimeCPL))
+        iLockIndCPL = np.argmin(np.fabs(cpl["Time"]-dLockTimeCPL))
     if dLockTimeCTL < 0:
         iLockIndCTL = -1
     else:
-        iLockIndCTL = np.argmin(np.fabs(ctl[:,0]-dLockTimeCTL))
+        iLockIndCTL = np.argmin(np.fabs(ctl["Time"]-dLockTimeCTL))
 
     # Left: Prot/Peq
-    axes[0].plot(cpl[:,0], cpl[:,4]/cpl[:,5], lw=2.5, ls="-", color=colors[ii])
-    axes[0].plot(ctl[:,0], ctl[:,4]/ctl[:,5], lw=2.5, ls="--", color=colors[ii])
+    axes[0].plot(cpl["Time"], cpl["RotPer"]/cpl["EqRotPer"], lw=2.5, ls="-", color=colors[ii])
+    axes[0].plot(ctl["Time"], ctl["RotPer"]/ctl["EqRotPer"], lw=2.5, ls="--", color=colors[ii])
 
     # Right: dProt/dt
-    cplDeriv = (cpl[:,6] + cpl[:,7])*YEARSEC/DAYSEC*1.0e9
-    ctlDeriv = (ctl[:,6] + ctl[:,7])*YEARSEC/DAYSEC*1.0e9
-    axes[1].plot(cpl[:iLockIndCPL,0], cplDeriv[:iLockIndCPL], lw=2, ls="-",
+    cplDeriv = (cpl["DRotPerDtEqtide"] + cpl["DRotPerDtStellar"])*YEARSEC/DAYSEC*1.0e9
+    ctlDeriv = (ctl["DRotPerDtEqtide"] + ctl["DRotPerDtStellar"])*YEARSEC/DAYSEC*1.0e9
+    axes[1].plot(cpl["Time"][:iLockIndCPL], cplDeriv[:iLockIndCPL], lw=2, ls="-",
                  color=colors[ii], label="P$_{orb}$ = %s d" % dir)
-    axes[1].plot(ctl[:iLockIndCTL,0], ctlDeriv[:iLockIndCTL], lw=2, ls="--",
+    axes[1].plot(ctl["Time"][:iLockIndCTL], ctlDeriv[:iLockIndCTL], lw=2, ls="--",
                  color=colors[ii])
 
 axes[1].plot([100], [100], lw=3, ls="-", color="grey", label="CPL")
@@ -93,7 +85,7 @@ axes[0].set_ylabel("P$_{rot}$/P$_{eq}$", fontsize=25)
 axes[0].set_xlabel("Time [yr]", fontsize=25)
 axes[0].set_xscale("log")
 axes[0].axhline(1, lw=2.5, ls=":", color="k")
-axes[0].set_xlim(1.0e6, cpl[-1,0])
+axes[0].set_xlim(1.0e6, cpl["Time"][-1])
 axes[0].set_ylim(0, 1.2)
 
 axes[0].text(1.2e6, 1.12, "Matt et al. (2015) + tides",
@@ -102,7 +94,7 @@ axes[0].text(1.2e6, 1.12, "Matt et al. (2015) + tides",
 # Format right axis
 axes[1].set_ylabel("$d$P$_{rot}$/$dt$ [d/Gyr]", fontsize=25)
 axes[1].set_xlabel("Time [yr]", fontsize=25)
-axes[1].set_xlim(1.0e6, cpl[-1,0])
+axes[1].set_xlim(1.0e6, cpl["Time"][-1])
 axes[1].legend(loc="lower center", framealpha=0.75, fontsize=13.5, ncol=3)
 axes[1].set_xscale("log")
 axes[1].set_yscale("symlog")
@@ -120,13 +112,13 @@ for ii, dir in enumerate(dirs):
     # Load data
     # saOutputOrder	Time -TotEn -TotAngMom -Radius -RotPer -EqRotPer
     # DRotPerDtEqtide DRotPerDtStellar Ecce -OrbPer RadGyra -SurfEnFluxTotal
-    cpl = np.genfromtxt(os.path.join(cplDir, dir, "bintides.secondary.forward"))
-    ctl = np.genfromtxt(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
+    cpl = readForward(os.path.join(cplDir, dir, "bintides.secondary.forward"))
+    ctl = readForward(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
 
     # Left: Prot/Peq
-    ax.plot(cpl[:,0], cpl[:,4]/cpl[:,5], lw=3, ls="-", color=colors[ii],
+    ax.plot(cpl["Time"], cpl["RotPer"]/cpl["EqRotPer"], lw=3, ls="-", color=colors[ii],
             label="P$_{orb}$ = %s d" % dir)
-    ax.plot(ctl[:,0], ctl[:,4]/ctl[:,5], lw=3, ls="--", color=colors[ii])
+    ax.plot(ctl["Time"], ctl["RotPer"]/ctl["EqRotPer"], lw=3, ls="--", color=colors[ii])
 
 # Format left axis
 ax.plot([100], [100], lw=3, ls="-", color="grey", label="CPL")
@@ -137,7 +129,7 @@ ax.set_ylabel("P$_{rot}$/P$_{eq}$", fontsize=30)
 ax.set_xlabel("Time [yr]", fontsize=30)
 ax.set_xscale("log")
 ax.axhline(1, lw=2.5, ls=":", color="k")
-ax.set_xlim(1.0e6, cpl[-1,0])
+ax.set_xlim(1.0e6, cpl["Time"][-1])
 ax.set_ylim(0, 1.3)
 
 # Save!
@@ -158,13 +150,13 @@ for ii in range(len(ctlDirs)):
     # Load data
     # saOutputOrder	Time -TotEn -TotAngMom -Radius -RotPer -EqRotPer
     # DRotPerDtEqtide DRotPerDtStellar Ecce -OrbPer RadGyra -SurfEnFluxTotal
-    ctl = np.genfromtxt(os.path.join(ctlDir, ctlDirs[ii], "bintides.secondary.forward"))
-    cpl = np.genfromtxt(os.path.join(cplDir, cplDirs[ii], "bintides.secondary.forward"))
+    ctl = readForward(os.path.join(ctlDir, ctlDirs[ii], "bintides.secondary.forward"))
+    cpl = readForward(os.path.join(cplDir, cplDirs[ii], "bintides.secondary.forward"))
 
     # Prot/Peq
-    ax.plot(cpl[:,0], cpl[:,4]/cpl[:,5], lw=3, ls="-", color="C%d" % ii,
+    ax.plot(cpl["Time"], cpl["RotPer"]/cpl["EqRotPer"], lw=3, ls="-", color="C%d" % ii,
             label=labels[ii])
-    ax.plot(ctl[:,0], ctl[:,4]/ctl[:,5], lw=3, ls="--", color="C%d" % ii)
+    ax.plot(ctl["Time"], ctl["RotPer"]/ctl["EqRotPer"], lw=3, ls="--", color="C%d" % ii)
 
 ax.plot([100], [100], ls="-", lw=3, color="grey", label="CPL")
 ax.plot([100], [100], ls="--", lw=3, color="grey", label="CTL")
@@ -174,7 +166,7 @@ ax.set_ylabel("P$_{rot}$/P$_{eq}$", fontsize=30)
 ax.set_xlabel("Time [yr]", fontsize=30)
 ax.set_xscale("log")
 ax.axhline(1, lw=2.5, ls=":", color="k")
-ax.set_xlim(1.0e6, cpl[-1,0])
+ax.set_xlim(1.0e6, cpl["Time"][-1])
 ax.set_ylim(0, 1.4)
 
 # Save!
@@ -8,10 +8,15 @@ This script plots stellar-tidal evolution
 """
 
 import numpy as np
+import sys
 import os
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+# Forward file reader lives with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForwardArray
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 23.0
@@ -36,8 +41,8 @@ fig, axes = plt.subplots(ncols=2, figsize=(14, 6))
 for ii, dir in enumerate(dirs):
     # Load data
     # saOutputOrder	Time -TotEn -TotAngMom -Radius -RotPer -EqRotPer DRotPerDtEqtide DRotPerDtStellar Ecce -OrbPer RadGyra -SurfEnFluxTotal
-    cpl = np.genfromtxt(os.path.join(cplDir, dir, "bintides.secondary.forward"))
-    ctl = np.genfromtxt(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
+    cpl = readForwardArray(os.path.join(cplDir, dir, "bintides.secondary.forward"))
+    ctl = readForwardArray(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
 
     # Pull LockTimes out of logfile
     with open(os.path.join(os.path.join(cplDir, dir, logfile_name)), 'r') as f:
@@ -120,8 +125,8 @@ for ii, dir in enumerate(dirs):
     # Load data
     # saOutputOrder	Time -TotEn -TotAngMom -Radius -RotPer -EqRotPer
     # DRotPerDtEqtide DRotPerDtStellar Ecce -OrbPer RadGyra -SurfEnFluxTotal
-    cpl = np.genfromtxt(os.path.join(cplDir, dir, "bintides.secondary.forward"))
-    ctl = np.genfromtxt(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
+    cpl = readForwardArray(os.path.join(cplDir, dir, "bintides.secondary.forward"))
+    ctl = readForwardArray(os.path.join(ctlDir, dir, "bintides.secondary.forward"))
 
     # Left: Prot/Peq
     ax.plot(cpl[:,0], cpl[:,4]/cpl[:,5], lw=3, ls="-", color=colors[ii],
@@ -158,8 +163,8 @@ for ii in range(len(ctlDirs)):
     # Load data
     # saOutputOrder	Time -TotEn -TotAngMom -Radius -RotPer -EqRotPer
     # DRotPerDtEqtide DRotPerDtStellar Ecce -OrbPer RadGyra -SurfEnFluxTotal
-    ctl = np.genfromtxt(os.path.join(ctlDir, ctlDirs[ii], "bintides.secondary.forward"))
-    cpl = np.genfromtxt(os.path.join(cplDir, cplDirs[ii], "bintides.secondary.forward"))
+    ctl = readForwardArray(os.path.join(ctlDir, ctlDirs[ii], "bintides.secondary.forward"))
+    cpl = readForwardArray(os.path.join(cplDir, cplDirs[ii], "bintides.secondary.forward"))
 
     # Prot/Peq
     ax.plot(cpl[:,0], cpl[:,4]/cpl[:,5], lw=3, ls="-", color="C%d" % ii,
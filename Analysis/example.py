@@ -29,10 +29,15 @@ are.
 """
 
 import numpy as np
+import sys
 import os
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+# Forward file reader lives with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForwardArray
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 22.0
@@ -57,12 +62,12 @@ fig, ax = plt.subplots()
 for ii in range(len(qs)):
 
     # Qs
-    qData = np.genfromtxt(os.path.join("../Sims/tauQ/",qs[ii],
-                                       "bintide.secondary.forward"))
+    qData = readForwardArray(os.path.join("../Sims/tauQ/",qs[ii],
+                                          "bintide.secondary.forward"))
 
     # taus
-    tauData = np.genfromtxt(os.path.join("../Sims/tauQ/",taus[ii],
-                                         "bintide.secondary.forward"))
+    tauData = readForwardArray(os.path.join("../Sims/tauQ/",taus[ii],
+                                            "bintide.secondary.forward"))
 
     ax.plot(qData[:,0], qData[:,5], lw=3, color=colors[ii], label=labels[ii],
             ls="-", zorder=1)
@@ -70,7 +75,7 @@ for ii in range(len(qs)):
             zorder=1)
 
 # Plot single star evolution
-single = np.genfromtxt(os.path.join("../Sims/tauQ/single/bintide.primary.forward"))
+single = readForwardArray(os.path.join("../Sims/tauQ/single/bintide.primary.forward"))
 ax.plot(single[:,0], single[:,2], lw=3, color="black", label="Single Star", zorder=2)
 
 # Plot dummy lines for legend
@@ -93,12 +98,12 @@ inset = fig.add_axes([0.55, 0.2, 0.3, 0.3])
 for ii in range(len(qs)):
 
     # Qs
-    qData = np.genfromtxt(os.path.join("../Sims/tauQ/",qs[ii],
-                                       "bintide.secondary.forward"))
+    qData = readForwardArray(os.path.join("../Sims/tauQ/",qs[ii],
+                                          "bintide.secondary.forward"))
 
     # taus
-    tauData = np.genfromtxt(os.path.join("../Sims/tauQ/",taus[ii],
-                                         "bintide.secondary.forward"))
+    tauData = readForwardArray(os.path.join("../Sims/tauQ/",taus[ii],
+                                            "bintide.secondary.forward"))
 
     inset.plot(qData[:,0]/1.0e9, qData[:,5], lw=3, color=colors[ii], label=labels[ii],
             ls="-", zorder=1)
@@ -106,7 +111,7 @@ for ii in range(len(qs)):
             zorder=1)
 
 # Plot single star evolution
-single = np.genfromtxt(os.path.join("../Sims/tauQ/single/bintide.primary.forward"))
+single = readForwardArray(os.path.join("../Sims/tauQ/single/bintide.primary.forward"))
 inset.plot(single[:,0]/1.0e9, single[:,2], lw=3, color="black", label="Single Star", zorder=2)
 
 # Plot orbital period
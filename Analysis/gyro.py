@@ -11,11 +11,15 @@ stars, i.e. by applying gyrochronology to binaries.
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from cmap import MidpointNormalize
+from binned import Binned2D
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
@@ -34,9 +38,9 @@ vmax = 25
 norm = MidpointNormalize(vmin=vmin, vmax=vmax, midpoint=0)
 
 # Load in data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
-single = pd.read_csv("../Data/mcSingleMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
+single = loadSummary("../Data/mcSingleMarch27.csv")
 
 # Lock times < 0 -> Not locked, set them to 7e9 (last simulation output time)
 cpl["Pri_LockTime"][cpl["Pri_LockTime"] < 0] = 7.0e9
@@ -59,33 +63,20 @@ ctl["Tides"] = pd.Series(mask, index=ctl.index)
 protBinEdges = np.linspace(0, 70, num)
 massBinEdges = np.linspace(0.1, 1.0, num)
 
-# Array for joint locking time distribution
-cplErr = np.zeros((num-1, num-1)) * np.nan
-ctlErr = np.zeros((num-1, num-1)) * np.nan
-
-for ii in range(num-1):
-    for jj in range(num-1):
-        # Isolate bins for CPL, CTL, and single star simulations
-        cplMask = (cpl["Pri_ProtAge"][cpl["Tides"]] > protBinEdges[ii])
-        cplMask = cplMask & (cpl["Pri_ProtAge"][cpl["Tides"]] < protBinEdges[ii + 1])
-        cplMask = cplMask & (cpl["Pri_dMass"][cpl["Tides"]] > massBinEdges[jj])
-        cplMask = cplMask & (cpl["Pri_dMass"][cpl["Tides"]] < massBinEdges[jj + 1])
-
-        ctlMask = (ctl["Pri_ProtAge"][ctl["Tides"]] > protBinEdges[ii])
-        ctlMask = ctlMask & (ctl["Pri_ProtAge"][ctl["Tides"]] < protBinEdges[ii + 1])
-        ctlMask = ctlMask & (ctl["Pri_dMass"][ctl["Tides"]] > massBinEdges[jj])
-        ctlMask = ctlMask & (ctl["Pri_dMass"][ctl["Tides"]] < massBinEdges[jj + 1])
-
-        singleMask = (single["Pri_ProtAge"] > protBinEdges[ii])
-        singleMask = singleMask & (single["Pri_ProtAge"] < protBinEdges[ii + 1])
-        singleMask = singleMask & (single["Pri_dMass"] > massBinEdges[jj])
-        singleMask = singleMask & (single["Pri_dMass"] < massBinEdges[jj + 1])
-
-        # Populate it if there's samples, default to NaN otherwise
-        if np.sum(cplMask) > 0 and np.sum(singleMask) > 0:
-            cplErr[ii, jj] = 100*(np.mean(single["Age"][singleMask]) - np.mean(cpl["Age"][cpl["Tides"]][cplMask]))/np.mean(single["Age"][singleMask])
-        if np.sum(ctlMask) > 0 and np.sum(singleMask) > 0:
-            ctlErr[ii, jj] = 100*(np.mean(single["Age"][singleMask]) - np.mean(ctl["Age"][ctl["Tides"]][ctlMask]))/np.mean(single["Age"][singleMask])
+# Mean age in every joint Prot/mass bin for tidally-influenced CPL and CTL
+# binaries and for single stars, NaN for empty bins
+cplTides = cpl[cpl["Tides"]]
+ctlTides = ctl[ctl["Tides"]]
+cplAge = Binned2D(cplTides["Pri_ProtAge"], cplTides["Pri_dMass"],
+                  protBinEdges, massBinEdges).mean(cplTides["Age"])
+ctlAge = Binned2D(ctlTides["Pri_ProtAge"], ctlTides["Pri_dMass"],
+                  protBinEdges, massBinEdges).mean(ctlTides["Age"])
+singleAge = Binned2D(single["Pri_ProtAge"], single["Pri_dMass"],
+                     protBinEdges, massBinEdges).mean(single["Age"])
+
+# Relative age error, NaN unless both bins have samples
+cplErr = 100*(singleAge - cplAge)/singleAge
+ctlErr = 100*(singleAge - ctlAge)/singleAge
 
 ### Plot! ###
 
@@ -17,10 +17,13 @@ CTL Secondary Locked Fraction: 0.0962
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 16.0
@@ -30,8 +33,8 @@ mpl.rc('font',**{'family':'serif','serif':['Computer Modern']})
 mpl.rc('text', usetex=True)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Lock times < 0 -> Not locked, set them to 7e9 (last simulation output time)
 cpl["Pri_LockTime"][cpl["Pri_LockTime"] < 0] = 7.0e9
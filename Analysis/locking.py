@@ -48,10 +48,14 @@ CTL interacting Porb median: 41.761252999999996
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from bootstrap import bootstrap, fraction, confidence
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
@@ -70,8 +74,8 @@ seed = 42
 np.random.seed(seed)
 
 # Load in data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Create indices for a random sample of num points to make scatterplot legible
 inds = np.random.choice(np.arange(len(cpl)), size=num, replace=False)
@@ -251,7 +255,8 @@ ax.text(1.15, 117, "CTL", ha="center", va="center", size=30, color="k")
 # Save!
 fig.savefig("../Plots/lockedCTL.pdf", bbox_inches="tight", dpi=200)
 
-# Output interesting statistics
+# Output interesting statistics, with bootstrap confidence intervals on the
+# fractions
 
 # Prots in d
 print("CPL Prot median:",np.median(cpl["Pri_ProtAge"]))
@@ -262,6 +267,13 @@ print("CPL fraction of locked binaries:",np.mean(cpl["Locked"]))
 print("CPL fraction of not locked but interacting binaries:",np.mean(cpl["Interacting"]))
 val = np.sum(cpl["Locked"][cpl["Pri_ProtAge"] <= 20])/np.sum(cpl["Locked"])
 print("CPL fraction of locked binaries with Prot < 20 d:",val)
+print("CPL fraction of locked binaries 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(cpl["Locked"]), len(cpl), seed=seed)))
+print("CPL fraction of not locked but interacting binaries 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(cpl["Interacting"]), len(cpl), seed=seed)))
+print("CPL fraction of locked binaries with Prot < 20 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(cpl["Pri_ProtAge"] <= 20, among=cpl["Locked"]),
+                           len(cpl), seed=seed)))
 print()
 print("CTL Prot median:",np.median(ctl["Pri_ProtAge"]))
 print("CTL locked Prot median:",np.median(ctl["Pri_ProtAge"][ctl["Locked"]]))
@@ -271,6 +283,13 @@ print("CTL fraction of locked binaries:",np.mean(ctl["Locked"]))
 print("CTL fraction of not locked but interacting binaries:",np.mean(ctl["Interacting"]))
 val = np.sum(ctl["Locked"][ctl["Pri_ProtAge"] <= 20])/np.sum(ctl["Locked"])
 print("CTL fraction of locked binaries with Prot < 20 d:",val)
+print("CTL fraction of locked binaries 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(ctl["Locked"]), len(ctl), seed=seed)))
+print("CTL fraction of not locked but interacting binaries 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(ctl["Interacting"]), len(ctl), seed=seed)))
+print("CTL fraction of locked binaries with Prot < 20 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(ctl["Pri_ProtAge"] <= 20, among=ctl["Locked"]),
+                           len(ctl), seed=seed)))
 print()
 
 # Ages in Gyr
@@ -7,10 +7,13 @@
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
@@ -28,8 +31,8 @@ seed = 42
 np.random.seed(seed)
 
 # Load in data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Create indices for a random sample of num points to make scatterplot legible
 inds = np.random.choice(np.arange(len(cpl)), size=num, replace=False)
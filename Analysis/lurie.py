@@ -9,10 +9,13 @@ Joint distribution of median tidal locking time over binary ecc and Porb.
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 22.0
@@ -24,8 +27,8 @@ mpl.rc('text', usetex=True)
 plotLurie = True
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 #lurie = pd.read_csv("../Data/Lurie2017Full.csv", header=0)
 #lurie["Prot"] = lurie["p_1_min"].copy() # As recommended by Lurie+2017 for equitorial Prot
@@ -9,10 +9,14 @@ Joint distribution of median tidal locking time over stellar tidal Q/tau and Por
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from binned import Binned2D
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 25.0
@@ -22,9 +26,9 @@ mpl.rc('font',**{'family':'serif'})
 mpl.rc('text', usetex=True)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
 cpl["Pri_dTidalQ"] = pd.Series(cpl["Pri_dTidaLQ"].values, index=cpl.index)
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Read in lurie data
 lurie = pd.read_csv("../Data/Lurie2017Full.csv", header=0)
@@ -38,47 +42,21 @@ porbBinEdges = np.linspace(0, 100, num)
 porbProtBinEdges = np.linspace(0.4, 2.0, num)
 estQTau = False
 
-# Array for joint locking time distribution
-cplTidalQ = np.zeros((num-1, num-1))
-ctlTidalTau = np.zeros_like(cplTidalQ)
-cplTidalQUp = np.zeros((num-1, num-1))
-ctlTidalTauUp = np.zeros_like(cplTidalQ)
-cplTidalQDown = np.zeros((num-1, num-1))
-ctlTidalTauDown = np.zeros_like(cplTidalQ)
-
-# Loop over bins, compute median tidal locking time in joing Porb/ecc bins
-for ii in range(num-1):
-    for jj in range(num-1):
-        cplMask = (cpl["Final_Porb"] > porbBinEdges[ii])
-        cplMask = cplMask & (cpl["Final_Porb"] < porbBinEdges[ii + 1])
-        cplMask = cplMask & (cpl["Final_Porb"]/cpl["Pri_ProtFinal"] > porbProtBinEdges[jj])
-        cplMask = cplMask & (cpl["Final_Porb"]/cpl["Pri_ProtFinal"] < porbProtBinEdges[jj + 1])
-
-        ctlMask = (ctl["Final_Porb"] > porbBinEdges[ii])
-        ctlMask = ctlMask & (ctl["Final_Porb"] < porbBinEdges[ii + 1])
-        ctlMask = ctlMask & (ctl["Final_Porb"]/ctl["Pri_ProtFinal"] > porbProtBinEdges[jj])
-        ctlMask = ctlMask & (ctl["Final_Porb"]/ctl["Pri_ProtFinal"] < porbProtBinEdges[jj + 1])
-
-        # Populate array elements ctl["Pri_ProtFinal"][ctlMask]
-        if np.sum(cplMask) == 0:
-            cplTidalQ[ii, jj] = np.nan
-            cplTidalQUp[ii, jj] = np.nan
-            cplTidalQDown[ii, jj] = np.nan
-        else:
-            cplTidalQ[ii, jj] = np.median(np.log10(cpl["Pri_dTidalQ"][cplMask]))
-            cplTidalQUp[ii, jj] = np.percentile(np.log10(cpl["Pri_dTidalQ"][cplMask]), 84) - cplTidalQ[ii, jj]
-            cplTidalQDown[ii, jj] = cplTidalQ[ii, jj] - np.percentile(np.log10(cpl["Pri_dTidalQ"][cplMask]), 16)
-
-        # Populate array elements ctl["Pri_ProtFinal"][ctlMask]
-        if np.sum(ctlMask) == 0:
-            ctlTidalTau[ii, jj] = np.nan
-            ctlTidalTauUp[ii, jj] = np.nan
-            ctlTidalTauDown[ii, jj] = np.nan
-        else:
-            ctlTidalTau[ii, jj] = np.median(np.log10(ctl["Pri_dTidalTau"][ctlMask]))
-            ctlTidalTauUp[ii, jj] = np.percentile(np.log10(ctl["Pri_dTidalTau"][ctlMask]), 84) - ctlTidalTau[ii, jj]
-            ctlTidalTauDown[ii, jj] = ctlTidalTau[ii, jj] - np.percentile(np.log10(ctl["Pri_dTidalTau"][ctlMask]), 16)
-# end loop
+# Bin every system once in joint Porb, Porb/Prot bins
+cplBins = Binned2D(cpl["Final_Porb"], cpl["Final_Porb"]/cpl["Pri_ProtFinal"],
+                   porbBinEdges, porbProtBinEdges)
+ctlBins = Binned2D(ctl["Final_Porb"], ctl["Final_Porb"]/ctl["Pri_ProtFinal"],
+                   porbBinEdges, porbProtBinEdges)
+
+# Median log10 tidal Q/tau in each bin with 16th and 84th percentile errors,
+# NaN for empty bins
+down, cplTidalQ, up = cplBins.percentile(np.log10(cpl["Pri_dTidalQ"]), [16, 50, 84])
+cplTidalQUp = up - cplTidalQ
+cplTidalQDown = cplTidalQ - down
+
+down, ctlTidalTau, up = ctlBins.percentile(np.log10(ctl["Pri_dTidalTau"]), [16, 50, 84])
+ctlTidalTauUp = up - ctlTidalTau
+ctlTidalTauDown = ctlTidalTau - down
 
 ################################################################################
 #
@@ -164,40 +142,25 @@ if estQTau:
     taus = []
 
 
-    # Loop over Lurie+2017 data, assign points to bin, estimate tidal parameters
+    # Assign each Lurie+2017 system to its bin, sample tidal Qs, taus from
+    # the simulations in that bin with replacement
+    lurieBins = Binned2D(lurie["Porb"], lurie["Porb"]/lurie["Prot"],
+                         porbBinEdges, porbProtBinEdges).bins
+    cplQ = np.log10(cpl["Pri_dTidalQ"].values)
+    ctlTau = np.log10(ctl["Pri_dTidalTau"].values)
     for kk in range(len(lurie)):
-        for ii in range(num-1):
-            for jj in range(num-1):
-                cplMask = (cpl["Final_Porb"] > porbBinEdges[ii])
-                cplMask = cplMask & (cpl["Final_Porb"] < porbBinEdges[ii + 1])
-                cplMask = cplMask & (cpl["Final_Porb"]/cpl["Pri_ProtFinal"] > porbProtBinEdges[jj])
-                cplMask = cplMask & (cpl["Final_Porb"]/cpl["Pri_ProtFinal"] < porbProtBinEdges[jj + 1])
-
-                ctlMask = (ctl["Final_Porb"] > porbBinEdges[ii])
-                ctlMask = ctlMask & (ctl["Final_Porb"] < porbBinEdges[ii + 1])
-                ctlMask = ctlMask & (ctl["Final_Porb"]/ctl["Pri_ProtFinal"] > porbProtBinEdges[jj])
-                ctlMask = ctlMask & (ctl["Final_Porb"]/ctl["Pri_ProtFinal"] < porbProtBinEdges[jj + 1])
-
-                if np.sum(cplMask) == 0:
-                    continue
-                else:
-                    porbProt = lurie["Porb"][kk]/lurie["Prot"][kk]
-                    porb = lurie["Porb"][kk]
-                    if(porb > porbBinEdges[ii]) and (porb < porbBinEdges[ii+1]):
-                        if (porbProt > porbProtBinEdges[jj]) and (porbProt < porbProtBinEdges[jj+1]):
-                            # Found correct bin, sample tidal Qs, taus with replacement
-                            qs = qs + list(np.random.choice(np.log10(cpl["Pri_dTidalQ"][cplMask]),
-                                           size=nsamp, replace=True))
-                if np.sum(ctlMask) == 0:
-                    continue
-                else:
-                    porbProt = lurie["Porb"][kk]/lurie["Prot"][kk]
-                    porb = lurie["Porb"][kk]
-                    if(porb > porbBinEdges[ii]) and (porb < porbBinEdges[ii+1]):
-                        if (porbProt > porbProtBinEdges[jj]) and (porbProt < porbProtBinEdges[jj+1]):
-                            # Found correct bin, sample tidal Qs, taus with replacement
-                            taus = taus + list(np.random.choice(np.log10(ctl["Pri_dTidalTau"][ctlMask]),
-                                               size=nsamp, replace=True))
+        if lurieBins[kk] < 0:
+            continue
+        ii, jj = np.unravel_index(lurieBins[kk], cplBins.shape)
+
+        cplRows = cplBins.members(ii, jj)
+        ctlRows = ctlBins.members(ii, jj)
+        if len(cplRows) == 0:
+            continue
+        qs = qs + list(np.random.choice(cplQ[cplRows], size=nsamp, replace=True))
+        if len(ctlRows) == 0:
+            continue
+        taus = taus + list(np.random.choice(ctlTau[ctlRows], size=nsamp, replace=True))
 
     # Tidal Q figure
     fig, ax = plt.subplots()
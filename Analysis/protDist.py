@@ -15,10 +15,16 @@ Single median Prot: 35.918763
 CPL Fraction of Stars with Prot < 7.5 d: 0.0968
 CTL Fraction of Stars with Prot < 7.5 d: 0.0845
 Single Fraction of Stars with Prot < 7.5 d: 0.0575
+CPL Fraction of Stars with Prot < 7.5 d 68% CI: [0.0937, 0.0997]
+CTL Fraction of Stars with Prot < 7.5 d 68% CI: [0.0818, 0.0874]
+Single Fraction of Stars with Prot < 7.5 d 68% CI: [0.0552, 0.0595]
 
 CPL Fraction of Stars with Prot < 20 d: 0.2665
 CTL Fraction of Stars with Prot < 20 d: 0.268
 Single Fraction of Stars with Prot < 20 d: 0.1616
+CPL Fraction of Stars with Prot < 20 d 68% CI: [0.2618, 0.2708]
+CTL Fraction of Stars with Prot < 20 d 68% CI: [0.2638, 0.2722]
+Single Fraction of Stars with Prot < 20 d 68% CI: [0.1578, 0.1649]
 
 CPL Median Age of Stars with Prot < 20 d: 2.256742668821268
 CTL Median Age of Stars with Prot < 20 d: 2.386626069632524
@@ -51,10 +57,14 @@ decoupling Prot from age, causing gyrochronlogy methods to fail in this instance
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from bootstrap import bootstrap, fraction, confidence
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 
 #Typical plot parameters that make for pretty plots
@@ -75,9 +85,9 @@ num = 2500
 np.random.seed(seed)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
-single = pd.read_csv("../Data/mcSingleMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
+single = loadSummary("../Data/mcSingleMarch27.csv")
 lurie = pd.read_csv("../Data/Lurie2017.csv", comment="#", header=None,
                     names=["Porb", "Prot", "Ecc"])
 
@@ -158,10 +168,22 @@ print()
 print("CPL Fraction of Stars with Prot < 7.5 d:",np.sum(cpl["Pri_ProtAge"] < 7.5)/len(cpl))
 print("CTL Fraction of Stars with Prot < 7.5 d:",np.sum(ctl["Pri_ProtAge"] < 7.5)/len(ctl))
 print("Single Fraction of Stars with Prot < 7.5 d:",np.sum(single["Pri_ProtAge"] < 7.5)/len(single))
+print("CPL Fraction of Stars with Prot < 7.5 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(cpl["Pri_ProtAge"] < 7.5), len(cpl), seed=seed)))
+print("CTL Fraction of Stars with Prot < 7.5 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(ctl["Pri_ProtAge"] < 7.5), len(ctl), seed=seed)))
+print("Single Fraction of Stars with Prot < 7.5 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(single["Pri_ProtAge"] < 7.5), len(single), seed=seed)))
 print()
 print("CPL Fraction of Stars with Prot < 20 d:",np.sum(cpl["Pri_ProtAge"] < 20)/len(cpl))
 print("CTL Fraction of Stars with Prot < 20 d:",np.sum(ctl["Pri_ProtAge"] < 20)/len(ctl))
 print("Single Fraction of Stars with Prot < 20 d:",np.sum(single["Pri_ProtAge"] < 20)/len(single))
+print("CPL Fraction of Stars with Prot < 20 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(cpl["Pri_ProtAge"] < 20), len(cpl), seed=seed)))
+print("CTL Fraction of Stars with Prot < 20 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(ctl["Pri_ProtAge"] < 20), len(ctl), seed=seed)))
+print("Single Fraction of Stars with Prot < 20 d 68%% CI: [%.4lf, %.4lf]" %
+      confidence(bootstrap(fraction(single["Pri_ProtAge"] < 20), len(single), seed=seed)))
 print()
 print("CPL Median Age of Stars with Prot < 20 d:",np.median(cpl["Age"][cpl["Pri_ProtAge"] < 20]/1.0e9))
 print("CTL Median Age of Stars with Prot < 20 d:",np.median(ctl["Age"][ctl["Pri_ProtAge"] < 20]/1.0e9))
@@ -10,10 +10,13 @@ single star models uniform over ages [1,7] Gyr, roughly field star ages.
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 
 #Typical plot parameters that make for pretty plots
@@ -34,9 +37,9 @@ num = 2500
 np.random.seed(seed)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
-single = pd.read_csv("../Data/mcSingleMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
+single = loadSummary("../Data/mcSingleMarch27.csv")
 lurie = pd.read_csv("../Data/Lurie2017.csv", comment="#", header=None,
                     names=["Porb", "Prot", "Ecc"])
 
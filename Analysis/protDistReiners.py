@@ -52,10 +52,13 @@ decoupling Prot from age, causing gyrochronlogy methods to fail in this instance
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 
 #Typical plot parameters that make for pretty plots
@@ -76,9 +79,9 @@ num = 2500
 np.random.seed(seed)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLReiners.csv")
-ctl = pd.read_csv("../Data/mcCTLReiners.csv")
-single = pd.read_csv("../Data/mcSingleReiners.csv")
+cpl = loadSummary("../Data/mcCPLReiners.csv")
+ctl = loadSummary("../Data/mcCTLReiners.csv")
+single = loadSummary("../Data/mcSingleReiners.csv")
 lurie = pd.read_csv("../Data/Lurie2017.csv", comment="#", header=None,
                     names=["Porb", "Prot", "Ecc"])
 
@@ -9,11 +9,15 @@ Joint distribution of median tidal locking time over stellar tidal Q/tau and Por
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 from cmap import shiftedColorMap
+from binned import Binned2D
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 26.0
@@ -27,8 +31,8 @@ mpl.rc('font',**{'family':'serif'})
 mpl.rc('text', usetex=True)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Lock times < 0 -> Not locked, set them to 7e9 (last simulation output time)
 cpl["Pri_LockTime"][cpl["Pri_LockTime"] < 0] = 7.0e9
@@ -43,35 +47,17 @@ porbBinEdges = np.linspace(0, 100, num)
 qBinEdges = np.logspace(4, 8, num)
 tauBinEdges = np.logspace(-2, 1, num)[::-1]
 
-# Array for joint locking time distribution
-cplJointPeq = np.zeros((num-1, num-1))
-ctlJointPeq = np.zeros_like(cplJointPeq)
+# Bin every system once in joint Porb/Q and Porb/tau bins
+cplBins = Binned2D(cpl["Final_Porb"], cpl["Pri_dTidalQ"], porbBinEdges, qBinEdges)
+ctlBins = Binned2D(ctl["Final_Porb"], ctl["Pri_dTidalTau"], porbBinEdges, tauBinEdges)
 
-# Array for joint Prot/Porb distribution
-cplJointRatio = np.zeros_like(cplJointPeq)
-ctlJointRatio = np.zeros_like(cplJointPeq)
+# Median Peq/Prot in each bin, NaN for empty bins
+cplJointPeq = cplBins.median(cpl["Final_Peq"]/cpl["Pri_ProtFinal"])
+ctlJointPeq = ctlBins.median(ctl["Final_Peq"]/ctl["Pri_ProtFinal"])
 
-# Loop over bins, compute median tidal locking time in joing Porb/ecc bins
-for ii in range(num-1):
-    for jj in range(num-1):
-        cplMask = (cpl["Final_Porb"] > porbBinEdges[ii])
-        cplMask = cplMask & (cpl["Final_Porb"] < porbBinEdges[ii + 1])
-        cplMask = cplMask & (cpl["Pri_dTidalQ"] > qBinEdges[jj])
-        cplMask = cplMask & (cpl["Pri_dTidalQ"] < qBinEdges[jj + 1])
-
-        ctlMask = (ctl["Final_Porb"] > porbBinEdges[ii])
-        ctlMask = ctlMask & (ctl["Final_Porb"] < porbBinEdges[ii + 1])
-        ctlMask = ctlMask & (ctl["Pri_dTidalTau"] < tauBinEdges[jj])
-        ctlMask = ctlMask & (ctl["Pri_dTidalTau"] > tauBinEdges[jj + 1])
-
-        # Populate array elements ctl["Pri_ProtFinal"][ctlMask]
-        cplJointPeq[ii, jj] = np.median(cpl["Final_Peq"][cplMask]/cpl["Pri_ProtFinal"][cplMask])
-        ctlJointPeq[ii, jj] = np.median(ctl["Final_Peq"][ctlMask]/ctl["Pri_ProtFinal"][ctlMask])
-
-        cplJointRatio[ii, jj] = np.median(cpl["Final_Porb"][cplMask]/cpl["Pri_ProtFinal"][cplMask])
-        ctlJointRatio[ii, jj] = np.median(ctl["Final_Porb"][ctlMask]/ctl["Pri_ProtFinal"][ctlMask])
-
-# end loop
+# Median Porb/Prot in each bin
+cplJointRatio = cplBins.median(cpl["Final_Porb"]/cpl["Pri_ProtFinal"])
+ctlJointRatio = ctlBins.median(ctl["Final_Porb"]/ctl["Pri_ProtFinal"])
 
 ################################################################################
 #
@@ -10,10 +10,14 @@ mass ratio and Porb where the mass ratio = massSecondary/massPrimary
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from binned import Binned2D
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 20.0
@@ -24,8 +28,8 @@ mpl.rc('font',**{'family':'serif'})
 mpl.rc('text', usetex=True)
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Lock times < 0 -> Not locked, set them to 7e9 (last simulation output time)
 cpl["Pri_LockTime"][cpl["Pri_LockTime"] < 0] = 7.0e9
@@ -42,34 +46,17 @@ num = 11
 porbBinEdges = np.linspace(0, 100, num)
 ratioBinEdges = np.linspace(0.1, 1.0, num)
 
-# Array for joint locking time distribution
-cplJointPeq = np.zeros((num-1, num-1))
-ctlJointPeq = np.zeros_like(cplJointPeq)
-
-# Array for joint Prot/Porb distribution
-cplJointRatio = np.zeros_like(cplJointPeq)
-ctlJointRatio = np.zeros_like(cplJointPeq)
-
-# Loop over bins, compute median tidal locking time in joing Porb/mu bins
-for ii in range(num-1):
-    for jj in range(num-1):
-        cplMask = (cpl["Final_Porb"] > porbBinEdges[ii])
-        cplMask = cplMask & (cpl["Final_Porb"] < porbBinEdges[ii + 1])
-        cplMask = cplMask & (cpl["MassRatio"] > ratioBinEdges[jj])
-        cplMask = cplMask & (cpl["MassRatio"] < ratioBinEdges[jj + 1])
-
-        ctlMask = (ctl["Final_Porb"] > porbBinEdges[ii])
-        ctlMask = ctlMask & (ctl["Final_Porb"] < porbBinEdges[ii + 1])
-        ctlMask = ctlMask & (ctl["MassRatio"] > ratioBinEdges[jj])
-        ctlMask = ctlMask & (ctl["MassRatio"] < ratioBinEdges[jj + 1])
-
-        # Populate array elements ctl["Pri_ProtFinal"][ctlMask]
-        cplJointPeq[ii, jj] = np.median(cpl["Final_Peq"][cplMask]/cpl["Pri_ProtFinal"][cplMask])
-        ctlJointPeq[ii, jj] = np.median(ctl["Final_Peq"][ctlMask]/ctl["Pri_ProtFinal"][ctlMask])
-
-        cplJointRatio[ii, jj] = np.median(cpl["Final_Porb"][cplMask]/cpl["Pri_ProtFinal"][cplMask])
-        ctlJointRatio[ii, jj] = np.median(ctl["Final_Porb"][ctlMask]/ctl["Pri_ProtFinal"][ctlMask])
-# end loop
+# Bin every system once in joint Porb/mu bins
+cplBins = Binned2D(cpl["Final_Porb"], cpl["MassRatio"], porbBinEdges, ratioBinEdges)
+ctlBins = Binned2D(ctl["Final_Porb"], ctl["MassRatio"], porbBinEdges, ratioBinEdges)
+
+# Median Peq/Prot in each bin, NaN for empty bins
+cplJointPeq = cplBins.median(cpl["Final_Peq"]/cpl["Pri_ProtFinal"])
+ctlJointPeq = ctlBins.median(ctl["Final_Peq"]/ctl["Pri_ProtFinal"])
+
+# Median Porb/Prot in each bin
+cplJointRatio = cplBins.median(cpl["Final_Porb"]/cpl["Pri_ProtFinal"])
+ctlJointRatio = ctlBins.median(ctl["Final_Porb"]/ctl["Pri_ProtFinal"])
 
 ################################################################################
 #
@@ -8,10 +8,15 @@ This script plots stellar-tidal evolution
 """
 
 import numpy as np
+import sys
 import os
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+# Forward file reader lives with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForwardArray
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 22.0
@@ -30,8 +35,8 @@ ctlLock = 3.126642e+07
 
 # Load data
 # saOutputOrder	Time -TotEn -TotAngMom -Semim -Radius -RotPer Ecce -RotRate -MeanMotion -OrbPer RadGyra -SurfEnFluxTotal
-cpl = np.genfromtxt(os.path.join(cplDir,"bintide.secondary.forward"))
-ctl = np.genfromtxt(os.path.join(ctlDir,"bintide.secondary.forward"))
+cpl = readForwardArray(os.path.join(cplDir,"bintide.secondary.forward"))
+ctl = readForwardArray(os.path.join(ctlDir,"bintide.secondary.forward"))
 
 # Plot e, Porb, Prot
 fig, axes = plt.subplots(ncols=3, figsize=(16,6), sharex=True)
@@ -35,10 +35,13 @@ produces the population. Compare with Lurie+2017 sample for 2 < Porb < 10 days:
 
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+sys.path.append("../Scripts")
+from summary import loadSummary
 
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['font.size'] = 22.0
@@ -51,8 +54,8 @@ plotLurie = True
 bins = "auto"
 
 # Load data
-cpl = pd.read_csv("../Data/mcCPLMarch27.csv")
-ctl = pd.read_csv("../Data/mcCTLMarch27.csv")
+cpl = loadSummary("../Data/mcCPLMarch27.csv")
+ctl = loadSummary("../Data/mcCTLMarch27.csv")
 
 # Load in cleaned sample of Prot and Ecc from Lurie+2017
 lurie = pd.read_csv("../Data/Lurie2017.csv", comment="#", header=None,
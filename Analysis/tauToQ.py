@@ -9,10 +9,15 @@ from Leconte+2010 and Eqn. 19 for nearly synchronous orbits
 """
 
 import numpy as np
+import sys
 import os
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+# Forward file reader lives with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForwardArray
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 22.0
@@ -49,13 +54,13 @@ output = "bintide.primary.forward"
 
 fig, ax = plt.subplots()
 
-data = np.genfromtxt(os.path.join(dir, "tau0_1NoLock", output))
+data = readForwardArray(os.path.join(dir, "tau0_1NoLock", output))
 qeffNoSync = leconte18(data[:,3], 0.1)
 qeffSync = leconte19(0.1)*np.ones(len(data))
 ax.plot(data[:,0], qeffNoSync, lw=3, ls="-", color="C0", label=r"$\tau = 0.1$ s Non-Sync")
 ax.plot(data[:,0], qeffSync, lw=3, ls="--", color="C0", label=r"$\tau = 0.1$ s Near Sync")
 
-data = np.genfromtxt(os.path.join(dir, "tau0_01NoLock", output))
+data = readForwardArray(os.path.join(dir, "tau0_01NoLock", output))
 qeffNoSync = leconte18(data[:,3], 0.01)
 qeffSync = leconte19(0.01)*np.ones(len(data))
 ax.plot(data[:,0], qeffNoSync, lw=3, ls="-", color="C1", label=r"$\tau = 0.01$ s Non-Sync")
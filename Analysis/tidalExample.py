@@ -8,10 +8,15 @@ This script plots tidal evolution of
 """
 
 import numpy as np
+import sys
 import os
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+# Forward file reader lives with the ensemble scripts
+sys.path.append("../Scripts")
+from forward import readForwardArray
+
 #Typical plot parameters that make for pretty plots
 mpl.rcParams['figure.figsize'] = (9,8)
 mpl.rcParams['font.size'] = 22.0
@@ -37,8 +42,8 @@ ctlLock = 4.400000e+07
 
 # Load data
 # saOutputOrder	Time -TotEn -TotAngMom -Semim -RotPer Ecce -OrbPer -SurfEnFluxTotal
-cpl = np.genfromtxt(os.path.join(cplDir,"bintides.secondary.forward"))
-ctl = np.genfromtxt(os.path.join(ctlDir,"bintides.secondary.forward"))
+cpl = readForwardArray(os.path.join(cplDir,"bintides.secondary.forward"))
+ctl = readForwardArray(os.path.join(ctlDir,"bintides.secondary.forward"))
 
 # Plot e, Porb, Prot
 fig, axes = plt.subplots(nrows=3, figsize=(6,15), sharex=True)
@@ -0,0 +1,165 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Equilibrium rotation periods where tidal spin-up balances Matt+2015 magnetic
+braking, for circular, aligned binaries, solved for whole arrays of orbital
+periods and tidal parameters at once.
+
+CTL: dw/dt_tides = -dw/dt_mb reduces to
+
+    (Prot**3 / Porb**5) * (1 - Porb/Prot) = 4.96e-16 / k2Tau
+
+with periods in seconds and k2Tau in s (Matt+2019 T0 correction).  In units of
+x = Prot/Porb this is the cubic x**2 (x - 1) = K, with K = 4.96e-16 Porb**2 /
+k2Tau, whose only root with Prot > Porb lies in [1, 1 + K].  The cubic is
+convex there, so Newton's method started at 1 + K decreases monotonically
+onto the root.  Every element is iterated until its relative step is below
+tol, and elements that haven't converged after maxIter iterations are NaN.
+
+CPL: the constant phase lag torque doesn't depend on the spin rate, only on
+its sign relative to the mean motion, so with the same stellar and magnetic
+braking parameters the balance has the closed form
+
+    Prot**3 = 2 pi 4.96e-16 Porb**4 Q/k2
+
+and the star is tidally locked, Prot = Porb, where that gives Prot < Porb.
+
+Running this file compares the solver to scipy's fsolve, one grid cell at a
+time, and times a 1000 x 1000 grid:
+    python torqueBalance.py
+
+"""
+
+import numpy as np
+
+DAYSEC = 86400.0 # Number of seconds in a day
+T0_CONST = 4.96e-16 # Matt+2015 braking over tidal torque constant [s]
+
+
+def ctlMatt2015Obj(Prot, Porb, k2Tau):
+    """
+    CTL, Matt+2015 torque balance with Matt+2019 T0 correction
+    """
+
+    return (Prot**3 / Porb**5) * (1.0 - Porb/Prot) - T0_CONST/k2Tau
+# end function
+
+
+def ctlMatt2015(Porb, logK2Tau, tol=1.0e-12, maxIter=100):
+    """
+    Solve for the Prot such that dw/dt_tides + dw/dt_mg = 0 in the CTL model
+
+    Parameters
+    ----------
+    Porb : float or array
+        Orbital period [d]
+    logK2Tau : float or array
+        log10(tidal time lag in s multipled by the Love number of degree 2,
+        k2). Broadcast against Porb.
+    tol : float, optional
+        Relative tolerance on Prot. Defaults to 1.0e-12.
+    maxIter : int, optional
+        Maximum number of Newton iterations. Defaults to 100.
+
+    Returns
+    -------
+    Prot : float or array
+        Rotation period [d] such that the torques balance, NaN where the
+        iterations didn't converge
+    """
+
+    Porb, logK2Tau = np.broadcast_arrays(np.asarray(Porb, dtype=float),
+                                         np.asarray(logK2Tau, dtype=float))
+
+    # Dimensionless cubic x^2 (x - 1) = K in x = Prot/Porb
+    Pb = Porb*DAYSEC
+    K = T0_CONST*Pb**2/10.0**logK2Tau
+
+    # Start right of the root, where the cubic is convex, so every Newton step
+    # lands between the root and the previous iterate
+    x = np.array(1.0 + K)
+    active = np.ones(x.shape, dtype=bool)
+    for _ in range(maxIter):
+        xa = x[active]
+        step = (xa*xa*(xa - 1.0) - K[active])/(xa*(3.0*xa - 2.0))
+        x[active] = xa - step
+
+        # Only keep iterating what hasn't converged
+        done = np.fabs(step) <= tol*xa
+        active[active] = ~done
+        if not np.any(active):
+            break
+
+    x[active] = np.nan
+    Prot = x*Porb
+
+    return Prot[()] if Prot.ndim == 0 else Prot
+# end function
+
+
+def cplMatt2015(Porb, logQk2):
+    """
+    Solve for the Prot such that dw/dt_tides + dw/dt_mg = 0 in the CPL model
+
+    Parameters
+    ----------
+    Porb : float or array
+        Orbital period [d]
+    logQk2 : float or array
+        log10(tidal Q divided by the Love number of degree 2, k2). Broadcast
+        against Porb.
+
+    Returns
+    -------
+    Prot : float or array
+        Rotation period [d] such that the torques balance, or Porb if the
+        tides are strong enough to lock the star
+    """
+
+    Pb = np.asarray(Porb, dtype=float)*DAYSEC
+    Pr = (2.0*np.pi*T0_CONST*10.0**np.asarray(logQk2, dtype=float))**(1.0/3.0)*Pb**(4.0/3.0)
+    Prot = np.maximum(Pr, Pb)/DAYSEC
+
+    return Prot[()] if Prot.ndim == 0 else Prot
+# end function
+
+
+if __name__ == "__main__":
+    import time
+    from scipy.optimize import fsolve
+
+    # The grid analyticTorqueBalance.py plots
+    nbins = 50
+    logK2Taus = np.log10(0.5 * np.logspace(-1.8, -0.3, nbins))[::-1]
+    Porbs = np.linspace(15, 80, nbins)
+
+    start = time.time()
+    old = np.zeros((nbins, nbins))
+    for ii in range(nbins):
+        for jj in range(nbins):
+            Pb = Porbs[ii]*DAYSEC
+            old[ii, jj] = fsolve(ctlMatt2015Obj, Pb, args=(Pb, 10**logK2Taus[jj]))[0]/DAYSEC
+    loop = time.time() - start
+
+    start = time.time()
+    new = ctlMatt2015(Porbs[:,None], logK2Taus[None,:])
+    vec = time.time() - start
+    print("%d x %d grid: fsolve loop %.3lf s, vectorized Newton %.5lf s, max relative difference %.1e" %
+          (nbins, nbins, loop, vec, np.max(np.fabs(new/old - 1.0))))
+
+    # Residuals of the balance itself
+    res = ctlMatt2015Obj(new*DAYSEC, Porbs[:,None]*DAYSEC, 10**logK2Taus[None,:])
+    print("Max |residual|/(4.96e-16/k2Tau): %.1e" %
+          np.max(np.fabs(res*10**logK2Taus[None,:]/T0_CONST)))
+
+    # Equilibrium maps at high resolution
+    nbins = 1000
+    Porbs = np.linspace(15, 80, nbins)
+    start = time.time()
+    ctlMatt2015(Porbs[:,None], np.linspace(-2.1, -0.6, nbins)[None,:])
+    print("%d x %d CTL grid: %.3lf s" % (nbins, nbins, time.time() - start))
+    start = time.time()
+    cplMatt2015(Porbs[:,None], np.linspace(5, 9, nbins)[None,:])
+    print("%d x %d CPL grid: %.3lf s" % (nbins, nbins, time.time() - start))
@@ -0,0 +1,170 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Wall time and accuracy of vplIntegrator.py's stiff spin stepping against its
+explicit RK4 steps, on the CPLTestMatt and CTLTestMatt binaries (Porb = 5 -
+60 d).  Each case set is copied to a scratch directory and evolved as one
+Ensemble three times: with explicit steps, with stiff=True, and, as the
+reference, with explicit steps dEta/--refine long.  Accuracy is the largest
+relative difference from the reference of any output rotation or orbital
+period.
+
+--nolock sets dMaxLockDiff to 0, so that nothing holds spins near the
+equilibrium rate but the tides themselves, the regime the stiff steps are for.
+Explicit steps there are very slow for CPL, whose reference can be run with
+stiff steps instead, --reference stiff.  Fewer outputs, --outputTime, leave
+more of the steps to the integrator.  Cases missing input files, e.g.
+CPLTestMatt/20's primary.in, are skipped.
+
+Usage:
+    python benchmarkStiff.py
+    python benchmarkStiff.py --nolock --outputTime 1e7 --reference stiff
+
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+from forward import readForward
+from vplLog import parseLog
+from vplIntegrator import Simulation, Ensemble, readInput, YEARSEC
+
+periods = ("5", "10", "20", "30", "40", "50", "60") # Porb [d] of the cases
+period_names = ("RotPer", "OrbPer", "OrbPeriod") # Outputs compared to the reference
+
+
+def complete(src):
+    """
+    Cases in src with all of their input files
+    """
+
+    cases = []
+    for period in periods:
+        infile = os.path.join(src, period, "vpl.in")
+        if os.path.exists(infile):
+            bodies = readInput(infile).get("saBodyFiles", [])
+            if all(os.path.exists(os.path.join(src, period, body)) for body in bodies):
+                cases.append(period)
+
+    return cases
+# end function
+
+
+def evolve(src, dst, cases, stiff=False, refine=1.0, nolock=False, outputTime=None):
+    """
+    Copy cases from src to dst and evolve them together, returning the wall
+    time [s]
+    """
+
+    sims = []
+    for period in cases:
+        shutil.copytree(os.path.join(src, period), os.path.join(dst, period))
+        sim = Simulation(os.path.join(dst, period, "vpl.in"))
+        sim.eta /= refine
+        if nolock:
+            sim.maxLockDiff[:] = 0.0
+        if outputTime is not None:
+            sim.outputTime = outputTime*YEARSEC
+        sims.append(sim)
+
+    start = time.time()
+    Ensemble(sims, stiff=stiff).run()
+    return time.time() - start
+# end function
+
+
+def periodsOf(directory):
+    """
+    Every output rotation and orbital period of a finished case
+    """
+
+    sim = Simulation(os.path.join(directory, "vpl.in"))
+    columns = []
+    for body in sim.bodies:
+        data = readForward(os.path.join(directory, "%s.%s.forward" % (sim.name, body.name)))
+        columns.extend(data[name] for name in period_names if name in data.dtype.names)
+
+    return columns
+# end function
+
+
+def steps(directory):
+    """
+    Number of steps a finished case took, from its log's average timestep
+    """
+
+    sim = Simulation(os.path.join(directory, "vpl.in"))
+    log = parseLog(os.path.join(directory, sim.name + ".log"), keys=["Time", "DeltaTime"],
+                   stages=["FINAL"], bodies=["system"])["FINAL"]["system"]
+
+    return int(round(log["Time"]/log["DeltaTime"]))
+# end function
+
+
+def error(directory, reference):
+    """
+    Largest relative difference of any output period from the reference
+    """
+
+    worst = 0.0
+    for value, ref in zip(periodsOf(directory), periodsOf(reference)):
+        n = min(len(value), len(ref))
+        worst = max(worst, np.max(np.fabs(value[:n]/ref[:n] - 1.0)))
+
+    return worst
+# end function
+
+
+if __name__ == "__main__":
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                                      "..", "Sims"),
+                        help="Directory holding CPLTestMatt and CTLTestMatt")
+    parser.add_argument("--cases", nargs="+", default=["CPLTestMatt", "CTLTestMatt"],
+                        help="Case sets to benchmark")
+    parser.add_argument("--nolock", action="store_true",
+                        help="Set dMaxLockDiff to 0, so that spins never lock")
+    parser.add_argument("--outputTime", type=float, default=None,
+                        help="Output interval [yr]. Defaults to each case's dOutputTime")
+    parser.add_argument("--refine", type=float, default=10.0,
+                        help="dEta of the reference is dEta/refine")
+    parser.add_argument("--reference", choices=("explicit", "stiff"), default="explicit",
+                        help="Steps the reference is evolved with")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="benchmarkStiff")
+    try:
+        for case in args.cases:
+            src = os.path.join(os.path.realpath(args.dir), case)
+            cases = complete(src)
+            dst = {mode : os.path.join(scratch, case, mode)
+                   for mode in ("explicit", "stiff", "reference")}
+
+            wall = {}
+            for mode in ("explicit", "stiff"):
+                wall[mode] = evolve(src, dst[mode], cases, stiff=(mode == "stiff"),
+                                    nolock=args.nolock, outputTime=args.outputTime)
+            evolve(src, dst["reference"], cases, stiff=(args.reference == "stiff"),
+                   refine=args.refine, nolock=args.nolock, outputTime=args.outputTime)
+
+            print("%s%s: explicit %.1lf s, stiff %.1lf s, %.2lfx faster" %
+                  (case, " (dMaxLockDiff 0)" if args.nolock else "", wall["explicit"],
+                   wall["stiff"], wall["explicit"]/wall["stiff"]))
+            print("Skipped: %s" % (" ".join(sorted(set(periods) - set(cases), key=float)) or "none"))
+            print("%6s %10s %10s %12s %10s" % ("Porb", "steps", "error", "stiff steps", "error"))
+            for period in cases:
+                ref = os.path.join(dst["reference"], period)
+                print("%6s %10d %10.2e %12d %10.2e" %
+                      (period, steps(os.path.join(dst["explicit"], period)),
+                       error(os.path.join(dst["explicit"], period), ref),
+                       steps(os.path.join(dst["stiff"], period)),
+                       error(os.path.join(dst["stiff"], period), ref)))
+    finally:
+        shutil.rmtree(scratch)
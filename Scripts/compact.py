@@ -0,0 +1,67 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Post-run compaction of an ensemble's forward files.  Each finished
+simulation's *.forward text files are replaced by compressed, columnar copies
+(see forward.compactForward) that keep the saOutputOrder column names and the
+exact values.  The readers in forward.py, and so processMC*.py, cube.py,
+integrity.py and the Analysis scripts, read either format, so nothing else
+changes.  Simulations integrity.py doesn't consider complete are left alone,
+so they can still be rerun and inspected.
+
+Usage (in the ensemble directory):
+    python compact.py --workers 28
+
+"""
+
+import os
+from ensemble import findSimulations, parseEnsemble
+from executor import systemName
+from forward import compactForward
+from integrity import checkSimulation
+
+
+def compactDirectory(directory):
+    """
+    Compact a finished simulation's forward files
+
+    Returns
+    -------
+    before, after : int
+        Bytes of forward output before and after. Both are 0 if the
+        simulation isn't complete or was already compacted.
+    """
+
+    if checkSimulation(directory)[0] != "complete":
+        return 0, 0
+
+    prefix = systemName(directory) + "."
+    before = after = 0
+    for name in sorted(os.listdir(directory)):
+        if name.startswith(prefix) and name.endswith(".forward"):
+            path = os.path.join(directory, name)
+            before += os.path.getsize(path)
+            after += os.path.getsize(compactForward(path))
+
+    return before, after
+# end function
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.dirname(os.path.realpath(__file__)),
+                        help="Ensemble directory. Defaults to where this script lives")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes compacting directories")
+    args = parser.parse_args()
+
+    dirs = [os.path.join(args.dir, name) for name in findSimulations(args.dir)]
+    sizes = parseEnsemble(compactDirectory, dirs, workers=args.workers)
+    before = sum(size[0] for size in sizes)
+    after = sum(size[1] for size in sizes)
+    print("Compacted %d of %d directories: %.1lf MB -> %.1lf MB" %
+          (sum(size[0] > 0 for size in sizes), len(dirs), before/1.0e6, after/1.0e6))
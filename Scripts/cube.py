@@ -0,0 +1,225 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Pack the full forward output of every simulation in an ensemble into one
+memory-mapped array per body, so analyses can slice any quantity at any time
+across all systems without re-parsing the simulation directories.
+
+A cube is a directory holding, for each body (e.g. primary, secondary):
+- <body>.npy: float64 array of shape (systems, output steps, columns). Runs
+  with fewer output steps than the longest one, e.g. ones that stopped early,
+  are padded with NaN.
+- <body>.lengths.npy: number of output steps each system actually has.
+and meta.json, which records the system numbers and each body's column names.
+
+Usage (in the ensemble directory):
+    python cube.py --workers 28
+
+Then, from anywhere:
+    cube = Cube("path/to/ensemble/cube")
+    prot = cube.column("secondary", "RotPer") # (systems, steps) memmap
+
+"""
+
+import os
+import json
+import numpy as np
+from ensemble import findSimulations, simulationIndex, parseEnsemble
+from executor import systemName
+from forward import readForward, findOutputOrder, forwardPath, isCompact, compact_ext
+
+cube_name = "cube" # Default cube directory name
+meta_name = "meta.json" # Cube metadata file name
+
+
+def forwardBodies(directory):
+    """
+    Names of the bodies with a forward file, text or compacted, in a
+    simulation directory
+    """
+
+    prefix = systemName(directory) + "."
+    bodies = set()
+    for name in os.listdir(directory):
+        if name.endswith(compact_ext):
+            name = name[:-len(compact_ext)]
+        if name.startswith(prefix) and name.endswith(".forward"):
+            bodies.add(name[len(prefix):-len(".forward")])
+
+    return sorted(bodies)
+# end function
+
+
+def _countRows(path):
+    """
+    Number of complete rows in a forward file, 0 if it doesn't exist
+    """
+
+    path = forwardPath(path)
+    if not os.path.exists(path):
+        return 0
+    if isCompact(path):
+        with np.load(path) as data:
+            return len(data[data.files[0]])
+    with open(path, 'rb') as f:
+        return f.read().count(b"\n")
+# end function
+
+
+def _readRows(item):
+    """
+    A forward file's rows as a (rows, columns) array, empty if it doesn't exist
+    """
+
+    path, names = item
+    if not os.path.exists(forwardPath(path)):
+        return np.empty((0, len(names)))
+    return readForward(path, names=names).view(np.float64).reshape(-1, len(names))
+# end function
+
+
+def buildCube(path, dest=None, workers=1, chunk=1000):
+    """
+    Pack an ensemble's forward files into a cube.
+
+    Parameters
+    ----------
+    path : str
+        Ensemble directory holding the simulation_N directories
+    dest : str, optional
+        Cube directory. Defaults to cube in the ensemble directory.
+    workers : int, optional
+        Number of processes reading forward files. Defaults to 1.
+    chunk : int, optional
+        Number of systems read into memory at once. Defaults to 1000.
+
+    Returns
+    -------
+    dest : str
+        Cube directory
+    """
+
+    if dest is None:
+        dest = os.path.join(path, cube_name)
+    if not os.path.exists(dest):
+        os.makedirs(dest)
+
+    dirs = [os.path.join(path, directory) for directory in findSimulations(path)]
+    if len(dirs) == 0:
+        raise ValueError("No simulation directories in %s" % path)
+    sysName = systemName(dirs[0])
+    bodies = forwardBodies(dirs[0])
+
+    meta = {"systems" : [simulationIndex(directory) for directory in dirs],
+            "bodies" : {}}
+
+    for body in bodies:
+        files = [os.path.join(directory, "%s.%s.forward" % (sysName, body))
+                 for directory in dirs]
+        names = findOutputOrder(files[0])
+        meta["bodies"][body] = names
+
+        # Size the cube from every file's row count, then fill it a chunk of
+        # systems at a time
+        print("Counting %s output steps..." % body)
+        lengths = np.array(parseEnsemble(_countRows, files, workers=workers,
+                                         report=len(files)), dtype=np.int64)
+        np.save(os.path.join(dest, body + ".lengths.npy"), lengths)
+
+        data = np.lib.format.open_memmap(os.path.join(dest, body + ".npy"), mode="w+",
+                                         dtype=np.float64,
+                                         shape=(len(files), int(lengths.max()), len(names)))
+        for start in range(0, len(files), chunk):
+            print("Packing %s systems %d-%d..." % (body, start, min(start + chunk, len(files)) - 1))
+            rows = parseEnsemble(_readRows, [(name, names) for name in files[start:start+chunk]],
+                                 workers=workers, report=chunk)
+            for ii, values in enumerate(rows, start):
+                data[ii,:len(values)] = values
+                data[ii,len(values):] = np.nan
+        data.flush()
+        del data
+
+    with open(os.path.join(dest, meta_name), 'w') as f:
+        json.dump(meta, f)
+
+    return dest
+# end function
+
+
+class Cube(object):
+    """
+    Read-only, memory-mapped view of a cube written by buildCube
+    """
+
+    def __init__(self, path=cube_name):
+        with open(os.path.join(path, meta_name), 'r') as f:
+            meta = json.load(f)
+
+        self.path = path
+        self.systems = np.array(meta["systems"])
+        self.columns = meta["bodies"]
+        self.data = {}
+        self.lengths = {}
+        for body in self.columns:
+            self.data[body] = np.load(os.path.join(path, body + ".npy"), mmap_mode="r")
+            self.lengths[body] = np.load(os.path.join(path, body + ".lengths.npy"))
+
+    def column(self, body, name):
+        """
+        (systems, steps) view of one of a body's output columns
+        """
+        return self.data[body][:,:,self.columns[body].index(name)]
+
+    def first(self, body, name):
+        """
+        Each system's first output of a column
+        """
+        return np.array(self.column(body, name)[:,0])
+
+    def last(self, body, name):
+        """
+        Each system's last output of a column, NaN for systems without output
+        """
+
+        lengths = self.lengths[body]
+        values = np.full(len(lengths), np.nan)
+        has = lengths > 0
+        values[has] = self.column(body, name)[np.nonzero(has)[0], lengths[has] - 1]
+        return values
+
+    def system(self, ii, body):
+        """
+        System number ii's output as readForward would return it
+        """
+
+        row = np.searchsorted(self.systems, ii)
+        if row >= len(self.systems) or self.systems[row] != ii:
+            raise KeyError("No system %d in %s" % (ii, self.path))
+
+        dtype = np.dtype([(name, np.float64) for name in self.columns[body]])
+        values = np.ascontiguousarray(self.data[body][row,:self.lengths[body][row]])
+        return values.view(dtype).reshape(-1)
+# end class
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.dirname(os.path.realpath(__file__)),
+                        help="Ensemble directory. Defaults to where this script lives")
+    parser.add_argument("--dest", default=None,
+                        help="Cube directory. Defaults to %s in the ensemble directory" % cube_name)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes reading forward files")
+    parser.add_argument("--chunk", type=int, default=1000,
+                        help="Number of systems held in memory at once")
+    args = parser.parse_args()
+
+    dest = buildCube(args.dir, dest=args.dest, workers=args.workers, chunk=args.chunk)
+    cube = Cube(dest)
+    for body in cube.columns:
+        print("%s: %d systems x %d steps x %d columns (%s)" %
+              ((body,) + cube.data[body].shape + (" ".join(cube.columns[body]),)))
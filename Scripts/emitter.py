@@ -0,0 +1,131 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Write the simulation_N directories, input files and run scripts for a Monte
+Carlo ensemble, optionally sharding the system index range across a pool of
+worker processes.  Each worker renders and writes only its own systems, so the
+files on disk only depend on the system index, not on the number of workers.
+
+"""
+
+import os
+import stat
+import multiprocessing as mp
+
+
+def simulationName(ii):
+    """
+    Name of the directory (and run script, plus .sh) for system ii
+    """
+    return "simulation_" + str(ii)
+# end function
+
+
+def writeSimulation(path, ii, files):
+    """
+    Write one system's input files and its run script.
+
+    Parameters
+    ----------
+    path : str
+        Directory where the simulation directories live
+    ii : int
+        System index
+    files : dict
+        Input file contents keyed by file name, e.g. "primary.in"
+
+    Returns
+    -------
+    command : str
+        Path to the system's executable run script
+    """
+
+    # Create a directory for the simulation to live in
+    directory = simulationName(ii)
+    if not os.path.exists(os.path.join(path, directory)):
+        os.makedirs(os.path.join(path, directory))
+
+    for name, text in files.items():
+        with open(os.path.join(path, directory, name), 'w') as f:
+            print(text, file = f)
+
+    # Generate *.sh file needed for cluster to run sims
+    command = os.path.join(path, directory + ".sh")
+    with open(command,"w") as g:
+        g.write("#!/bin/bash\n")
+        g.write("cd " + os.path.join(path, directory) + "\n") # Change dir to where sim is
+        g.write("vplanet vpl.in\n") # Run sim command!
+
+    # Now give that .sh file execute permissions
+    st = os.stat(command)
+    os.chmod(command, st.st_mode | stat.S_IEXEC)
+
+    return command
+# end function
+
+
+def shardRange(num, workers):
+    """
+    Split range(num) into at most workers contiguous (start, stop) shards
+    """
+
+    workers = max(1, min(workers, num))
+    bounds = [num*ii//workers for ii in range(workers + 1)]
+    return [(bounds[ii], bounds[ii+1]) for ii in range(workers)]
+# end function
+
+
+def _emitShard(args):
+    """
+    Render and write systems start, ..., stop-1
+    """
+
+    path, renderSystem, start, stop = args
+    return [writeSimulation(path, ii, renderSystem(ii)) for ii in range(start, stop)]
+# end function
+
+
+def emitSystems(path, num, renderSystem, workers=1, start=0):
+    """
+    Write every system's directory and run script, in parallel if workers > 1.
+
+    Parameters
+    ----------
+    path : str
+        Directory where the simulation directories live
+    num : int
+        Number of systems to write
+    renderSystem : callable
+        renderSystem(ii) returns the input file contents for system ii as a
+        dict keyed by file name.  It must only depend on ii so the output is
+        the same for any number of workers.
+    workers : int, optional
+        Number of worker processes. Defaults to 1, i.e. write serially.
+    start : int, optional
+        Index of the first system, e.g. to top up an existing ensemble.
+        Defaults to 0.
+
+    Returns
+    -------
+    runfile_names : list
+        Run script paths in system index order
+    """
+
+    shards = [(path, renderSystem, start + lo, start + hi) for lo, hi in shardRange(num, workers)]
+
+    if workers <= 1:
+        results = [_emitShard(shard) for shard in shards]
+    else:
+        # Fork so workers inherit the templates and samples of the calling
+        # script rather than re-running it
+        with mp.get_context("fork").Pool(workers) as pool:
+            results = pool.map(_emitShard, shards)
+
+    runfile_names = []
+    for result in results:
+        runfile_names.extend(result)
+
+    return runfile_names
+# end function
@@ -0,0 +1,219 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Helpers for parsing an ensemble of VPLanet simulations: finding the
+simulation directories in index order, fanning the per-directory extraction
+out over a pool of worker processes, and, for incremental processing,
+checkpointing each directory's size and modification time so only new or
+changed simulations are parsed again.
+
+Running this file benchmarks a processing script on an existing ensemble for
+several worker counts:
+    python ensemble.py /path/to/ensemble --workers 1 4 16 28
+
+"""
+
+import os
+import sys
+import json
+import time
+import multiprocessing as mp
+
+
+def simulationIndex(directory):
+    """
+    System number of a simulation_N directory
+    """
+    return int(os.path.basename(os.path.normpath(directory)).split("_")[-1])
+# end function
+
+
+def findSimulations(path):
+    """
+    Names of all simulation_N directories in path, sorted by N
+    """
+
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            # Only consider simulation directories
+            if entry.name.startswith("simulation_") and entry.is_dir():
+                dirs.append(entry.name)
+
+    return sorted(dirs, key=simulationIndex)
+# end function
+
+
+def parseEnsemble(parseFn, items, workers=1, report=1000):
+    """
+    Apply parseFn to every item, in parallel if workers > 1, keeping order.
+
+    Parameters
+    ----------
+    parseFn : callable
+        parseFn(item) returns one row of the summary table, e.g. for one
+        simulation directory
+    items : list
+        Arguments for parseFn, one per simulation
+    workers : int, optional
+        Number of worker processes. Defaults to 1, i.e. parse serially.
+    report : int, optional
+        Print progress every report items. Defaults to 1000.
+
+    Returns
+    -------
+    table : list
+        parseFn(item) for each item, in the same order as items
+    """
+
+    def progress(results):
+        table = []
+        for ii, row in enumerate(results, 1):
+            table.append(row)
+            if ii % report == 0 or ii == len(items):
+                print("Parsed %d/%d directories..." % (ii, len(items)))
+                sys.stdout.flush()
+        return table
+    # end function
+
+    if workers <= 1:
+        return progress(map(parseFn, items))
+
+    # Fork so workers inherit parseFn from the calling script rather than
+    # re-running it.  Chunk so each worker gets a decent batch per round trip.
+    chunksize = max(1, len(items)//(4*workers))
+    with mp.get_context("fork").Pool(workers) as pool:
+        return progress(pool.imap(parseFn, items, chunksize=chunksize))
+# end function
+
+
+def directorySignature(directory):
+    """
+    [total size, latest modification time in ns] of a simulation directory's
+    files, which changes whenever vplanet writes more output
+    """
+
+    size = 0
+    mtime = 0
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                size += stat.st_size
+                mtime = max(mtime, stat.st_mtime_ns)
+
+    return [size, mtime]
+# end function
+
+
+def readCheckpoint(path):
+    """
+    Checkpoint written by writeCheckpoint, None if there isn't one
+    """
+
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+# end function
+
+
+def writeCheckpoint(path, checkpoint):
+    """
+    Atomically replace the checkpoint at path
+    """
+
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+# end function
+
+
+def parseIncremental(parseFn, dirs, items, previous, checkpoint, options=None,
+                     workers=1, report=1000):
+    """
+    Like parseEnsemble, but reuse the rows of a previous run for directories
+    that haven't changed since.
+
+    Parameters
+    ----------
+    parseFn : callable
+        parseFn(item) returns one row of the summary table
+    dirs : list
+        Simulation directories, one per item
+    items : list
+        Arguments for parseFn, one per simulation
+    previous : pandas.DataFrame or None
+        The previous run's summary table, one row per system in checkpoint
+        order
+    checkpoint : dict or None
+        The previous run's checkpoint, see readCheckpoint
+    options : dict, optional
+        Processing options, e.g. the seed. Everything is parsed again if they
+        differ from the checkpoint's. Defaults to None.
+    workers : int, optional
+        Number of worker processes. Defaults to 1.
+    report : int, optional
+        Print progress every report items. Defaults to 1000.
+
+    Returns
+    -------
+    table : list
+        One row per item, in the same order as items
+    checkpoint : dict
+        Checkpoint for the new table, to save with writeCheckpoint once the
+        table has been written
+    """
+
+    signatures = [directorySignature(directory) for directory in dirs]
+    names = [os.path.basename(os.path.normpath(directory)) for directory in dirs]
+
+    # Rows we can reuse, if the checkpoint describes the previous table
+    old = {}
+    if (checkpoint is not None and previous is not None and
+        checkpoint.get("options") == options and
+        len(checkpoint["systems"]) == len(previous)):
+        for (name, size, mtime), row in zip(checkpoint["systems"], previous.values.tolist()):
+            old[name] = ([size, mtime], row)
+
+    todo = [ii for ii, name in enumerate(names)
+            if name not in old or old[name][0] != signatures[ii]]
+    print("%d of %d directories new or changed since the last checkpoint" %
+          (len(todo), len(dirs)))
+    rows = parseEnsemble(parseFn, [items[ii] for ii in todo], workers=workers,
+                         report=report)
+
+    table = [old[name][1] if name in old else None for name in names]
+    for ii, row in zip(todo, rows):
+        table[ii] = row
+
+    checkpoint = {"options" : options,
+                  "systems" : [[name] + signature for name, signature in zip(names, signatures)]}
+
+    return table, checkpoint
+# end function
+
+
+if __name__ == "__main__":
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="Ensemble directory holding the processing script")
+    parser.add_argument("--script", default="processMCCPL.py",
+                        help="Processing script to time. Defaults to processMCCPL.py")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()],
+                        help="Worker counts to time")
+    args = parser.parse_args()
+
+    num = len(findSimulations(args.path))
+    for workers in args.workers:
+        start = time.time()
+        subprocess.run([sys.executable, args.script, "--workers", str(workers)],
+                       cwd=args.path, stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.time() - start
+        print("%d directories, workers = %d: %.2lf s (%.2lf ms per directory)" %
+              (num, workers, elapsed, 1000.0*elapsed/max(num, 1)))
@@ -0,0 +1,296 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Run an ensemble of vplanet simulations with a bounded pool of workers,
+replacing GNU parallel over the simulation_*.sh files.  Every job gets an
+optional timeout and a number of retries, and every finished attempt is
+appended to a journal so an interrupted ensemble can be resumed: jobs the
+journal records as finished, or whose outputs are already complete, are
+skipped.  Throughput statistics are printed as jobs finish and at the end.
+vplanet's output in each simulation directory goes to vplanet.out, to
+diagnose failed runs.
+
+Usage (in the ensemble directory):
+    python executor.py --workers 28 --timeout 36000 --retries 1
+    python executor.py --manifest mcCPL_manifest.csv --workers 28
+    python executor.py --rerun rerun.txt --workers 28
+
+A rerun list, e.g. from integrity.py, restricts the run to the simulations it
+names and reruns them regardless of the journal and existing outputs.
+
+For local testing, --exe can point at any stand-in for vplanet that accepts
+vpl.in as its only argument, e.g. vplIntegrator.py:
+    python executor.py --workers 4 --exe /path/to/Scripts/vplIntegrator.py
+
+"""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from emitter import simulationName
+from ensemble import findSimulations
+from manifest import readManifest, runSystem
+
+journal_name = "executor.journal" # Default journal file name
+output_name = "vplanet.out" # vplanet's stdout and stderr, in each simulation directory
+
+
+def systemName(directory):
+    """
+    sSystemName from a simulation directory's vpl.in, which names its log and
+    forward files.  Defaults to "bintides", the name all ensembles use.
+    """
+
+    try:
+        with open(os.path.join(directory, "vpl.in"), 'r') as f:
+            for line in f:
+                if line.startswith("sSystemName"):
+                    return line.split()[1]
+    except (IOError, IndexError):
+        pass
+
+    return "bintides"
+# end function
+
+
+def outputsComplete(directory):
+    """
+    Whether a simulation directory holds a finished run, i.e. a log file with
+    its final system properties written
+    """
+
+    logfile = os.path.join(directory, systemName(directory) + ".log")
+    if not os.path.exists(logfile):
+        return False
+
+    # Scan line by line, stopping at the final properties header
+    with open(logfile, 'r') as f:
+        return any("FINAL SYSTEM PROPERTIES" in line for line in f)
+# end function
+
+
+class DirectoryJob(object):
+    """
+    Run vplanet in an existing simulation directory, writing its stdout and
+    stderr to output_name there
+    """
+
+    def __init__(self, directory, exe="vplanet"):
+        self.directory = directory
+        self.name = os.path.basename(os.path.normpath(directory))
+        self.exe = exe
+
+    def run(self, timeout=None):
+        with open(os.path.join(self.directory, output_name), 'w') as f:
+            return subprocess.run([self.exe, "vpl.in"], cwd=self.directory,
+                                  timeout=timeout, stdout=f,
+                                  stderr=subprocess.STDOUT).returncode
+# end class
+
+
+class ManifestJob(object):
+    """
+    Materialize one manifest row in node-local scratch and run vplanet there,
+    see manifest.runSystem, writing its stdout and stderr to output_name in
+    the simulation directory
+    """
+
+    def __init__(self, ii, row, templateDir, ensembleDir, exe="vplanet",
+                 tmpdir=None, templates=None):
+        self.ii = ii
+        self.row = row
+        self.templateDir = templateDir
+        self.ensembleDir = ensembleDir
+        self.directory = os.path.join(ensembleDir, simulationName(ii))
+        self.name = simulationName(ii)
+        self.exe = exe
+        self.tmpdir = tmpdir
+        self.templates = templates
+
+    def run(self, timeout=None):
+        return runSystem(self.ii, self.row, self.templateDir, self.ensembleDir,
+                         exe=self.exe, timeout=timeout, tmpdir=self.tmpdir,
+                         templates=self.templates, output=output_name)
+# end class
+
+
+def readJournal(path):
+    """
+    Names of the jobs a journal records as finished successfully
+    """
+
+    done = set()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[1] == "ok":
+                    done.add(fields[0])
+
+    return done
+# end function
+
+
+def runEnsemble(jobs, workers=1, timeout=None, retries=0, journal=None,
+                resume=True, validate=outputsComplete, report=100):
+    """
+    Run every job with at most workers running at once.
+
+    Parameters
+    ----------
+    jobs : list
+        Jobs with a name, a directory, and a run(timeout) method returning the
+        exit status, e.g. DirectoryJob, ManifestJob
+    workers : int, optional
+        Maximum number of jobs running at once. Defaults to 1.
+    timeout : float, optional
+        Seconds before a job is killed. Defaults to None, no limit.
+    retries : int, optional
+        Number of times a failed or timed out job is rerun. Defaults to 0.
+    journal : str, optional
+        File each finished attempt is appended to. Defaults to None, no journal.
+    resume : bool, optional
+        Skip jobs the journal records as finished or whose outputs validate.
+        Defaults to True.
+    validate : callable, optional
+        validate(directory) is True if a job's outputs are complete. Defaults
+        to outputsComplete.
+    report : int, optional
+        Print throughput every report finished jobs. Defaults to 100.
+
+    Returns
+    -------
+    stats : dict
+        Job counts ("total", "skipped", "ok", "failed"), "wall" time [s],
+        "mean" job run time [s], "throughput" [jobs/hr], and "failures", the
+        names of the jobs that never succeeded.
+    """
+
+    # Skip what's already been done
+    todo = []
+    skipped = 0
+    done = readJournal(journal) if (journal is not None and resume) else set()
+    for job in jobs:
+        if resume and (job.name in done or validate(job.directory)):
+            skipped += 1
+        else:
+            todo.append(job)
+
+    lock = threading.Lock()
+    runTimes = []
+    failures = []
+    start = time.time()
+
+    def attempt(job):
+        for tries in range(1, retries + 2):
+            jobStart = time.time()
+            try:
+                status = job.run(timeout=timeout)
+                result = "ok" if status == 0 else "failed(%d)" % status
+            except subprocess.TimeoutExpired:
+                result = "timeout"
+            except Exception as e:
+                result = "error(%s)" % type(e).__name__
+            elapsed = time.time() - jobStart
+
+            if journal is not None:
+                with lock:
+                    with open(journal, 'a') as f:
+                        f.write("%s %s %d %.3lf\n" % (job.name, result, tries, elapsed))
+
+            if result == "ok":
+                break
+
+        return job, result, elapsed
+    # end function
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(attempt, job) for job in todo]
+        for count, future in enumerate(as_completed(futures), 1):
+            job, result, elapsed = future.result()
+            if result == "ok":
+                runTimes.append(elapsed)
+            else:
+                failures.append(job.name)
+                print("%s: %s" % (job.name, result), file=sys.stderr)
+
+            if count % report == 0 or count == len(futures):
+                wall = time.time() - start
+                print("Finished %d/%d jobs (%d failed) in %.1lf s: %.1lf jobs/hr" %
+                      (count, len(futures), len(failures), wall, 3600.0*count/max(wall, 1.0e-9)))
+                sys.stdout.flush()
+
+    wall = time.time() - start
+    stats = {"total" : len(jobs), "skipped" : skipped, "ok" : len(runTimes),
+             "failed" : len(failures), "wall" : wall,
+             "mean" : sum(runTimes)/len(runTimes) if runTimes else 0.0,
+             "throughput" : 3600.0*len(todo)/wall if wall > 0 else 0.0,
+             "failures" : failures}
+
+    return stats
+# end function
+
+
+if __name__ == "__main__":
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.dirname(os.path.realpath(__file__)),
+                        help="Ensemble directory. Defaults to where this script lives")
+    parser.add_argument("--manifest", default=None,
+                        help="Run the systems in this manifest instead of the simulation_* directories")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Maximum number of simulations running at once")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds before a simulation is killed")
+    parser.add_argument("--retries", type=int, default=0,
+                        help="Number of times a failed simulation is rerun")
+    parser.add_argument("--journal", default=None,
+                        help="Journal file. Defaults to %s in the ensemble directory" % journal_name)
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="Rerun everything, ignoring the journal and existing outputs")
+    parser.add_argument("--rerun", default=None,
+                        help="Only rerun the simulations named in this file, e.g. from integrity.py")
+    parser.add_argument("--tmpdir", default=None,
+                        help="Node-local scratch directory for manifest runs")
+    parser.add_argument("--exe", default="vplanet", help="vplanet executable")
+    args = parser.parse_args()
+
+    path = os.path.realpath(args.dir)
+    journal = args.journal if args.journal is not None else os.path.join(path, journal_name)
+
+    # Build the jobs
+    if args.manifest is not None:
+        df = readManifest(args.manifest)
+        templates = {} # Shared template cache
+        jobs = [ManifestJob(ii, df.loc[ii], os.path.dirname(os.path.realpath(__file__)),
+                            path, exe=args.exe, tmpdir=args.tmpdir,
+                            templates=templates) for ii in df.index]
+    else:
+        jobs = [DirectoryJob(os.path.join(path, directory), exe=args.exe)
+                for directory in findSimulations(path)]
+
+    # Rerun exactly the listed simulations, however far they got before
+    resume = args.resume
+    if args.rerun is not None:
+        with open(args.rerun, 'r') as f:
+            names = set(line.strip() for line in f if line.strip())
+        jobs = [job for job in jobs if job.name in names]
+        resume = False
+
+    stats = runEnsemble(jobs, workers=args.workers, timeout=args.timeout,
+                        retries=args.retries, journal=journal,
+                        resume=resume)
+
+    print("Jobs: %d total, %d skipped, %d ok, %d failed" %
+          (stats["total"], stats["skipped"], stats["ok"], stats["failed"]))
+    print("Wall time: %.1lf s, mean job time: %.2lf s, throughput: %.1lf jobs/hr" %
+          (stats["wall"], stats["mean"], stats["throughput"]))
+
+    sys.exit(1 if stats["failed"] > 0 else 0)
@@ -0,0 +1,454 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Fast reader for vplanet *.forward output files.  Forward files are plain
+whitespace-delimited tables with a fixed number of numeric columns, so instead
+of np.genfromtxt's general purpose, pure Python parser, files are read with
+np.loadtxt's C parser and a known dtype.  Rows come back as a structured
+array whose fields are named by the body's saOutputOrder, e.g. data["RotPer"],
+with vplanet's leading "-" (output in user units) dropped.  When only the
+initial, final and a few intermediate rows are needed, extractRows seeks to
+them instead of reading the whole file.
+
+Once a run has finished, compactForward can replace a forward file with a
+compressed, columnar copy, <file>.forward.npz, holding one float64 array per
+column named by saOutputOrder.  The values are exactly those readForward
+returns for the text file.  Every reader here takes the text file's path and
+reads whichever of the two exists, so scripts needn't know which they have.
+
+Running this file benchmarks readForward against np.genfromtxt, and
+extractRows against reading the whole file:
+    python forward.py --rows 100000
+
+"""
+
+import io
+import os
+import numpy as np
+
+compact_ext = ".npz" # Appended to a forward file's name once compacted
+
+
+def outputOrder(infile):
+    """
+    Column names from an input file's saOutputOrder, without the leading "-"
+    """
+
+    with open(infile, 'r') as f:
+        for line in f:
+            if line.startswith("saOutputOrder"):
+                names = line.split("#")[0].split()[1:]
+                return [name.lstrip("-") for name in names]
+
+    raise ValueError("No saOutputOrder in %s" % infile)
+# end function
+
+
+def findOutputOrder(path):
+    """
+    saOutputOrder of the body that wrote forward file path, e.g.
+    bintides.secondary.forward, found in the input file in the same directory
+    whose sName is secondary
+    """
+
+    directory = os.path.dirname(os.path.realpath(path))
+    body = os.path.basename(path).split(".")[-2]
+
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".in"):
+            continue
+        with open(os.path.join(directory, name), 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 1 and fields[0] == "sName":
+                    if fields[1] == body:
+                        return outputOrder(os.path.join(directory, name))
+                    break
+
+    raise ValueError("No input file with sName %s next to %s" % (body, path))
+# end function
+
+
+def forwardPath(path):
+    """
+    The forward file at path, or its compacted copy if only that exists
+    """
+
+    if not os.path.exists(path) and os.path.exists(path + compact_ext):
+        return path + compact_ext
+    return path
+# end function
+
+
+def isCompact(path):
+    """
+    Whether path is a compacted forward file
+    """
+    return path.endswith(compact_ext)
+# end function
+
+
+def _readCompact(path, names=None):
+    """
+    Read a compacted forward file as readForward would the text file
+    """
+
+    with np.load(path) as data:
+        if names is None:
+            names = data.files
+        dtype = np.dtype([(name, np.float64) for name in names])
+        columns = [data[name] for name in data.files]
+
+    table = np.empty(len(columns[0]) if columns else 0, dtype=dtype)
+    for name, column in zip(names, columns):
+        table[name] = column
+
+    return table
+# end function
+
+
+def readForward(path, names=None):
+    """
+    Read a vplanet forward file.
+
+    Parameters
+    ----------
+    path : str
+        Forward file, e.g. simulation_0/bintides.primary.forward. Its
+        compacted copy is read if the text file is gone.
+    names : list, optional
+        Column names, in order. Defaults to None, i.e. use the saOutputOrder
+        of the body's input file in the same directory, or the names stored
+        in a compacted file.
+
+    Returns
+    -------
+    data : numpy structured array
+        One float64 record per output step, with a field per column
+
+    A partially written last line, e.g. from a run still in progress, is
+    dropped.
+    """
+
+    path = forwardPath(path)
+    if isCompact(path):
+        return _readCompact(path, names=names)
+
+    if names is None:
+        names = findOutputOrder(path)
+
+    dtype = np.dtype([(name, np.float64) for name in names])
+
+    # Does the file end with a complete row?
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return np.empty(0, dtype=dtype)
+        f.seek(-1, os.SEEK_END)
+        complete = f.read(1) == b"\n"
+
+        # Drop an incomplete final row
+        if not complete:
+            f.seek(0)
+            text = f.read()
+            text = text[:text.rfind(b"\n") + 1]
+            if not text:
+                return np.empty(0, dtype=dtype)
+            path = io.BytesIO(text)
+
+    return np.loadtxt(path, dtype=dtype, ndmin=1)
+# end function
+
+
+def readForwardArray(path):
+    """
+    A forward file, text or compacted, as a (rows, columns) float array, as
+    np.genfromtxt would read the text file
+    """
+
+    path = forwardPath(path)
+    if not isCompact(path):
+        # Columns are only known by position
+        with open(path, 'rb') as f:
+            names = ["c%d" % ii for ii in range(len(f.readline().split()))]
+    else:
+        names = None
+
+    data = readForward(path, names=names)
+    return data.view(np.float64).reshape(len(data), len(data.dtype.names))
+# end function
+
+
+def compactForward(path, names=None, remove=True):
+    """
+    Replace a forward file with its compressed, columnar copy.
+
+    Parameters
+    ----------
+    path : str
+        Forward file, e.g. simulation_0/bintides.primary.forward
+    names : list, optional
+        Column names, see readForward
+    remove : bool, optional
+        Delete the text file once the copy is written. Defaults to True.
+
+    Returns
+    -------
+    compact : str
+        Path of the compacted file, path + ".npz"
+    """
+
+    data = readForward(path, names=names)
+    compact = path + compact_ext
+
+    # Write under a temporary name so a crash never leaves a partial copy
+    tmp = compact + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **{name : data[name] for name in data.dtype.names})
+    os.replace(tmp, compact)
+
+    if remove:
+        os.remove(path)
+
+    return compact
+# end function
+
+
+def _parseLine(line, dtype):
+    """
+    One forward file row as a structured record
+    """
+    return np.array(line.split(), dtype=np.float64).view(dtype)[0]
+# end function
+
+
+def _lastLine(f, size, chunk=4096):
+    """
+    Offset and text of the last complete row of an open forward file
+    """
+
+    while True:
+        start = max(0, size - chunk)
+        f.seek(start)
+        text = f.read(size - start)
+
+        # Drop an incomplete final row
+        text = text[:text.rfind(b"\n") + 1]
+        lineStart = text.rfind(b"\n", 0, len(text) - 1) + 1
+        if lineStart > 0 or start == 0:
+            return start + lineStart, text[lineStart:]
+        chunk *= 2
+# end function
+
+
+def interpolateRecord(r0, r1, age, logNames=()):
+    """
+    Record at age, linearly interpolated in time between records r0 and r1.
+    Columns in logNames, e.g. RotPer, are interpolated in log space when both
+    values are positive.
+    """
+
+    dt = r1["Time"] - r0["Time"]
+    weight = np.clip((age - r0["Time"])/dt, 0.0, 1.0) if dt > 0 else 0.0
+
+    record = r0.copy()
+    for name in r0.dtype.names:
+        v0, v1 = r0[name], r1[name]
+        if name in logNames and v0 > 0 and v1 > 0:
+            record[name] = np.exp(np.log(v0) + weight*(np.log(v1) - np.log(v0)))
+        else:
+            record[name] = v0 + weight*(v1 - v0)
+
+    return record
+# end function
+
+
+def _rowNear(f, age, lo, hi, dtype, block=8192, interpolate=False, logNames=()):
+    """
+    Row of an open forward file whose Time is closest to age, or interpolated
+    to age, found by bisecting the byte offsets between the rows starting at
+    lo and hi
+    """
+
+    # Bisect until the candidate rows fit in one small read.  Rows at lo have
+    # Time < age, rows at hi have Time >= age.
+    while hi - lo > block:
+        mid = (lo + hi)//2
+        f.seek(mid)
+        f.readline()
+        pos = f.tell()
+        if pos >= hi:
+            break
+        if _parseLine(f.readline(), dtype)["Time"] < age:
+            lo = pos
+        else:
+            hi = pos
+
+    # Scan every row from lo through hi
+    f.seek(lo)
+    text = f.read(hi - lo)
+    text += f.readline()
+    rows = np.loadtxt(io.BytesIO(text), dtype=dtype, ndmin=1)
+
+    if interpolate and len(rows) > 1:
+        # Rows bracketing age
+        jj = np.clip(np.searchsorted(rows["Time"], age, side="right") - 1, 0, len(rows) - 2)
+        return interpolateRecord(rows[jj], rows[jj+1], age, logNames=logNames)
+
+    return rows[np.argmin(np.fabs(age - rows["Time"]))]
+# end function
+
+
+def _extractArray(data, age, interpolate=False, logNames=()):
+    """
+    extractRows for a forward file already in memory
+    """
+
+    first, last = data[0], data[-1]
+
+    def rowAt(t):
+        if t <= first["Time"]:
+            return first
+        if interpolate and len(data) > 1:
+            jj = np.clip(np.searchsorted(data["Time"], t, side="right") - 1, 0, len(data) - 2)
+            return interpolateRecord(data[jj], data[jj+1], t, logNames=logNames)
+        return data[np.argmin(np.fabs(t - data["Time"]))]
+    # end function
+
+    if np.ndim(age) == 0:
+        atAge = rowAt(age)
+    else:
+        atAge = np.array([rowAt(t) for t in np.ravel(age)],
+                         dtype=data.dtype).reshape(np.shape(age))
+
+    return first, atAge, last
+# end function
+
+
+def extractRows(path, age, names=None, interpolate=False, logNames=()):
+    """
+    First row, row at age and last row of a forward file, without
+    reading the whole file: the first row is read from the start, the last
+    from the end, and the Time column, which vplanet writes in increasing
+    order, is bisected by file offset to find the row at age.
+
+    Parameters
+    ----------
+    path : str
+        Forward file, e.g. simulation_0/bintides.primary.forward, or its
+        compacted copy, which is read whole
+    age : float or array
+        Time(s) [yr] of the middle row(s)
+    names : list, optional
+        Column names, see readForward
+    interpolate : bool, optional
+        Interpolate the row at age between the two rows bracketing it instead
+        of taking the row closest to it. Defaults to False.
+    logNames : tuple, optional
+        Columns interpolated in log space, e.g. ("RotPer",). Defaults to (),
+        interpolate every column linearly in time.
+
+    Returns
+    -------
+    first, atAge, last : numpy structured records
+        First row, row(s) at age, and last complete row. Without interpolate,
+        these match readForward(path)[0], [argmin(|age - Time|)] and [-1].
+        Ages outside the output times get the first or last row.
+    """
+
+    path = forwardPath(path)
+    if isCompact(path):
+        data = _readCompact(path, names=names)
+        if len(data) == 0:
+            raise ValueError("%s has no complete rows" % path)
+        return _extractArray(data, age, interpolate=interpolate, logNames=logNames)
+
+    if names is None:
+        names = findOutputOrder(path)
+    dtype = np.dtype([(name, np.float64) for name in names])
+
+    with open(path, 'rb') as f:
+        line = f.readline()
+        if not line.endswith(b"\n"):
+            raise ValueError("%s has no complete rows" % path)
+        first = _parseLine(line, dtype)
+        lo = 0
+        hi, line = _lastLine(f, os.fstat(f.fileno()).st_size)
+        last = _parseLine(line, dtype)
+
+        # Before the first output, the nearest row is the first
+        def rowAt(t):
+            if t <= first["Time"]:
+                return first
+            return _rowNear(f, t, lo, hi, dtype, interpolate=interpolate,
+                            logNames=logNames)
+        # end function
+
+        if np.ndim(age) == 0:
+            atAge = rowAt(age)
+        else:
+            atAge = np.array([rowAt(t) for t in np.ravel(age)],
+                             dtype=dtype).reshape(np.shape(age))
+
+    return first, atAge, last
+# end function
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000,
+                        help="Number of output steps in the benchmark file")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of times each reader is timed")
+    args = parser.parse_args()
+
+    # A secondary forward file from the Monte Carlo ensembles
+    names = ["Time", "Semim", "Ecce", "RotPer", "Radius", "RadGyra", "OrbPeriod",
+             "TotEn", "TotAngMom", "EqRotPer"]
+    rng = np.random.default_rng(0)
+    table = rng.uniform(0, 1, size=(args.rows, len(names)))
+    table[:,0] = np.linspace(0, 7.0e9, args.rows)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".forward", delete=False) as f:
+        np.savetxt(f, table, fmt="%.6e", delimiter=" ")
+        tmpfile = f.name
+
+    try:
+        timings = {}
+        for label, reader in (("np.genfromtxt", lambda : np.genfromtxt(tmpfile, delimiter=" ")),
+                              ("readForward", lambda : readForward(tmpfile, names=names))):
+            best = np.inf
+            for _ in range(args.repeat):
+                start = time.time()
+                reader()
+                best = min(best, time.time() - start)
+            timings[label] = best
+            print("%s: %.4lf s for %d rows" % (label, best, args.rows))
+
+        # Same values either way
+        old = np.genfromtxt(tmpfile, delimiter=" ")
+        new = readForward(tmpfile, names=names)
+        assert all(np.array_equal(old[:,ii], new[name]) for ii, name in enumerate(names))
+        print("Speedup: %.1lfx" % (timings["np.genfromtxt"]/timings["readForward"]))
+
+        # Pulling the first, age and last rows, as processMC*.py do
+        ages = rng.uniform(1.0e9, 7.0e9, 100)
+        start = time.time()
+        for age in ages:
+            data = readForward(tmpfile, names=names)
+            data[0], data[np.argmin(np.fabs(age - data["Time"]))], data[-1]
+        full = (time.time() - start)/len(ages)
+        start = time.time()
+        for age in ages:
+            extractRows(tmpfile, age, names=names)
+        seek = (time.time() - start)/len(ages)
+        print("First, age, last rows: readForward %.2lf ms, extractRows %.3lf ms (%.0lfx)" %
+              (1000*full, 1000*seek, full/seek))
+    finally:
+        os.remove(tmpfile)
@@ -0,0 +1,201 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Cheap integrity scan of an ensemble's simulation directories, run before
+processing.  Each directory is classified as
+- complete: a log with its final system properties, and a forward file for
+  every body whose last complete row reaches dStopTime
+- truncated: vplanet started but didn't finish, e.g. the job was killed
+- missing: vplanet never ran, i.e. no log and no forward files
+without parsing any output: forward files are checked by size and by their
+last line, read from the end of the file, and logs by whether the final
+system properties were written.  Compacted forward files (see forward.py)
+count as well as text ones.
+
+The simulations that aren't complete are written to a rerun list, one name per
+line, that executor.py runs with --rerun.
+
+Usage (in the ensemble directory):
+    python integrity.py --workers 28
+    python executor.py --rerun rerun.txt --workers 28
+
+"""
+
+import os
+from ensemble import findSimulations, parseEnsemble
+from executor import systemName
+from forward import _lastLine, forwardPath, isCompact, readForward
+
+rerun_name = "rerun.txt" # Default rerun list file name
+statuses = ("complete", "truncated", "missing") # Directory classifications
+
+
+def _options(path):
+    """
+    {option : [values]} of an input file, without comments
+    """
+
+    options = {}
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split("#")[0].split()
+            if len(fields) > 1:
+                options[fields[0]] = fields[1:]
+
+    return options
+# end function
+
+
+def _lastTime(path):
+    """
+    Time of a forward file's last complete row, None if it has none
+    """
+
+    if isCompact(path):
+        times = readForward(path)["Time"]
+        return times[-1] if len(times) > 0 else None
+
+    with open(path, 'rb') as f:
+        _, line = _lastLine(f, os.fstat(f.fileno()).st_size)
+    if not line:
+        return None
+
+    try:
+        return float(line.split()[0])
+    except (IndexError, ValueError):
+        return None
+# end function
+
+
+def checkSimulation(directory):
+    """
+    Classify a simulation directory without parsing its output.
+
+    Parameters
+    ----------
+    directory : str
+        Simulation directory, e.g. simulation_0
+
+    Returns
+    -------
+    status : str
+        "complete", "truncated" or "missing"
+    reason : str
+        Why a directory isn't complete, "" if it is
+    """
+
+    infile = os.path.join(directory, "vpl.in")
+    if not os.path.exists(infile):
+        return "missing", "no vpl.in"
+
+    sysName = systemName(directory)
+    options = _options(infile)
+    stopTime = float(options.get("dStopTime", ["0"])[0])
+    outputTime = float(options.get("dOutputTime", ["0"])[0])
+
+    # One forward file per body, named by the body's sName
+    bodies = []
+    for name in options.get("saBodyFiles", []):
+        bodyOptions = _options(os.path.join(directory, name))
+        bodies.append(bodyOptions.get("sName", [os.path.splitext(name)[0]])[0])
+
+    logfile = os.path.join(directory, sysName + ".log")
+    forwards = [forwardPath(os.path.join(directory, "%s.%s.forward" % (sysName, body)))
+                for body in bodies]
+    if not os.path.exists(logfile) and not any(os.path.exists(path) for path in forwards):
+        return "missing", "no output"
+
+    # Forward files, by size then by the Time of their last row.  The last
+    # output may fall up to one output interval short of the stop time.
+    for path in forwards:
+        if not os.path.exists(path):
+            return "truncated", "no %s" % os.path.basename(path)
+        if os.path.getsize(path) == 0:
+            return "truncated", "empty %s" % os.path.basename(path)
+        lastTime = _lastTime(path)
+        if lastTime is None:
+            return "truncated", "no complete rows in %s" % os.path.basename(path)
+        if lastTime < stopTime - outputTime:
+            return "truncated", "%s stops at %.3e of %.3e" % (os.path.basename(path),
+                                                              lastTime, stopTime)
+
+    # The log's final system properties are written last
+    if not os.path.exists(logfile):
+        return "truncated", "no %s" % os.path.basename(logfile)
+    with open(logfile, 'rb') as f:
+        if b"FINAL SYSTEM PROPERTIES" not in f.read():
+            return "truncated", "%s has no final properties" % os.path.basename(logfile)
+
+    return "complete", ""
+# end function
+
+
+def scanEnsemble(path, workers=1, report=1000):
+    """
+    Classify every simulation directory in an ensemble.
+
+    Parameters
+    ----------
+    path : str
+        Ensemble directory holding the simulation_N directories
+    workers : int, optional
+        Number of processes checking directories. Defaults to 1.
+    report : int, optional
+        Print progress every report directories. Defaults to 1000.
+
+    Returns
+    -------
+    results : list
+        (simulation name, status, reason) for every directory, in index order
+    """
+
+    names = findSimulations(path)
+    checks = parseEnsemble(checkSimulation, [os.path.join(path, name) for name in names],
+                           workers=workers, report=report)
+
+    return [(name,) + tuple(check) for name, check in zip(names, checks)]
+# end function
+
+
+def writeRerun(results, path):
+    """
+    Write the names of the simulations that aren't complete, one per line, and
+    return how many there are
+    """
+
+    names = [name for name, status, _ in results if status != "complete"]
+    with open(path, 'w') as f:
+        for name in names:
+            f.write(name + "\n")
+
+    return len(names)
+# end function
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.dirname(os.path.realpath(__file__)),
+                        help="Ensemble directory. Defaults to where this script lives")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes checking directories")
+    parser.add_argument("--out", default=None,
+                        help="Rerun list. Defaults to %s in the ensemble directory" % rerun_name)
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print every directory that isn't complete and why")
+    args = parser.parse_args()
+
+    results = scanEnsemble(args.dir, workers=args.workers)
+    if args.verbose:
+        for name, status, reason in results:
+            if status != "complete":
+                print("%s: %s (%s)" % (name, status, reason))
+
+    for status in statuses:
+        print("%s: %d" % (status, sum(result[1] == status for result in results)))
+
+    out = args.out if args.out is not None else os.path.join(args.dir, rerun_name)
+    print("Wrote %d simulations to rerun to %s" % (writeRerun(results, out), out))
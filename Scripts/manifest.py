@@ -0,0 +1,236 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Single-file ensemble manifests.  Instead of writing a simulation_N directory
+and a simulation_N.sh for every system, the setup scripts can write one table
+with a row per system holding every vplanet option that differs from the
+templates.  Columns are named "file/option", e.g. "primary.in/dMass", and hold
+exactly the value that goes in the input file, so runManifest.py can
+materialize any system's input files from the templates without knowing which
+model (CPL, CTL, Single) produced the manifest.  The same layout, restricted to
+numeric options, records every system's initial conditions for processing.
+
+Manifests ending in .parquet are written with pandas' parquet support (requires
+pyarrow), anything else is written as CSV.
+
+"""
+
+import os
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+from vplTemplate import VplTemplate, writtenValue
+from emitter import simulationName
+
+indexName = "System" # Manifest index column: the system number
+
+
+def optionColumn(name, key):
+    """
+    Manifest column holding option key of input file name
+    """
+    return name + "/" + key
+# end function
+
+
+def buildManifest(systemOptions, indices):
+    """
+    Collect every system's options into a manifest.
+
+    Parameters
+    ----------
+    systemOptions : callable
+        systemOptions(ii) returns system ii's options as a dict of dicts,
+        e.g. {"primary.in" : {"dMass" : 0.5}, "vpl.in" : {...}}
+    indices : iterable
+        System indices to include
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        One row per system, indexed by system number
+    """
+
+    rows = []
+    for ii in indices:
+        row = {}
+        for name, options in systemOptions(ii).items():
+            for key, value in options.items():
+                row[optionColumn(name, key)] = value
+        rows.append(row)
+
+    df = pd.DataFrame(rows, index=pd.Index(list(indices), name=indexName))
+    return df
+# end function
+
+
+def buildInitial(systemOptions, indices):
+    """
+    Like buildManifest, but only numeric options, rounded to what is written
+    in the input files.  The processing scripts join on this table instead
+    of scraping every system's input files.
+    """
+
+    def numericOptions(ii):
+        return {name : {key : writtenValue(value) for key, value in options.items()
+                        if not isinstance(value, str)}
+                for name, options in systemOptions(ii).items()}
+    # end function
+
+    return buildManifest(numericOptions, indices)
+# end function
+
+
+def writeManifest(df, path, append=False):
+    """
+    Write a manifest, optionally adding its rows to an existing one.
+    """
+
+    if append and os.path.exists(path):
+        if path.endswith(".parquet"):
+            df = pd.concat([readManifest(path), df])
+        else:
+            df.to_csv(path, mode='a', header=False)
+            return
+
+    if path.endswith(".parquet"):
+        df.to_parquet(path)
+    else:
+        df.to_csv(path)
+# end function
+
+
+def readManifest(path):
+    """
+    Read a manifest written by writeManifest, indexed by system number
+    """
+
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    else:
+        return pd.read_csv(path, index_col=indexName)
+# end function
+
+
+def manifestOptions(row):
+    """
+    Invert buildManifest for one row: group a manifest row's values by input
+    file name
+    """
+
+    options = {}
+    for column, value in row.items():
+        name, key = column.split("/", 1)
+
+        # Empty string cells come back from CSV as NaN
+        if isinstance(value, float) and np.isnan(value):
+            continue
+        if isinstance(value, np.generic):
+            value = value.item()
+        options.setdefault(name, {})[key] = value
+
+    return options
+# end function
+
+
+def materialize(templateDir, row, dest, templates=None):
+    """
+    Write one system's input files into dest.
+
+    Parameters
+    ----------
+    templateDir : str
+        Directory holding the template input files
+    row : pandas.Series or dict
+        The system's manifest row
+    dest : str
+        Directory to write the input files into
+    templates : dict, optional
+        Cache of VplTemplates keyed by file name, filled in as needed so
+        repeated calls only parse each template once
+
+    Returns
+    -------
+    names : list
+        Names of the input files written
+    """
+
+    if templates is None:
+        templates = {}
+
+    names = []
+    for name, options in manifestOptions(row).items():
+        if name not in templates:
+            templates[name] = VplTemplate(os.path.join(templateDir, name))
+        with open(os.path.join(dest, name), 'w') as f:
+            print(templates[name].render(**options), file = f)
+        names.append(name)
+
+    return names
+# end function
+
+
+def runSystem(ii, row, templateDir, ensembleDir, exe="vplanet", timeout=None,
+              tmpdir=None, templates=None, stdout=None, output=None):
+    """
+    Materialize system ii's input files in node-local scratch, run vplanet
+    there, and copy the directory back to simulation_ii in ensembleDir once the
+    run ends, even if it failed, so the log is available for diagnosis.
+
+    Parameters
+    ----------
+    ii : int
+        System number
+    row : pandas.Series or dict
+        The system's manifest row
+    templateDir : str
+        Directory holding the template input files
+    ensembleDir : str
+        Directory where simulation_ii is written
+    exe : str, optional
+        vplanet executable. Defaults to "vplanet".
+    timeout : float, optional
+        Seconds before the run is killed. Defaults to None, no limit.
+    tmpdir : str, optional
+        Scratch directory. Defaults to $TMPDIR or /tmp.
+    templates : dict, optional
+        VplTemplate cache, see materialize
+    stdout : optional
+        Where vplanet's output goes, as for subprocess.run. Defaults to None,
+        i.e. this process' stdout.
+    output : str, optional
+        File in the simulation directory that vplanet's stdout and stderr go
+        to instead, e.g. "vplanet.out". Defaults to None.
+
+    Returns
+    -------
+    status : int
+        vplanet's exit status
+
+    Raises subprocess.TimeoutExpired if the run takes longer than timeout.
+    """
+
+    work_dir = tempfile.mkdtemp(prefix=simulationName(ii) + "_", dir=tmpdir)
+    try:
+        materialize(templateDir, row, work_dir, templates=templates)
+
+        # Run sim command!
+        if output is None:
+            return subprocess.run([exe, "vpl.in"], cwd=work_dir, timeout=timeout,
+                                  stdout=stdout).returncode
+        with open(os.path.join(work_dir, output), 'w') as f:
+            return subprocess.run([exe, "vpl.in"], cwd=work_dir, timeout=timeout,
+                                  stdout=f, stderr=subprocess.STDOUT).returncode
+    finally:
+        # Copy everything back to the shared filesystem in one go
+        dest = os.path.join(ensembleDir, simulationName(ii))
+        if not os.path.exists(dest):
+            os.makedirs(dest)
+        for name in os.listdir(work_dir):
+            shutil.copyfile(os.path.join(work_dir, name), os.path.join(dest, name))
+        shutil.rmtree(work_dir, ignore_errors=True)
+# end function
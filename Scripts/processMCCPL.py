@@ -8,12 +8,43 @@ Oct 2018
 This script parses data from an ensemble of VPLanet CPL/CTL coupled stellar-tidal
 simulations.
 
+Assumptions:
+- Run in the directory the setup script populated, alongside sampler.py,
+  ensemble.py, forward.py, summary.py, vplTemplate.py, manifest.py, vplLog.py
+  and the seed.txt and mcCPL_initial.csv it wrote. Systems missing from the
+  initial conditions table have theirs read from their input files.
+
 """
 
 import os
-import re
 import numpy as np
 import pandas as pd
+import argparse
+from sampler import streamAges, newSeed
+from ensemble import findSimulations, simulationIndex, parseEnsemble, \
+     parseIncremental, readCheckpoint, writeCheckpoint
+from forward import extractRows
+from summary import writeSummary
+from vplTemplate import readOptions
+from manifest import readManifest, optionColumn
+from vplLog import parseLog
+
+# Parse command line arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("--seed", type=int, default=None,
+                    help="Master random seed. Defaults to the seed in seed.txt")
+parser.add_argument("--workers", type=int, default=1,
+                    help="Number of processes used to parse the simulation directories")
+parser.add_argument("--nearest", action="store_true",
+                    help="Take values at age from the nearest output instead of interpolating")
+parser.add_argument("--log-prot", dest="log_prot", action="store_true",
+                    help="Interpolate rotation periods in log space")
+parser.add_argument("--incremental", action="store_true",
+                    help="Only parse simulations that are new or changed since the last run")
+args = parser.parse_args()
+
+# How values at age are extracted from the forward files
+logNames = ("RotPer",) if args.log_prot else ()
 
 # Constants and names
 primary_name = "primary.in"
@@ -22,131 +53,140 @@ logfile_name = "bintides.log"
 primary_out_name = "bintides.primary.forward"
 secondary_out_name = "bintides.secondary.forward"
 YEARSEC = 3.154e+7 # Seconds in a year
-dLowAge = 1.0e9 # Low age limit of 1 Gyr
-dHighAge = 7.0e9 # High limit of 7 Gyr
 PATH = os.path.dirname(os.path.realpath(__file__)) # Run in directory where sim dirs live
-dirs = [] # Container to hold directory names
-ind = None
-
-# Find all simulation directories
-with os.scandir(PATH) as it:
-    print("Finding all simulation directories...")
-    for entry in it:
-        # Only consider simulation directories, ignoring hidden directories
-        if not entry.name.startswith(".") and os.path.isdir(entry.name):
-            dirs.append(entry.name)
-
-# List to store data rows
-table = []
-
-# Extract data in directory
-for ii, directory in enumerate(dirs):
-    print("Parsing directory %d..." % ii)
+seed_name = "seed.txt" # Master random seed written by the setup script
+initial_name = "mcCPL_initial.csv" # Initial conditions written by the setup script
+summary_name = "mcCPLMarch27.csv" # Summary table written by this script
+checkpoint_name = "mcCPLMarch27.checkpoint" # Directory sizes and times at the last run
+
+# Find all simulation directories, in index order
+print("Finding all simulation directories...")
+dirs = findSimulations(PATH)
+
+# Ages are drawn from the same master seed as the initial conditions so any
+# system's age can be recomputed from its index alone.  Ensembles set up
+# before seed.txt existed get a new seed, saved so later runs reuse it.
+if args.seed is not None:
+    seed = args.seed
+elif os.path.exists(os.path.join(PATH, seed_name)):
+    with open(os.path.join(PATH, seed_name), 'r') as f:
+        seed = int(f.read())
+else:
+    seed = newSeed()
+    with open(os.path.join(PATH, seed_name), 'w') as f:
+        f.write("%d\n" % seed)
+    print("WARNING: no %s, drawing ages from new master seed %d, saved to %s. "
+          "Pass --seed to use another." % (seed_name, seed, seed_name))
+
+# Select a random age for each system
+indices = [simulationIndex(directory) for directory in dirs]
+ages = streamAges(seed, indices)
+
+# Initial conditions recorded by the setup script, indexed by system number,
+# so the input files needn't be read back.  NaN for systems it doesn't have.
+ic_cols = [optionColumn(primary_name, "dMass"), optionColumn(primary_name, "dTidalQ"),
+           optionColumn(secondary_name, "dMass"), optionColumn(secondary_name, "dTidalQ")]
+if os.path.exists(os.path.join(PATH, initial_name)):
+    ics = readManifest(os.path.join(PATH, initial_name)).reindex(indices)[ic_cols].values
+else:
+    ics = np.full((len(indices), len(ic_cols)), np.nan)
+
+### Helper functions ###
+def parseDirectory(item):
+    """
+    Extract one row of the summary table from a (directory, age, initial
+    conditions) triple
+    """
+
+    directory, dAge, ic = item
 
     # List to hold this sim's data (row in df)
     tmp = []
 
-    # Read in mass, tidal Q from primary input file
-    with open(os.path.join(directory, primary_name), 'r') as f:
-        primary_in = f.read()
-
-        # Find the line where dMass lives, remove whitespace, make it a float
-        dMass = re.findall('%s(.*?)#' % 'dMass', primary_in)[0]
-        dMass = float("".join(dMass.split()))
-        tmp.append(dMass)
-
-        # Find the line where dTidalQ lives, remove whitespace, make it a float
-        dTidalQ = re.findall('%s(.*?)#' % 'dTidalQ', primary_in)[0]
-        dTidalQ = float("".join(dTidalQ.split()))
-        tmp.append(dTidalQ)
-
-    # Read in mass from secondary input file
-    with open(os.path.join(directory, secondary_name), 'r') as f:
-        secondary_in = f.read()
+    # Initial conditions, scraped from the input files only if the setup
+    # script's table doesn't have them
+    if np.any(np.isnan(ic)):
+        ic = readOptions(os.path.join(directory, primary_name), ["dMass", "dTidalQ"]) + \
+             readOptions(os.path.join(directory, secondary_name), ["dMass", "dTidalQ"])
+    tmp.extend(ic)
 
-        # Find the line where dMass lives, remove whitespace, make it a float
-        dMass2 = re.findall('%s(.*?)#' % 'dMass', secondary_in)[0]
-        dMass2 = float("".join(dMass2.split()))
-        tmp.append(dMass2)
-
-        # Find the line where dTidalQ lives, remove whitespace, make it a float
-        dTidalQ2 = re.findall('%s(.*?)#' % 'dTidalQ', secondary_in)[0]
-        dTidalQ2 = float("".join(dTidalQ2.split()))
-        tmp.append(dTidalQ2)
-
-    # Pull LockTimes out of logfile
-    with open(os.path.join(os.path.join(directory, logfile_name)), 'r') as f:
-        logfile_in = f.read()
-
-    matches = []
-    for line in logfile_in.split("\n"):
-        if line.startswith("(LockTime)"):
-            matches.append((line.split()[-1]))
+    # Pull LockTimes [s] out of the logfile's final system properties, -1 yr
+    # if the run didn't finish
+    final = parseLog(os.path.join(directory, logfile_name), keys=["LockTime"],
+                     stages=["FINAL"], bodies=["primary", "secondary"]).get("FINAL", {})
 
     # Convert lock times to years
-    if len(matches) > 2:
-        dLockTime1 = float(matches[2])/YEARSEC
-        dLockTime2 = float(matches[3])/YEARSEC
-    else:
-        dLockTime1 = -1
-        dLockTime2 = -1
+    dLockTime1 = final.get("primary", {}).get("LockTime", -YEARSEC)/YEARSEC
+    dLockTime2 = final.get("secondary", {}).get("LockTime", -YEARSEC)/YEARSEC
 
     tmp.append(dLockTime1)
     tmp.append(dLockTime2)
 
-    # Select a random age for this system
-    dAge = np.random.uniform(low=dLowAge, high=dHighAge)
-
     # Save age
     tmp.append(dAge)
 
     # Read in simulation data
     # saOutputOrder Time -Radius -RotPer RadGyra # Output order
-    data = np.genfromtxt(os.path.join(directory,primary_out_name), delimiter=" ")
-
-    # Find row close enough to age
-    ind = np.argmin(np.fabs(dAge-data[:,0]))
+    # Only the first row, the rows around age and the last row are read
+    first, atAge, last = extractRows(os.path.join(directory,primary_out_name), dAge,
+                                     interpolate=not args.nearest, logNames=logNames)
 
     # Save initial rotation period
-    tmp.append(data[0,2])
+    tmp.append(first["RotPer"])
 
     # Extract rotation period at Age [units == days]
-    tmp.append(data[ind,2])
+    tmp.append(atAge["RotPer"])
 
     # Save final rotation period at end of simulation, 7 Gyr
-    tmp.append(data[-1,2])
+    tmp.append(last["RotPer"])
 
     # Read in simulation data for secondary star
     # saOutputOrder	Time Semim Ecce -RotPer -Radius RadGyra -OrbPeriod -TotEn
     # -TotAngMom -EqRotPer #Output order
-    data = np.genfromtxt(os.path.join(directory,secondary_out_name), delimiter=" ")
+    first, atAge, last = extractRows(os.path.join(directory,secondary_out_name), dAge,
+                                     interpolate=not args.nearest, logNames=logNames)
 
     # Save initial rotation period
-    tmp.append(data[0,3])
+    tmp.append(first["RotPer"])
 
     # Extract rotation period at age [units == days]
-    tmp.append(data[ind,3])
+    tmp.append(atAge["RotPer"])
 
     # Save final rotation period at end of simulation
-    tmp.append(data[-1,3])
+    tmp.append(last["RotPer"])
 
     # Save initial, final ecc, ecc at age
-    tmp.append(data[0,2])
-    tmp.append(data[-1,2])
-    tmp.append(data[ind,2])
+    tmp.append(first["Ecce"])
+    tmp.append(last["Ecce"])
+    tmp.append(atAge["Ecce"])
 
     # Save initial, final Porb, Porb at age
-    tmp.append(data[0,6])
-    tmp.append(data[-1,6])
-    tmp.append(data[ind,6])
+    tmp.append(first["OrbPeriod"])
+    tmp.append(last["OrbPeriod"])
+    tmp.append(atAge["OrbPeriod"])
 
     # Save initial, final Peq, Peq at age
-    tmp.append(data[0,9])
-    tmp.append(data[-1,9])
-    tmp.append(data[ind,9])
-
-    # Save row
-    table.append(tmp)
+    tmp.append(first["EqRotPer"])
+    tmp.append(last["EqRotPer"])
+    tmp.append(atAge["EqRotPer"])
+
+    return tmp
+# end function
+
+
+# Extract data in every directory, rows in index order
+items = list(zip(dirs, ages, ics))
+if args.incremental:
+    # Reuse the last run's rows for directories that haven't changed since
+    options = {"seed" : seed, "nearest" : args.nearest, "log_prot" : args.log_prot}
+    previous = None
+    if os.path.exists(summary_name):
+        previous = pd.read_csv(summary_name, float_precision="round_trip")
+    table, checkpoint = parseIncremental(parseDirectory, dirs, items, previous,
+                                         readCheckpoint(checkpoint_name),
+                                         options=options, workers=args.workers)
+else:
+    table = parseEnsemble(parseDirectory, items, workers=args.workers)
 
 # Make df with the following columns:
 headers = ["Pri_dMass", "Pri_dTidaLQ", "Sec_dMass", "Sec_dTidalQ", "Pri_LockTime", "Sec_LockTime", "Age"]
@@ -161,7 +201,9 @@ df = pd.DataFrame(table, columns=headers)
 print(df.head(5))
 
 # Save it!
-df.to_csv("mcCPLMarch27.csv", header=True, index=False)
+writeSummary(df, summary_name)
+if args.incremental:
+    writeCheckpoint(checkpoint_name, checkpoint)
 
 # Finished!
 print("Done!")
@@ -0,0 +1,190 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Observe every system in an ensemble at many ages instead of one.  The
+processing scripts assign each system a single random age; given the full time
+series packed by cube.py, this draws K ages per system, or takes any ages at
+all, and interpolates the rotation period, orbital period, eccentricity, etc.
+at all of them in one vectorized pass, giving K times the effective sample size
+from the same vplanet runs.
+
+Usage (in the ensemble directory, after running cube.py):
+    python resample.py --num 10 --out mcCPL_resampled.csv
+
+"""
+
+import numpy as np
+import pandas as pd
+from sampler import sampleAge, blockRng, resampleStream
+
+# Output column: (body, forward file column), named as in the processMC*.py
+# summaries
+summaryColumns = {"Pri_ProtAge" : ("primary", "RotPer"),
+                  "Sec_ProtAge" : ("secondary", "RotPer"),
+                  "Age_Ecc" : ("secondary", "Ecce"),
+                  "Age_Porb" : ("secondary", "OrbPeriod"),
+                  "Age_Peq" : ("secondary", "EqRotPer")}
+
+
+def interpolateRows(times, values, lengths, ages, log=False):
+    """
+    Linearly interpolate many time series at many ages at once.
+
+    Parameters
+    ----------
+    times : array
+        (systems, steps) output times, increasing along each row. Entries past
+        a row's length are ignored.
+    values : array
+        (systems, steps) values to interpolate
+    lengths : array
+        Number of valid steps in each row
+    ages : array
+        (systems, K) ages at which to evaluate each row
+    log : bool, optional
+        Interpolate log(values), e.g. for rotation periods. Defaults to False.
+
+    Returns
+    -------
+    result : array
+        (systems, K) interpolated values. Ages outside a row's output times
+        get its first or last value; rows without output give NaN.
+    """
+
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    lengths = np.asarray(lengths)
+    ages = np.asarray(ages, dtype=float)
+    num, steps = times.shape
+    last = np.maximum(lengths - 1, 0)
+
+    # Pad every row with its last time so each row stays sorted, and rows
+    # without output, whose times are all NaN, with the earliest time, then
+    # offset the rows so one searchsorted over the flattened array handles
+    # them all
+    col = np.arange(steps)
+    padded = np.where(col < lengths[:,None], times, times[np.arange(num), last][:,None])
+    tmin, span = 0.0, 1.0
+    if np.any(lengths > 0):
+        tmin = np.min(padded[lengths > 0])
+        span = np.max(padded[lengths > 0]) - tmin + 1.0
+    padded[lengths == 0] = tmin
+    offset = np.arange(num)[:,None]*span
+    keys = (padded - tmin + offset).ravel()
+    query = np.clip(ages - tmin, 0.0, span - 1.0) + offset
+
+    # Bracketing rows, kept inside each row's valid steps
+    lo = np.searchsorted(keys, query, side="right") - 1 - np.arange(num)[:,None]*steps
+    lo = np.clip(lo, 0, np.maximum(lengths - 2, 0)[:,None])
+    hi = np.minimum(lo + 1, last[:,None])
+
+    rows = np.arange(num)[:,None]
+    t0 = times[rows, lo]
+    t1 = times[rows, hi]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(t1 > t0, (ages - t0)/(t1 - t0), 0.0)
+    weight = np.clip(weight, 0.0, 1.0)
+
+    v0 = values[rows, lo]
+    v1 = values[rows, hi]
+    if log:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.exp(np.log(v0) + weight*(np.log(v1) - np.log(v0)))
+    else:
+        result = v0 + weight*(v1 - v0)
+    result[lengths == 0] = np.nan
+    return result
+# end function
+
+
+def resampleEnsemble(cube, ages, columns=summaryColumns, logColumns=(), chunk=10000):
+    """
+    Evaluate an ensemble's time series at many ages per system.
+
+    Parameters
+    ----------
+    cube : cube.Cube
+        The ensemble's packed forward output
+    ages : array
+        Ages [yr], either (K,) for the same ages for every system or
+        (systems, K)
+    columns : dict, optional
+        Output column name: (body, forward file column). Columns for bodies
+        the cube doesn't have are skipped. Defaults to summaryColumns.
+    logColumns : tuple, optional
+        Output columns interpolated in log space, e.g. ("Pri_ProtAge",
+        "Sec_ProtAge"). Defaults to ().
+    chunk : int, optional
+        Number of systems interpolated at once. Defaults to 10000.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        One row per system and age, with the System number, the Age, and the
+        requested columns
+    """
+
+    num = len(cube.systems)
+    ages = np.asarray(ages, dtype=float)
+    if ages.ndim == 1:
+        ages = np.broadcast_to(ages, (num, len(ages)))
+    columns = {name : source for name, source in columns.items() if source[0] in cube.columns}
+
+    out = {name : np.empty(ages.shape) for name in columns}
+    for start in range(0, num, chunk):
+        stop = min(start + chunk, num)
+        for name, (body, column) in columns.items():
+            out[name][start:stop] = interpolateRows(cube.column(body, "Time")[start:stop],
+                                                    cube.column(body, column)[start:stop],
+                                                    cube.lengths[body][start:stop],
+                                                    ages[start:stop],
+                                                    log=name in logColumns)
+
+    df = pd.DataFrame({"System" : np.repeat(cube.systems, ages.shape[1]),
+                       "Age" : ages.ravel()})
+    for name in columns:
+        df[name] = out[name].ravel()
+
+    return df
+# end function
+
+
+def drawAges(num, k, seed, sampleFn=sampleAge):
+    """
+    (num, k) ages drawn with sampleFn, e.g. sampler.sampleAge or a
+    functools.partial of sampler.sampleAgeHistory, from the master seed's
+    resampling stream
+    """
+    return sampleFn(num*k, rng=blockRng(seed, 0, resampleStream))["Age"].reshape(num, k)
+# end function
+
+
+if __name__ == "__main__":
+    import argparse
+    from cube import Cube, cube_name
+    from summary import writeSummary
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cube", default=cube_name, help="Cube directory written by cube.py")
+    parser.add_argument("--num", type=int, default=10, help="Number of ages per system")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Master random seed. Defaults to the seed in seed.txt")
+    parser.add_argument("--out", default="resampled.csv", help="Output summary file")
+    parser.add_argument("--log-prot", dest="log_prot", action="store_true",
+                        help="Interpolate rotation periods in log space")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        seed = args.seed
+    else:
+        with open("seed.txt", 'r') as f:
+            seed = int(f.read())
+
+    cube = Cube(args.cube)
+    ages = drawAges(len(cube.systems), args.num, seed)
+    logColumns = ("Pri_ProtAge", "Sec_ProtAge") if args.log_prot else ()
+    df = resampleEnsemble(cube, ages, logColumns=logColumns)
+    print(df.head(5))
+    writeSummary(df, args.out)
@@ -0,0 +1,138 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Run an ensemble with vplIntegrator.py's batched engine in one process instead
+of one vplanet process per simulation.  Simulations are read, grouped by
+layout and evolved up to --batch at a time in lockstep arrays (see
+vplIntegrator.Ensemble), and each one's forward files and log are written as
+soon as it finishes.  Batches can be spread over worker processes.
+
+Like executor.py, simulations whose outputs are already complete are skipped
+unless --no-resume is given, and --rerun restricts the run to the simulations
+a rerun list, e.g. from integrity.py, names.  --stiff steps spins near
+synchronous rotation with vplIntegrator's stiff tidal torque.
+
+A simulation whose input files can't be read fails on its own, and the rest
+of its batch runs.  The simulations that failed or halted are written to a
+rerun list, --failures, for runBatch.py or executor.py --rerun, which is
+removed after a run without failures.
+
+Usage (in the ensemble directory):
+    python runBatch.py --batch 1000
+    python runBatch.py --rerun rerun.txt
+    python runBatch.py --stiff
+    python runBatch.py --rerun failures.txt
+
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from ensemble import findSimulations
+from executor import outputsComplete
+from vplIntegrator import Simulation, runSimulations
+
+
+failures_name = "failures.txt" # Default rerun list of failed simulations
+
+# Run settings inherited by forked workers
+_job = {"stiff" : False}
+
+
+def runDirectories(directories):
+    """
+    Evolve a batch of simulation directories together, returning the
+    directories that didn't run to their dStopTime, including those whose
+    inputs couldn't be read
+    """
+
+    sims = []
+    failed = []
+    for directory in directories:
+        try:
+            sims.append(Simulation(os.path.join(directory, "vpl.in")))
+        except Exception as e:
+            print("ERROR reading %s: %s(%s)" % (directory, type(e).__name__, e))
+            failed.append(directory)
+    if not sims:
+        return failed
+
+    try:
+        ok = runSimulations(sims, batch=len(sims), stiff=_job["stiff"])
+    except Exception as e:
+        print("ERROR evolving batch of %s: %s(%s)" % (sims[0].directory, type(e).__name__, e))
+        ok = [False]*len(sims)
+    failed.extend(sim.directory for sim, finished in zip(sims, ok) if not finished)
+
+    return failed
+# end function
+
+
+if __name__ == "__main__":
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.dirname(os.path.realpath(__file__)),
+                        help="Ensemble directory. Defaults to where this script lives")
+    parser.add_argument("--batch", type=int, default=1000,
+                        help="Maximum number of simulations evolved together")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes evolving batches")
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="Rerun everything, ignoring existing outputs")
+    parser.add_argument("--rerun", default=None,
+                        help="Only rerun the simulations named in this file, e.g. from integrity.py")
+    parser.add_argument("--stiff", action="store_true",
+                        help="Step spins near synchronous rotation with the stiff tidal torque")
+    parser.add_argument("--failures", default=None,
+                        help="Rerun list of the simulations that failed. Defaults to %s in the "
+                             "ensemble directory" % failures_name)
+    args = parser.parse_args()
+    _job.update(stiff=args.stiff)
+
+    path = os.path.realpath(args.dir)
+    names = findSimulations(path)
+
+    # Rerun exactly the listed simulations, however far they got before
+    resume = args.resume
+    if args.rerun is not None:
+        with open(args.rerun, 'r') as f:
+            listed = set(line.strip() for line in f if line.strip())
+        names = [name for name in names if name in listed]
+        resume = False
+
+    dirs = [os.path.join(path, name) for name in names]
+    if resume:
+        dirs = [directory for directory in dirs if not outputsComplete(directory)]
+
+    start = time.time()
+    batches = [dirs[ii:ii + args.batch] for ii in range(0, len(dirs), args.batch)]
+    failures = []
+    with mp.get_context("fork").Pool(max(args.workers, 1)) as pool:
+        for ii, failed in enumerate(pool.imap(runDirectories, batches), 1):
+            failures.extend(failed)
+            print("Finished batch %d/%d: %d simulations in %.1lf s" %
+                  (ii, len(batches), sum(len(batch) for batch in batches[:ii]),
+                   time.time() - start))
+            sys.stdout.flush()
+    wall = time.time() - start
+
+    print("Simulations: %d total, %d skipped, %d ok, %d failed" %
+          (len(names), len(names) - len(dirs), len(dirs) - len(failures), len(failures)))
+    print("Wall time: %.1lf s, throughput: %.1lf simulations/hr" %
+          (wall, len(dirs)/wall*3600.0 if wall > 0 else 0.0))
+
+    # Replace, or remove, the previous run's rerun list
+    out = args.failures if args.failures is not None else os.path.join(path, failures_name)
+    if failures:
+        with open(out, 'w') as f:
+            f.writelines(os.path.basename(directory) + "\n" for directory in failures)
+        print("Wrote %d failed simulations to %s" % (len(failures), out))
+    elif os.path.exists(out):
+        os.remove(out)
+
+    sys.exit(1 if failures else 0)
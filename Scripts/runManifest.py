@@ -0,0 +1,72 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Generic runner for ensembles set up with --manifest.  For each requested
+system, this script materializes the input files from the manifest row and the
+templates into a node-local temporary directory, runs vplanet there, and copies
+the results to simulation_N in the ensemble directory.  Nothing is written to
+the shared filesystem until the run finishes.
+
+Usage:
+    python runManifest.py mcCPL_manifest.csv --index 17
+    python runManifest.py mcCPL_manifest.csv --start 0 --stop 1000
+
+If neither --index nor --start/--stop is given, the system number is taken
+from SLURM_ARRAY_TASK_ID.
+
+Assumptions:
+- Template files, vplTemplate.py, emitter.py and manifest.py live in the
+  directory where this script exists.
+
+"""
+
+import os
+import sys
+import argparse
+from manifest import readManifest, runSystem
+from emitter import simulationName
+
+# Parse command line arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("manifest", help="Manifest written by a setup script")
+parser.add_argument("--index", type=int, nargs="*", default=None,
+                    help="System number(s) to run")
+parser.add_argument("--start", type=int, default=None,
+                    help="First system number to run")
+parser.add_argument("--stop", type=int, default=None,
+                    help="Run systems up to, but not including, this number")
+parser.add_argument("--tmpdir", default=None,
+                    help="Node-local scratch directory. Defaults to $TMPDIR or /tmp")
+parser.add_argument("--exe", default="vplanet", help="vplanet executable")
+args = parser.parse_args()
+
+# Constants
+PATH = os.path.dirname(os.path.realpath(__file__)) # Templates live here
+ensemble_dir = os.path.dirname(os.path.realpath(args.manifest)) # Results go here
+
+# Read the manifest
+df = readManifest(args.manifest)
+
+# Which systems should we run?
+if args.index:
+    indices = args.index
+elif args.start is not None or args.stop is not None:
+    start = args.start if args.start is not None else df.index.min()
+    stop = args.stop if args.stop is not None else df.index.max() + 1
+    indices = [ii for ii in df.index if start <= ii < stop]
+else:
+    indices = [int(os.environ["SLURM_ARRAY_TASK_ID"])]
+
+templates = {} # Each template is only parsed once
+failed = 0
+for ii in indices:
+    status = runSystem(ii, df.loc[ii], PATH, ensemble_dir, exe=args.exe,
+                       tmpdir=args.tmpdir, templates=templates)
+    if status != 0:
+        print("%s failed with exit status %d" % (simulationName(ii), status),
+              file=sys.stderr)
+        failed += 1
+
+sys.exit(1 if failed > 0 else 0)
@@ -0,0 +1,344 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Vectorized samplers for the initial condition priors used by setupMCCPL.py,
+setupMCCTL.py and setupMCSingle.py.  Every function draws all num systems at
+once as numpy arrays so large populations can be generated without a Python
+loop over systems.
+
+All periods are returned in days and are positive.  The setup scripts apply
+the vplanet negative -> days convention when they write the input files.
+
+Populations are reproducible from a single master seed.  Systems are grouped
+into fixed blocks of blockSize indices and every block draws from its own
+independent numpy Generator derived from (seed, stream, block), so any system's
+initial conditions or assigned age can be recomputed by regenerating just its
+block, independent of how many systems or workers were used.
+
+"""
+
+import numpy as np
+
+# Prior bounds
+dLowProt = 0.8 # Low initial rotation period [d] (Matt+2015)
+dHighProt = 15.0 # High initial rotation period [d] (Matt+2015)
+dLowLogQ = 4 # log10 tidal Q lower bound
+dHighLogQ = 8 # log10 tidal Q upper bound
+dLowLogTau = -2 # log10 tidal tau [s] lower bound
+dHighLogTau = 1 # log10 tidal tau [s] upper bound
+dTauUnit = 3.171e-8 # 1 s in years, the vplanet time unit for dTidalTau
+dLowMass = 0.1 # Low stellar mass [Msun]
+dHighMass = 1.0 # High stellar mass [Msun]
+dLowQ = 0.1 # Low mass ratio
+dHighQ = 1.0 # High mass ratio
+dLowEcc = 0.0 # Low eccentricity
+dHighEcc = 0.3 # High eccentricity
+dLowPorb = 3.0 # Low orbital period [d]
+dHighPorb = 100.0 # High orbital period [d]
+dLowAge = 1.0e9 # Low age limit of 1 Gyr
+dHighAge = 7.0e9 # High limit of 7 Gyr
+
+# Random streams
+blockSize = 1024 # Number of systems that share one Generator
+icStream = 0 # Stream for initial conditions
+ageStream = 1 # Stream for ages assigned when processing
+resampleStream = 2 # Stream for extra ages drawn when resampling an ensemble
+
+
+def lognuniform(low=0, high=1, size=None, base=10.0, rng=np.random):
+    """
+    Draw samples uniformly distributed in log_base over [low, high)
+    """
+    return np.power(base, rng.uniform(low, high, size))
+# end function
+
+
+def sampleRotPeriod(num, rng=np.random):
+    """
+    Loguniform initial rotation period prior over [0.8, 15] days (Matt+2015)
+    """
+    return lognuniform(low=np.log10(dLowProt), high=np.log10(dHighProt),
+                       size=num, rng=rng)
+# end function
+
+
+def sampleTidalQ(num, rng=np.random):
+    """
+    Loguniform prior for 10^4 - 10^8 for tidal Q
+    """
+    return lognuniform(low=dLowLogQ, high=dHighLogQ, size=num, rng=rng)
+# end function
+
+
+def sampleTidalTau(num, rng=np.random):
+    """
+    Loguniform prior for 1.0e-2 - 10 s for tidal tau, returned in years
+    """
+    return lognuniform(low=dLowLogTau, high=dHighLogTau, size=num,
+                       rng=rng)*dTauUnit
+# end function
+
+
+def sampleMass(num, rng=np.random):
+    """
+    Mass is uniformly sampled over [0.1, 1.0]
+    """
+    return rng.uniform(low=dLowMass, high=dHighMass, size=num)
+# end function
+
+
+def sampleSecondaryMass(dMass, rng=np.random):
+    """
+    Pick secondary masses using a uniform mass ratio distribution over
+    [0.1, 1.0] following Moe & Kratter (2018) assumption, requiring that the
+    secondary mass is at least 0.1 Msun.
+
+    Rejecting mass ratios with dMass*q < 0.1 leaves q uniform over
+    [0.1/dMass, 1.0], so we draw from that interval directly.  This matches the
+    old per-system rejection loop in distribution without its unbounded number
+    of redraws for primaries near 0.1 Msun.
+
+    Parameters
+    ----------
+    dMass : array
+        Primary masses [Msun]
+    rng : numpy.random.RandomState or numpy.random.Generator, optional
+        Source of random numbers. Defaults to the global numpy state.
+
+    Returns
+    -------
+    dMass2 : array
+        Secondary masses [Msun], all >= 0.1
+    """
+
+    dMass = np.asarray(dMass, dtype=float)
+    qLow = np.maximum(dLowQ, dLowMass/dMass)
+    q = rng.uniform(low=qLow, high=dHighQ, size=dMass.shape)
+
+    # Guard against round off pushing a secondary just below the minimum
+    return np.maximum(dMass*q, dLowMass)
+# end function
+
+
+def sampleEcc(num, rng=np.random):
+    """
+    Uniform eccentricity prior for [0.0,0.3)
+    """
+    return rng.uniform(low=dLowEcc, high=dHighEcc, size=num)
+# end function
+
+
+def sampleOrbPeriod(num, rng=np.random):
+    """
+    Uniform orbital period prior from [3.0,100.0) days
+    """
+    return rng.uniform(low=dLowPorb, high=dHighPorb, size=num)
+# end function
+
+
+def sampleBinary(num, tideModel="CPL", rng=np.random):
+    """
+    Draw the initial conditions for num binaries at once.
+
+    Parameters
+    ----------
+    num : int
+        Number of systems
+    tideModel : str, optional
+        "CPL" samples tidal Q, "CTL" samples tidal tau. Defaults to "CPL".
+    rng : numpy.random.RandomState or numpy.random.Generator, optional
+        Source of random numbers. Defaults to the global numpy state.
+
+    Returns
+    -------
+    samples : dict
+        Arrays of length num keyed by body prefix and vplanet option name,
+        e.g. "Pri_dMass", "Sec_dOrbPeriod"
+    """
+
+    if tideModel == "CPL":
+        tidalName = "dTidalQ"
+        sampleTidal = sampleTidalQ
+    elif tideModel == "CTL":
+        tidalName = "dTidalTau"
+        sampleTidal = sampleTidalTau
+    else:
+        raise ValueError("Unknown tideModel: %s. Options: CPL, CTL" % tideModel)
+
+    samples = {}
+    samples["Pri_dRotPeriod"] = sampleRotPeriod(num, rng=rng)
+    samples["Pri_" + tidalName] = sampleTidal(num, rng=rng)
+    samples["Pri_dMass"] = sampleMass(num, rng=rng)
+    samples["Sec_dRotPeriod"] = sampleRotPeriod(num, rng=rng)
+    samples["Sec_" + tidalName] = sampleTidal(num, rng=rng)
+    samples["Sec_dMass"] = sampleSecondaryMass(samples["Pri_dMass"], rng=rng)
+    samples["Sec_dEcc"] = sampleEcc(num, rng=rng)
+    samples["Sec_dOrbPeriod"] = sampleOrbPeriod(num, rng=rng)
+
+    return samples
+# end function
+
+
+def sampleSingle(num, rng=np.random):
+    """
+    Draw the initial conditions for num single stars at once.
+
+    Parameters
+    ----------
+    num : int
+        Number of systems
+    rng : numpy.random.RandomState or numpy.random.Generator, optional
+        Source of random numbers. Defaults to the global numpy state.
+
+    Returns
+    -------
+    samples : dict
+        Arrays of length num keyed by "Pri_dRotPeriod" and "Pri_dMass"
+    """
+
+    samples = {}
+    samples["Pri_dRotPeriod"] = sampleRotPeriod(num, rng=rng)
+    samples["Pri_dMass"] = sampleMass(num, rng=rng)
+
+    return samples
+# end function
+
+
+def newSeed():
+    """
+    Fresh master seed from OS entropy, for runs that did not specify one
+    """
+    return int(np.random.SeedSequence().entropy % 2**63)
+# end function
+
+
+def blockRng(seed, block, stream=icStream):
+    """
+    Independent Generator for the systems in block number block
+    """
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed,
+                               spawn_key=(stream, block))))
+# end function
+
+
+def streamSamples(sampleFn, seed, start, stop, stream=icStream):
+    """
+    Draw sampleFn for systems start, ..., stop-1 from the seeded block streams.
+
+    Parameters
+    ----------
+    sampleFn : callable
+        sampleFn(num, rng=rng) returns a dict of arrays of length num, e.g.
+        sampleSingle
+    seed : int
+        Master seed
+    start, stop : int
+        System index range
+    stream : int, optional
+        Which stream to draw from. Defaults to icStream.
+
+    Returns
+    -------
+    samples : dict
+        Arrays of length stop - start.  Element ii - start is the same for any
+        start, stop that contain system ii.
+    """
+
+    if stop <= start:
+        return {key : value[:0] for key, value in sampleFn(0, rng=blockRng(seed, 0, stream)).items()}
+
+    parts = []
+    for block in range(start//blockSize, (stop - 1)//blockSize + 1):
+        blockSamples = sampleFn(blockSize, rng=blockRng(seed, block, stream))
+        lo = max(start - block*blockSize, 0)
+        hi = min(stop - block*blockSize, blockSize)
+        parts.append({key : value[lo:hi] for key, value in blockSamples.items()})
+
+    return {key : np.concatenate([part[key] for part in parts]) for key in parts[0]}
+# end function
+
+
+def streamBinary(seed, start, stop, tideModel="CPL"):
+    """
+    Seeded initial conditions for binaries start, ..., stop-1.  See sampleBinary.
+    """
+    sampleFn = lambda num, rng : sampleBinary(num, tideModel=tideModel, rng=rng)
+    return streamSamples(sampleFn, seed, start, stop)
+# end function
+
+
+def streamSingle(seed, start, stop):
+    """
+    Seeded initial conditions for single stars start, ..., stop-1.  See
+    sampleSingle.
+    """
+    return streamSamples(sampleSingle, seed, start, stop)
+# end function
+
+
+def sampleAge(num, rng=np.random):
+    """
+    Uniform age prior over [1, 7] Gyr, broadly consistent with stellar ages in
+    the Kepler field
+    """
+    return {"Age" : rng.uniform(low=dLowAge, high=dHighAge, size=num)}
+# end function
+
+
+def sampleAgeHistory(num, edges, weights, rng=np.random):
+    """
+    Ages drawn from a piecewise constant star formation history, e.g. one
+    inferred for the Kepler field.
+
+    Parameters
+    ----------
+    num : int
+        Number of ages
+    edges : array
+        Age bin edges [yr], increasing
+    weights : array
+        Relative number of stars formed in each bin, len(edges) - 1 of them
+
+    Returns
+    -------
+    samples : dict
+        {"Age" : ages [yr]}
+    """
+
+    edges = np.asarray(edges, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    bins = rng.choice(len(weights), size=num, p=weights/np.sum(weights))
+    return {"Age" : rng.uniform(low=edges[bins], high=edges[bins+1])}
+# end function
+
+
+def streamAges(seed, indices):
+    """
+    Seeded ages [yr] for arbitrary system indices, e.g. only the systems that
+    finished.  Each block of indices is regenerated at most once.
+
+    Parameters
+    ----------
+    seed : int
+        Master seed
+    indices : array
+        System indices
+
+    Returns
+    -------
+    ages : array
+        Age assigned to each system in indices
+    """
+
+    indices = np.asarray(indices, dtype=int)
+    ages = np.empty(len(indices))
+    blocks = indices//blockSize
+    for block in np.unique(blocks):
+        mask = blocks == block
+        blockAges = sampleAge(blockSize, rng=blockRng(seed, block, ageStream))["Age"]
+        ages[mask] = blockAges[indices[mask] - block*blockSize]
+
+    return ages
+# end function
@@ -8,175 +8,137 @@ This script produces a population of tidally-interacting binaries stars.
 
 Assumptions:
 - Template files live directory where this script exists.
+- sampler.py, vplTemplate.py, emitter.py and manifest.py live in the same
+  directory as this script.
 
 """
 
 import numpy as np
 import pandas as pd
-import re
 import os
-from datetime import datetime
-import stat
 import sys
+import argparse
+from vplTemplate import VplTemplate
+from emitter import emitSystems
+from manifest import buildManifest, buildInitial, writeManifest
+from sampler import streamBinary, newSeed
+
+# Parse command line arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("--workers", type=int, default=1,
+                    help="Number of processes used to write the simulation directories")
+parser.add_argument("--num", type=int, default=10000,
+                    help="Number of sets of initial conditions to generate")
+parser.add_argument("--start", type=int, default=0,
+                    help="Index of the first system, > 0 to top up an existing ensemble")
+parser.add_argument("--seed", type=int, default=None,
+                    help="Master random seed. Defaults to the seed in seed.txt if topping up, else a new one")
+parser.add_argument("--manifest", action="store_true",
+                    help="Write a single manifest for runManifest.py instead of a directory and .sh per system")
+parser.add_argument("--parquet", action="store_true",
+                    help="Write the manifest as parquet (requires pyarrow) instead of CSV")
+args = parser.parse_args()
 
 # Constants/Control Flags
-num = 10000 # Number of sets of initial conditions to generate
+num = args.num # Number of sets of initial conditions to generate
+start = args.start # Index of the first system
 PATH = os.path.dirname(os.path.realpath(__file__))
 save_dist = True # Save initial condition distributions?
 show_plots = True # visualize initial condition distributions?
 write_infiles = True # Write the vplanet input files, or just sample from distributions if False
-seed = int(os.getpid()*datetime.now().microsecond/100) # Random seed
-
-# Set RNG seed
-np.random.seed(seed)
+seed_name = "seed.txt" # Master random seed is recorded here for processing
+
+# Pick the master random seed: every system's initial conditions, and the age
+# assigned to it when processing, are derived from it and the system's index
+if args.seed is not None:
+    seed = args.seed
+elif start > 0 and os.path.exists(os.path.join(PATH, seed_name)):
+    with open(os.path.join(PATH, seed_name), 'r') as f:
+        seed = int(f.read())
+else:
+    seed = newSeed()
+print("Master random seed: %d" % seed)
+
+with open(os.path.join(PATH, seed_name), 'w') as f:
+    f.write("%d\n" % seed)
 
 # File names
 sys_name = "vpl.in"
 primary_name = "primary.in"
 secondary_name = "secondary.in"
 
-# Lists to hold stuff
-pri_rot = []
-pri_q = []
-pri_mass = []
-
-sec_rot = []
-sec_q = []
-sec_mass = []
-sec_e = []
-sec_orb = []
+# Sample every system's initial conditions at once
+samples = streamBinary(seed, start, start + num, tideModel="CTL")
 
-runfile_names = []
+# Parse the template input files once
+primary_tmpl = VplTemplate(os.path.join(PATH, primary_name))
+secondary_tmpl = VplTemplate(os.path.join(PATH, secondary_name))
+sys_tmpl = VplTemplate(os.path.join(PATH, sys_name))
 
 ### Helper functions ###
-def loguniform(low=0, high=1, size=None, base=10.0):
-    return np.power(base, np.random.uniform(low, high, size))
+def systemOptions(ii):
+    """
+    Input file options for system ii from its sampled initial conditions
+    """
+
+    # Pull this system's initial conditions from the samples
+    jj = ii - start
+
+    # Primary: negative -> days
+    primary_opts = {"dRotPeriod" : -samples["Pri_dRotPeriod"][jj],
+                    "dTidalTau" : samples["Pri_dTidalTau"][jj],
+                    "dMass" : samples["Pri_dMass"][jj]}
+
+    # Secondary: negative -> days
+    secondary_opts = {"dRotPeriod" : -samples["Sec_dRotPeriod"][jj],
+                      "dTidalTau" : samples["Sec_dTidalTau"][jj],
+                      "dMass" : samples["Sec_dMass"][jj],
+                      "dEcc" : samples["Sec_dEcc"][jj],
+                      "dOrbPeriod" : -samples["Sec_dOrbPeriod"][jj]}
+
+    # Age = 7 Gyr, and tell vpl.in file how many bodies are in simulation
+    sys_opts = {"dStopTime" : 7.0e9,
+                "saBodyFiles" : "primary.in secondary.in"}
+
+    return {primary_name : primary_opts, secondary_name : secondary_opts,
+            sys_name : sys_opts}
 # end function
 
 
-### Make the simulation initial conditions! ###
-for ii in range(num):
-
-    # Create a directory for the simulation to live in
-    if write_infiles:
-        directory = "simulation_" + str(ii)
-        if not os.path.exists(os.path.join(PATH,directory)):
-            os.makedirs(os.path.join(PATH,directory))
-
-    ### Populate the primary input file ###
-
-    # Read template input file
-    with open(os.path.join(PATH, 'primary.in'), 'r') as f:
-        primary_in = f.read()
-
-    # Sample from priors for initial conditions
-
-    # Loguniform initial rotation period prior over [0.8, 15] days (Matt+2015)
-    dRotPeriod = -loguniform(low=np.log10(0.8), high=np.log10(15.0)) # negative -> days
-
-    # log uniform prior for 1.0e-2 - 10s for tidal tau
-    dTidalTau = 10**np.random.uniform(low=-2, high=1)*3.171e-8
-
-    # Mass is uniformly sampled over [0.1, 1.0]
-    dMass = np.random.uniform(low=0.1, high=1.0)
-
-    # Write initial conditions to file
-    primary_in = re.sub('%s(.*?)#' % 'dRotPeriod', '%s %.5e #' % ('dRotPeriod', dRotPeriod), primary_in)
-    primary_in = re.sub('%s(.*?)#' % 'dTidalTau', '%s %.5e #' % ('dTidalTau', dTidalTau), primary_in)
-    primary_in = re.sub('%s(.*?)#' % 'dMass', '%s %.5e #' % ('dMass', dMass), primary_in)
-
-    if write_infiles:
-        with open(os.path.join(PATH, directory, primary_name), 'w') as f:
-            print(primary_in, file = f)
-
-    # Save em for later...
-    pri_rot.append(-dRotPeriod)
-    pri_q.append(dTidalTau)
-    pri_mass.append(dMass)
-
-    # Read template input file
-    with open(os.path.join(PATH, 'secondary.in'), 'r') as f:
-        secondary_in = f.read()
-
-    # Sample from priors for initial conditions
-
-    # Loguniform initial rotation period prior over [0.8, 15] days (Matt+2015)
-    dRotPeriod = -loguniform(low=np.log10(0.8), high=np.log10(15.0)) # negative -> days
-
-    # Loguniform prior for 1.0e-2 - 10s for tidal tau
-    dTidalTau = 10**np.random.uniform(low=-2, high=1)*3.171e-8
+def renderSystem(ii):
+    """
+    Fill in the input files for system ii
+    """
 
-    # Pick secondary mass using uniform mass ratio distribution over [0.1,1.0]
-    # following Moe & Kratter (2018) assumption.  Make sure minimum mass is 0.1.
-    dMass2 = -1
-    while dMass2 < 0.1:
-        q = np.random.uniform(low=0.1, high=1.0)
-        dMass2 = dMass*q
-
-    # Uniform eccentricity prior for [0.0,0.3)
-    dEcc = np.random.uniform(low=0.0, high=0.3)
-
-    # Uniform orbital period prior from [3.0,100.0)
-    dOrbPeriod = -np.random.uniform(low=3.0, high=100.0) # negative -> days
-
-    # Write initial conditions to file
-    secondary_in = re.sub('%s(.*?)#' % 'dRotPeriod', '%s %.5e #' % ('dRotPeriod', dRotPeriod), secondary_in)
-    secondary_in = re.sub('%s(.*?)#' % 'dTidalTau', '%s %.5e #' % ('dTidalTau', dTidalTau), secondary_in)
-    secondary_in = re.sub('%s(.*?)#' % 'dMass', '%s %.5e #' % ('dMass', dMass2), secondary_in)
-    secondary_in = re.sub('%s(.*?)#' % 'dEcc', '%s %.5e #' % ('dEcc', dEcc), secondary_in)
-    secondary_in = re.sub('%s(.*?)#' % 'dOrbPeriod', '%s %.5e #' % ('dOrbPeriod', dOrbPeriod), secondary_in)
-
-    if write_infiles:
-        with open(os.path.join(PATH, directory, secondary_name), 'w') as f:
-            print(secondary_in, file = f)
-
-    # Save em for later... and remove -'s
-    sec_rot.append(-dRotPeriod)
-    sec_q.append(dTidalTau)
-    sec_mass.append(dMass2)
-    sec_e.append(dEcc)
-    sec_orb.append(-dOrbPeriod)
-
-    # Write vpl file
-
-    # Read template input file
-    with open(os.path.join(PATH, sys_name), 'r') as f:
-        sys_in = f.read()
-
-    # Age = 7 Gyr
-    dAge = 7.0e9
-
-    # Tell vpl.in file how many bodies are in simulation
-    saBodyFiles = "primary.in"
-    saBodyFiles += " secondary.in"
-
-    # Write vpl file
-    sys_in = re.sub('%s(.*?)#' % 'dStopTime', '%s %.5e #' % ('dStopTime', dAge), sys_in)
-    sys_in = re.sub('%s(.*?)#' % 'saBodyFiles', '%s %s #' % ('saBodyFiles', saBodyFiles), sys_in)
-
-    if write_infiles:
-        with open(os.path.join(PATH, directory, sys_name), 'w') as f:
-            print(sys_in, file = f)
-
-    # Generate *.sh file needed for cluster to run sims
-    if write_infiles:
-        command = os.path.join(PATH, directory + ".sh")
-        with open(command,"w") as g:
-            g.write("#!/bin/bash\n")
-            g.write("cd " + os.path.join(PATH, directory) + "\n") # Change dir to where sim is
-            g.write("vplanet vpl.in\n") # Run sim command!
-
-        # Now give that .sh file execute permissions
-        st = os.stat(command)
-        os.chmod(command, st.st_mode | stat.S_IEXEC)
+    options = systemOptions(ii)
+    return {primary_name : primary_tmpl.render(**options[primary_name]),
+            secondary_name : secondary_tmpl.render(**options[secondary_name]),
+            sys_name : sys_tmpl.render(**options[sys_name])}
+# end function
 
-        # Save file name for later...
-        runfile_names.append(command)
-# end for loop
 
-# Write all runfile names to file needed for cluster
+### Make the simulation initial conditions! ###
+if write_infiles and args.manifest:
+    # One table of every system's options, run with runManifest.py
+    manifest_name = os.path.join(PATH, "mcCTL_manifest.%s" % ("parquet" if args.parquet else "csv"))
+    writeManifest(buildManifest(systemOptions, range(start, start + num)),
+                  manifest_name, append=start > 0)
+elif write_infiles:
+    # Write directories, input files and *.sh files needed for cluster to run
+    # sims, sharding systems across args.workers processes
+    runfile_names = emitSystems(PATH, num, renderSystem,
+                                workers=args.workers, start=start)
+
+# Record the initial conditions exactly as written to the input files, indexed
+# by system number, so processing needn't read every input file back
 if write_infiles:
-    with open(os.path.join(PATH, "vplArgs.txt"), 'w') as f:
+    writeManifest(buildInitial(systemOptions, range(start, start + num)),
+                  os.path.join(PATH, "mcCTL_initial.csv"), append=start > 0)
+
+# Write all runfile names to file needed for cluster, adding to the list if
+# topping up
+if write_infiles and not args.manifest:
+    with open(os.path.join(PATH, "vplArgs.txt"), 'a' if start > 0 else 'w') as f:
         for line in runfile_names:
             f.write(line + "\n")
 
@@ -186,19 +148,25 @@ cols = ["primary_rot", "log(primary_tau)","primary_mass",
         "secondary_e","secondary_orb"]
 
 # Put data into a pandas dataframe
-df = percentile_list = pd.DataFrame(np.column_stack([pri_rot,
-                                                     np.log10(pri_q),
-                                                     pri_mass,
-                                                     sec_rot,
-                                                     np.log10(sec_q),
-                                                     sec_mass,
-                                                     sec_e,
-                                                     sec_orb]),
-                                                     columns=cols)
+df = pd.DataFrame(np.column_stack([samples["Pri_dRotPeriod"],
+                                   np.log10(samples["Pri_dTidalTau"]),
+                                   samples["Pri_dMass"],
+                                   samples["Sec_dRotPeriod"],
+                                   np.log10(samples["Sec_dTidalTau"]),
+                                   samples["Sec_dMass"],
+                                   samples["Sec_dEcc"],
+                                   samples["Sec_dOrbPeriod"]]),
+                                   columns=cols,
+                                   index=np.arange(start, start + num))
 
 # Dump it into a CSV since we'll use < 50,000 samples and this is good enough
 if save_dist:
-    df.to_csv(os.path.join(PATH,"mcCTL_distributions.csv"))
+    # Indexed by system number, adding rows if topping up
+    dist_name = os.path.join(PATH,"mcCTL_distributions.csv")
+    if start > 0 and os.path.exists(dist_name):
+        df.to_csv(dist_name, mode='a', header=False)
+    else:
+        df.to_csv(dist_name)
 
 # Visualize the distributions?
 if show_plots:
@@ -8,118 +8,125 @@ This script produces a population of single stars.
 
 Assumptions:
 - Template files live directory where this script exists.
+- sampler.py, vplTemplate.py, emitter.py and manifest.py live in the same
+  directory as this script.
 
 """
 
 import numpy as np
 import pandas as pd
-import re
 import os
-from datetime import datetime
-import stat
 import sys
+import argparse
+from vplTemplate import VplTemplate
+from emitter import emitSystems
+from manifest import buildManifest, buildInitial, writeManifest
+from sampler import streamSingle, newSeed
+
+# Parse command line arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("--workers", type=int, default=1,
+                    help="Number of processes used to write the simulation directories")
+parser.add_argument("--num", type=int, default=10000,
+                    help="Number of sets of initial conditions to generate")
+parser.add_argument("--start", type=int, default=0,
+                    help="Index of the first system, > 0 to top up an existing ensemble")
+parser.add_argument("--seed", type=int, default=None,
+                    help="Master random seed. Defaults to the seed in seed.txt if topping up, else a new one")
+parser.add_argument("--manifest", action="store_true",
+                    help="Write a single manifest for runManifest.py instead of a directory and .sh per system")
+parser.add_argument("--parquet", action="store_true",
+                    help="Write the manifest as parquet (requires pyarrow) instead of CSV")
+args = parser.parse_args()
 
 # Constants/Control Flags
-num = 10000 # Number of sets of initial conditions to generate
+num = args.num # Number of sets of initial conditions to generate
+start = args.start # Index of the first system
 PATH = os.path.dirname(os.path.realpath(__file__))
 save_dist = True # Save initial condition distributions?
 show_plots = True # visualize initial condition distributions?
 write_infiles = True # Write the vplanet input files, or just sample from distributions if False
-seed = int(os.getpid()*datetime.now().microsecond/100) # Random seed
-
-# Set RNG seed
-np.random.seed(seed)
+seed_name = "seed.txt" # Master random seed is recorded here for processing
+
+# Pick the master random seed: every system's initial conditions, and the age
+# assigned to it when processing, are derived from it and the system's index
+if args.seed is not None:
+    seed = args.seed
+elif start > 0 and os.path.exists(os.path.join(PATH, seed_name)):
+    with open(os.path.join(PATH, seed_name), 'r') as f:
+        seed = int(f.read())
+else:
+    seed = newSeed()
+print("Master random seed: %d" % seed)
+
+with open(os.path.join(PATH, seed_name), 'w') as f:
+    f.write("%d\n" % seed)
 
 # File names
 sys_name = "vpl.in"
 primary_name = "primary.in"
 
-# Lists to hold stuff
-pri_rot = []
-pri_mass = []
+# Sample every system's initial conditions at once
+samples = streamSingle(seed, start, start + num)
 
-runfile_names = []
+# Parse the template input files once
+primary_tmpl = VplTemplate(os.path.join(PATH, primary_name))
+sys_tmpl = VplTemplate(os.path.join(PATH, sys_name))
 
 ### Helper functions ###
-def lognuniform(low=0, high=1, size=None, base=10.0):
-    return np.power(base, np.random.uniform(low, high, size))
-# end function
-
-
-### Make the simulation initial conditions! ###
-for ii in range(num):
-
-    # Create a directory for the simulation to live in
-    if write_infiles:
-        directory = "simulation_" + str(ii)
-        if not os.path.exists(os.path.join(PATH,directory)):
-            os.makedirs(os.path.join(PATH,directory))
-
-    ### Populate the primary input file ###
-
-    # Read template input file
-    with open(os.path.join(PATH, 'primary.in'), 'r') as f:
-        primary_in = f.read()
-
-    # Sample from priors for initial conditions
-
-    # Loguniform initial rotation period prior over [0.8, 15] days (Matt+2015)
-    dRotPeriod = -lognuniform(low=np.log10(0.8), high=np.log10(15.0)) # negative -> days
+def systemOptions(ii):
+    """
+    Input file options for system ii from its sampled initial conditions
+    """
 
-    # Mass is uniformly sampled over [0.1, 1.0]
-    dMass = np.random.uniform(low=0.1, high=1.0)
+    # Pull this system's initial conditions from the samples
+    jj = ii - start
 
-    # Write initial conditions to file
-    primary_in = re.sub('%s(.*?)#' % 'dRotPeriod', '%s %.5e #' % ('dRotPeriod', dRotPeriod), primary_in)
-    primary_in = re.sub('%s(.*?)#' % 'dMass', '%s %.5e #' % ('dMass', dMass), primary_in)
+    # Primary: negative -> days
+    primary_opts = {"dRotPeriod" : -samples["Pri_dRotPeriod"][jj],
+                    "dMass" : samples["Pri_dMass"][jj]}
 
-    if write_infiles:
-        with open(os.path.join(PATH, directory, primary_name), 'w') as f:
-            print(primary_in, file = f)
+    # Age = 7 Gyr, and tell vpl.in file how many bodies are in simulation
+    sys_opts = {"dStopTime" : 7.0e9,
+                "saBodyFiles" : "primary.in"}
 
-    # Save em for later...
-    pri_rot.append(-dRotPeriod)
-    pri_mass.append(dMass)
-
-    # Write vpl file
-
-    # Read template input file
-    with open(os.path.join(PATH, sys_name), 'r') as f:
-        sys_in = f.read()
-
-    # Age = 7 Gyr
-    dAge = 7.0e9
-
-    # Tell vpl.in file how many bodies are in simulation
-    saBodyFiles = "primary.in"
-
-    # Write vpl file
-    sys_in = re.sub('%s(.*?)#' % 'dStopTime', '%s %.5e #' % ('dStopTime', dAge), sys_in)
-    sys_in = re.sub('%s(.*?)#' % 'saBodyFiles', '%s %s #' % ('saBodyFiles', saBodyFiles), sys_in)
+    return {primary_name : primary_opts, sys_name : sys_opts}
+# end function
 
-    if write_infiles:
-        with open(os.path.join(PATH, directory, sys_name), 'w') as f:
-            print(sys_in, file = f)
 
-    # Generate *.sh file needed for cluster to run sims
-    if write_infiles:
-        command = os.path.join(PATH, directory + ".sh")
-        with open(command,"w") as g:
-            g.write("#!/bin/bash\n")
-            g.write("cd " + os.path.join(PATH, directory) + "\n") # Change dir to where sim is
-            g.write("vplanet vpl.in\n") # Run sim command!
+def renderSystem(ii):
+    """
+    Fill in the input files for system ii
+    """
 
-        # Now give that .sh file execute permissions
-        st = os.stat(command)
-        os.chmod(command, st.st_mode | stat.S_IEXEC)
+    options = systemOptions(ii)
+    return {primary_name : primary_tmpl.render(**options[primary_name]),
+            sys_name : sys_tmpl.render(**options[sys_name])}
+# end function
 
-        # Save file name for later...
-        runfile_names.append(command)
-# end for loop
 
-# Write all runfile names to file needed for cluster
+### Make the simulation initial conditions! ###
+if write_infiles and args.manifest:
+    # One table of every system's options, run with runManifest.py
+    manifest_name = os.path.join(PATH, "mcSingle_manifest.%s" % ("parquet" if args.parquet else "csv"))
+    writeManifest(buildManifest(systemOptions, range(start, start + num)),
+                  manifest_name, append=start > 0)
+elif write_infiles:
+    # Write directories, input files and *.sh files needed for cluster to run
+    # sims, sharding systems across args.workers processes
+    runfile_names = emitSystems(PATH, num, renderSystem,
+                                workers=args.workers, start=start)
+
+# Record the initial conditions exactly as written to the input files, indexed
+# by system number, so processing needn't read every input file back
 if write_infiles:
-    with open(os.path.join(PATH, "vplArgs.txt"), 'w') as f:
+    writeManifest(buildInitial(systemOptions, range(start, start + num)),
+                  os.path.join(PATH, "mcSingle_initial.csv"), append=start > 0)
+
+# Write all runfile names to file needed for cluster, adding to the list if
+# topping up
+if write_infiles and not args.manifest:
+    with open(os.path.join(PATH, "vplArgs.txt"), 'a' if start > 0 else 'w') as f:
         for line in runfile_names:
             f.write(line + "\n")
 
@@ -127,11 +134,18 @@ if write_infiles:
 cols = ["primary_rot","primary_mass"]
 
 # Put data into a pandas dataframe
-df = percentile_list = pd.DataFrame(np.column_stack([pri_rot,pri_mass]), columns=cols)
+df = pd.DataFrame(np.column_stack([samples["Pri_dRotPeriod"],
+                                   samples["Pri_dMass"]]), columns=cols,
+                  index=np.arange(start, start + num))
 
 # Dump it into a CSV since we'll use < 50,000 samples and this is good enough
 if save_dist:
-    df.to_csv(os.path.join(PATH,"mcSingle_distributions.csv"))
+    # Indexed by system number, adding rows if topping up
+    dist_name = os.path.join(PATH,"mcSingle_distributions.csv")
+    if start > 0 and os.path.exists(dist_name):
+        df.to_csv(dist_name, mode='a', header=False)
+    else:
+        df.to_csv(dist_name)
 
 # Visualize the distributions?
 if show_plots:
@@ -0,0 +1,417 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Approximate stellar evolution track for 0.1 - 1.4 solar mass stars, standing
+in for the Baraffe+2015 grids vplanet's stellar module interpolates
+(sStellarModel baraffe), which aren't distributed with this repository.
+
+Pre-main sequence stars are fully convective n = 3/2 polytropes contracting
+down a Hayashi track at a fixed effective temperature, Teff_h(M), and
+radiating away their gravitational energy, so that
+
+    R_h(t) = (G M**2 / (28 pi sigma Teff_h**4 t))**(1/3)
+
+Main sequence radii and luminosities follow power laws in mass that grow
+slowly over the main sequence lifetime, 10 Gyr (M/Msun)**-2.5.  The two
+phases are joined smoothly,
+
+    R = (R_h**4 + R_ms**4)**(1/4)
+
+and the effective temperature and radius of gyration move from their Hayashi
+values, 0.453 for the polytrope, to the main sequence ones with the weight
+R_h**4/(R_h**4 + R_ms**4).  The track reproduces the contraction onto the
+main sequence and the main sequence radii and temperatures of Baraffe+2015 to
+about 10-20%, enough to exercise the pipeline, but production numbers come
+from vplanet.
+
+Like vplanet's stellar module, which interpolates the Baraffe+2015 grids
+bicubically, stars can instead be looked up in a TrackTable: ln(radius),
+ln(radius of gyration), the effective temperature and the logarithmic
+derivatives dln(radius)/dln(age) and dln(radius of gyration)/dln(age),
+tabulated on a regular grid in mass and log10(age), with the 16 bicubic
+coefficients of every cell precomputed into one contiguous array.  A whole
+array of stars is evaluated with one gather of their cells' coefficients and
+a few array operations, and stars off the grid fall back to track.  The
+table is only as accurate as its grid, to ~2e-3 in radius at the end of the
+main sequence, and isn't faster than this analytic track, so nothing uses it
+by default: it's an opt-in, e.g. vplIntegrator.Ensemble(sims,
+track=trackTable().rates), for tracks that are costly to evaluate.
+
+trackTable() builds the table once and caches it, in memory and in an .npz
+file in a cache directory, by default $XDG_CACHE_HOME/stellarTrack, that
+later processes load instead of rebuilding.  Cached tables are keyed on a
+hash of the grid and of the track's code and constants, so editing the track
+never loads a stale table.
+
+    table = trackTable()
+    radius, radGyra, teff, dLnRadius, dLnRadGyra = table.rates(mass, age)
+
+Running this file compares the table to the track and times both:
+    python stellarTrack.py --stars 100000
+
+"""
+
+import os
+import hashlib
+import inspect
+import tempfile
+import numpy as np
+
+BIGG = 6.67428e-11 # Gravitational constant [m^3/kg/s^2]
+SIGMA = 5.670367e-8 # Stefan-Boltzmann constant [W/m^2/K^4]
+MSUN = 1.988416e30 # Solar mass [kg]
+RSUN = 6.957e8 # Solar radius [m]
+YEARSEC = 3.15576e7 # Seconds in a year
+TSUN = 5778.0 # Solar effective temperature [K]
+
+RG_POLYTROPE = 0.453 # Radius of gyration of an n = 3/2 polytrope
+
+# Default TrackTable grid: (min, max, number of nodes) in mass [Msun] and
+# log10(age [yr]).  Mass nodes fall on the track's kinks in mass.
+table_mass = (0.1, 1.4, 131)
+table_mass_kinks = (0.35, 0.43, 1.0)
+table_log_age = (5.0, 10.5, 221)
+table_cache = os.path.join(os.environ.get("XDG_CACHE_HOME",
+                                           os.path.join(os.path.expanduser("~"), ".cache")),
+                            "stellarTrack") # Default directory of cached tables
+
+
+def _mainSequence(mass, age):
+    """
+    Main sequence radius [Rsun], effective temperature [K] and radius of
+    gyration of mass [Msun] stars at age [yr]
+    """
+
+    x = np.minimum(age/(1.0e10*mass**-2.5), 1.0)
+    radius = 0.9*mass**0.85*(1.0 + 0.25*x)
+    lum = np.where(mass >= 0.43, 0.7*mass**4, 0.7*0.43**4*(mass/0.43)**2.3)*(1.0 + 0.5*x)
+    teff = TSUN*lum**0.25/np.sqrt(radius)
+    radGyra = np.interp(mass, [0.35, 1.0, 1.4], [RG_POLYTROPE, 0.27, 0.23])
+
+    return radius, teff, radGyra
+# end function
+
+
+def track(mass, age):
+    """
+    Radius, radius of gyration and effective temperature of stars on the
+    approximate track.
+
+    Parameters
+    ----------
+    mass : float or array
+        Stellar mass [Msun]
+    age : float or array
+        Stellar age [yr], broadcast against mass
+
+    Returns
+    -------
+    radius : array
+        Radius [Rsun]
+    radGyra : array
+        Radius of gyration
+    teff : array
+        Effective temperature [K]
+    """
+
+    mass, age = np.broadcast_arrays(np.asarray(mass, dtype=float),
+                                    np.asarray(age, dtype=float))
+
+    # Contraction down the Hayashi track
+    teffH = 4300.0*mass**0.17
+    rH = (BIGG*(mass*MSUN)**2/(28.0*np.pi*SIGMA*teffH**4*age*YEARSEC))**(1.0/3.0)/RSUN
+
+    rMS, teffMS, rgMS = _mainSequence(mass, age)
+    w = rH**4/(rH**4 + rMS**4)
+
+    radius = (rH**4 + rMS**4)**0.25
+    radGyra = w*RG_POLYTROPE + (1.0 - w)*rgMS
+    teff = w*teffH + (1.0 - w)*teffMS
+
+    return radius, radGyra, teff
+# end function
+
+
+def trackRates(mass, age, h=1.0e-4):
+    """
+    track(mass, age) and the logarithmic rates of change of the radius and
+    radius of gyration [1/yr], from centered differences over age*(1 +/- h)
+
+    Returns
+    -------
+    radius, radGyra, teff : array
+        As track
+    dLnRadius, dLnRadGyra : array
+        dln(radius)/dt and dln(radGyra)/dt [1/yr]
+    """
+
+    mass, age = np.broadcast_arrays(np.asarray(mass, dtype=float),
+                                    np.asarray(age, dtype=float))
+
+    # All three ages in one evaluation
+    radius, radGyra, teff = track(np.stack([mass]*3),
+                                  np.stack([age, age*(1.0 - h), age*(1.0 + h)]))
+    dLnRadius = np.log(radius[2]/radius[1])/(2.0*h*age)
+    dLnRadGyra = np.log(radGyra[2]/radGyra[1])/(2.0*h*age)
+
+    return radius[0], radGyra[0], teff[0], dLnRadius, dLnRadGyra
+# end function
+
+
+# Bicubic coefficients a = M F M^T of a unit cell from F = [[f, f_y], [f_x,
+# f_xy]] at its corners, Numerical Recipes' bcucof in matrix form
+_hermite = np.array([[1.0, 0.0, 0.0, 0.0],
+                     [0.0, 0.0, 1.0, 0.0],
+                     [-3.0, 3.0, -2.0, -1.0],
+                     [2.0, -2.0, 1.0, 1.0]])
+
+
+def trackKey(mass=table_mass, logAge=table_log_age):
+    """
+    Hash of a TrackTable grid and of everything the track depends on, its
+    functions' code and the constants, identifying tables built from them
+    """
+
+    parts = [repr(tuple(mass)), repr(tuple(logAge)), repr(table_mass_kinks),
+             repr((BIGG, SIGMA, MSUN, RSUN, YEARSEC, TSUN, RG_POLYTROPE))]
+    parts.extend(inspect.getsource(func) for func in (_mainSequence, track, trackRates))
+
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+# end function
+
+
+class TrackTable(object):
+    """
+    Bicubic lookup table of the track in mass and log10(age).
+
+    Parameters
+    ----------
+    mass : tuple, optional
+        (min, max, nodes) of the mass grid [Msun]. Defaults to table_mass.
+    logAge : tuple, optional
+        (min, max, nodes) of the log10(age [yr]) grid. Defaults to
+        table_log_age.
+    coeffs : array, optional
+        Precomputed coefficients, e.g. loaded by TrackTable.load. Defaults
+        to None, i.e. tabulate the track.
+    """
+
+    # Tabulated quantities, in the order of the coefficient array
+    names = ("lnRadius", "lnRadGyra", "teff", "dLnRadius", "dLnRadGyra")
+
+    def __init__(self, mass=table_mass, logAge=table_log_age, coeffs=None):
+        self.mass = tuple(mass)
+        self.logAge = tuple(logAge)
+        self.dMass = (mass[1] - mass[0])/(mass[2] - 1)
+        self.dLogAge = (logAge[1] - logAge[0])/(logAge[2] - 1)
+        self.key = trackKey(mass, logAge)
+
+        if coeffs is None:
+            coeffs = self._tabulate()
+        # (mass cells, age cells, 4, 4, quantities), so one gather fetches
+        # all of a star's coefficients
+        self.coeffs = np.ascontiguousarray(coeffs)
+    # end function
+
+    def _tabulate(self):
+        """
+        Bicubic coefficients of every cell, from the track and its finite
+        difference derivatives at the nodes
+        """
+
+        masses = np.linspace(*self.mass)
+        ages = 10.0**np.linspace(*self.logAge)
+        radius, radGyra, teff, dLnR, dLnRg = trackRates(masses[:,None], ages[None,:])
+
+        # dln/dln(age) are smooth in log(age), unlike dln/dt
+        f = np.stack([np.log(radius), np.log(radGyra), teff, dLnR*ages, dLnRg*ages], axis=-1)
+
+        # Derivatives in units of the grid spacing, centered except that each
+        # cell takes its own side's slope at a kink in mass
+        fy = np.gradient(f, axis=1)
+        step = np.diff(f, axis=0)
+        stepY = np.diff(fy, axis=0)
+        kink = np.isclose(masses[:,None], table_mass_kinks).any(axis=-1)[:,None,None]
+        fxLow = np.where(kink[:-1], step, np.gradient(f, axis=0)[:-1])
+        fxHigh = np.where(kink[1:], step, np.gradient(f, axis=0)[1:])
+        fxyLow = np.where(kink[:-1], stepY, np.gradient(fy, axis=0)[:-1])
+        fxyHigh = np.where(kink[1:], stepY, np.gradient(fy, axis=0)[1:])
+
+        def corners(low, high):
+            return np.stack([np.stack([low[:,:-1], low[:,1:]], axis=-1),
+                             np.stack([high[:,:-1], high[:,1:]], axis=-1)], axis=-2)
+        # end function
+
+        # F[..., 4, 4] = [[f, f_y], [f_x, f_xy]] at the corners of each cell
+        top = np.concatenate([corners(f[:-1], f[1:]), corners(fy[:-1], fy[1:])], axis=-1)
+        bottom = np.concatenate([corners(fxLow, fxHigh), corners(fxyLow, fxyHigh)], axis=-1)
+        F = np.moveaxis(np.concatenate([top, bottom], axis=-2), 2, -1)
+
+        return np.einsum("ik,...klq,jl->...ijq", _hermite, F, _hermite)
+    # end function
+
+    def save(self, path):
+        """
+        Write the table to an .npz file, through a temporary file in the same
+        directory, so that processes loading it never see a partial table
+        """
+
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, mass=self.mass, logAge=self.logAge, coeffs=self.coeffs,
+                         key=self.key)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    # end function
+
+    @classmethod
+    def load(cls, path, mass=table_mass, logAge=table_log_age):
+        """
+        Table saved at path, or None if there's none built from this grid and
+        the current track, see trackKey
+        """
+
+        try:
+            with np.load(path) as data:
+                if str(data["key"]) != trackKey(mass, logAge) or \
+                   not np.array_equal(data["mass"], mass) or \
+                   not np.array_equal(data["logAge"], logAge):
+                    return None
+                return cls(mass, logAge, coeffs=data["coeffs"])
+        except (IOError, OSError, KeyError, ValueError):
+            return None
+    # end function
+
+    def _interpolate(self, mass, age):
+        """
+        Tabulated quantities, as a (stars, quantities) array, of the stars,
+        flattened, and which of them are on the grid.  Stars off it get the
+        values of the grid's first cell.
+        """
+
+        x = (mass.ravel() - self.mass[0])/self.dMass
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = (np.log10(age.ravel()) - self.logAge[0])/self.dLogAge
+        inside = (x >= 0) & (x <= self.mass[2] - 1) & (y >= 0) & (y <= self.logAge[2] - 1)
+        if not np.all(inside):
+            x = np.where(inside, x, 0.0)
+            y = np.where(inside, y, 0.0)
+
+        # Cell of, and position within it of, each star
+        i = np.minimum(x.astype(int), self.mass[2] - 2)
+        j = np.minimum(y.astype(int), self.logAge[2] - 2)
+        x = x - i
+        y = y - j
+
+        # Sum of a_ij x**i y**j over the 16 coefficients of every quantity
+        cells = self.coeffs.reshape((-1, 16) + self.coeffs.shape[4:])
+        a = np.take(cells, i*(self.logAge[2] - 1) + j, axis=0)
+        xp = np.stack([np.ones_like(x), x, x*x, x*x*x], axis=-1)
+        yp = np.stack([np.ones_like(y), y, y*y, y*y*y], axis=-1)
+        w = (xp[:,:,None]*yp[:,None,:]).reshape(len(x), 1, 16)
+
+        return np.matmul(w, a)[:,0], inside
+    # end function
+
+    def rates(self, mass, age):
+        """
+        As trackRates: radius [Rsun], radius of gyration, effective
+        temperature [K], and dln(radius)/dt and dln(radius of gyration)/dt
+        [1/yr] of mass [Msun] stars at age [yr], broadcast together, from the
+        table, or from the track off its grid
+        """
+
+        mass, age = np.broadcast_arrays(np.asarray(mass, dtype=float),
+                                        np.asarray(age, dtype=float))
+        values, inside = self._interpolate(mass, age)
+
+        values[:,0:2] = np.exp(values[:,0:2])
+        values[:,3:5] /= age.reshape(-1, 1)
+        if not np.all(inside):
+            values[~inside] = np.stack(trackRates(mass.ravel()[~inside], age.ravel()[~inside]),
+                                       axis=-1)
+
+        return tuple(values[:,k].reshape(mass.shape) for k in range(len(self.names)))
+    # end function
+
+    def __call__(self, mass, age):
+        """
+        As track: radius [Rsun], radius of gyration and effective temperature
+        [K], from the table
+        """
+
+        return self.rates(mass, age)[:3]
+    # end function
+# end class
+
+
+# Tables already built or loaded by this process, by path
+_tables = {}
+
+
+def trackTable(directory=None):
+    """
+    The default TrackTable, loaded from directory, by default table_cache, or
+    built and saved there the first time, and cached for the rest of the
+    process.  The file is named after trackKey, so tables of an edited track
+    are rebuilt.
+    """
+
+    if directory is None:
+        directory = table_cache
+    path = os.path.join(directory, "stellarTrack_%s.npz" % trackKey()[:16])
+
+    if path not in _tables:
+        table = TrackTable.load(path)
+        if table is None:
+            table = TrackTable()
+            try:
+                os.makedirs(directory, exist_ok=True)
+                table.save(path)
+            except (IOError, OSError):
+                pass
+        _tables[path] = table
+
+    return _tables[path]
+# end function
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stars", type=int, default=100000,
+                        help="Number of random stars to evaluate")
+    args = parser.parse_args()
+
+    start = time.time()
+    table = TrackTable()
+    print("Built %d x %d table in %.3lf s, %.1lf MB" %
+          (table.mass[2], table.logAge[2], time.time() - start, table.coeffs.nbytes/1.0e6))
+
+    rng = np.random.default_rng(42)
+    mass = rng.uniform(0.1, 1.4, args.stars)
+    age = 10.0**rng.uniform(5.0, 10.5, args.stars)
+
+    start = time.time()
+    exact = trackRates(mass, age)
+    analytic = time.time() - start
+    start = time.time()
+    approx = table.rates(mass, age)
+    lookup = time.time() - start
+    print("%d stars: track %.4lf s, table %.4lf s" % (args.stars, analytic, lookup))
+
+    # Derivatives, which change sign, relative to their largest magnitude
+    for k, (name, e, a) in enumerate(zip(("radius", "radGyra", "teff", "dLnRadius",
+                                          "dLnRadGyra"), exact, approx)):
+        scale = np.fabs(e) if k < 3 else np.fabs(e).max()
+        print("%10s: max relative error %.2e, median %.2e" %
+              (name, np.max(np.fabs(a - e)/scale), np.median(np.fabs(a - e)/scale)))
@@ -0,0 +1,174 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Typed, columnar storage for the ensemble summary tables written by
+processMC*.py, e.g. mcCPLMarch27.csv.  Next to each CSV, writeSummary writes an
+uncompressed Feather file (requires pyarrow) that loads in a fraction of the
+time and can be memory-mapped.  Each column is stored as float32 if all of its
+values have at most 6 significant digits, and as float64 otherwise.  float32
+keeps only about 7 significant digits, e.g. 0.1 becomes 0.10000000149, but
+that's enough to recover the 6 digits: loadSummary rounds float32 columns
+back to them as float64, so they hold exactly the values read from the CSV.
+loadSummary reads the Feather file when it exists and is at least as new as
+the CSV, and falls back to the CSV otherwise.
+
+To convert existing summaries, e.g. those in Data/:
+    python summary.py ../Data/mc*.csv
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+summaryExt = ".feather" # Columnar summary file extension
+
+
+def columnarPath(path):
+    """
+    Feather file that goes with summary CSV path
+    """
+    return os.path.splitext(path)[0] + summaryExt
+# end function
+
+
+def roundSignificant(values, digits=6):
+    """
+    values rounded to digits significant digits, as float64 equal to those
+    parsed from the rounded decimal strings
+    """
+
+    values = np.array(values, dtype=np.float64)
+    use = np.isfinite(values) & (values != 0)
+    v = values[use]
+
+    # Scale every value to digits digits before the decimal point, dividing
+    # or multiplying by exact powers of 10 so the result is correctly rounded
+    exponent = (digits - 1 - np.floor(np.log10(np.fabs(v)))).astype(int)
+    exact = np.abs(exponent) <= 22
+    pos = exact & (exponent >= 0)
+    neg = exact & (exponent < 0)
+    scale = 10.0**np.abs(exponent)
+    v[pos] = np.round(v[pos]*scale[pos])/scale[pos]
+    v[neg] = np.round(v[neg]/scale[neg])*scale[neg]
+    v[~exact] = [float("%.*g" % (digits, x)) for x in v[~exact]]
+
+    values[use] = v
+    return values
+# end function
+
+
+def sixDigits(values):
+    """
+    Whether every value has at most 6 significant digits, and a magnitude
+    float32 represents, so that loadSummary can restore it from float32
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values) & (values != 0)]
+    if np.any((np.fabs(finite) < np.finfo(np.float32).tiny) |
+              (np.fabs(finite) > np.finfo(np.float32).max)):
+        return False
+
+    return bool(np.array_equal(roundSignificant(values), values, equal_nan=True))
+# end function
+
+
+def columnDtypes(df):
+    """
+    Storage dtype of each numeric column of a summary table
+    """
+
+    dtypes = {}
+    for column in df.columns:
+        if np.issubdtype(df[column].dtype, np.floating):
+            dtypes[column] = np.float32 if sixDigits(df[column]) else np.float64
+
+    return dtypes
+# end function
+
+
+def writeColumnar(df, path):
+    """
+    Write a summary table as typed Feather next to summary CSV path
+    """
+
+    df = df.reset_index(drop=True).astype(columnDtypes(df))
+    df.to_feather(columnarPath(path), compression="uncompressed")
+# end function
+
+
+def writeSummary(df, path):
+    """
+    Write a summary table as CSV at path and, if pyarrow is available, as typed
+    Feather next to it.
+    """
+
+    df.to_csv(path, header=True, index=False)
+
+    try:
+        writeColumnar(df, path)
+    except ImportError:
+        print("pyarrow unavailable, only wrote %s" % path)
+# end function
+
+
+def loadSummary(path, memory_map=False):
+    """
+    Read a summary table written by writeSummary.
+
+    Parameters
+    ----------
+    path : str
+        Summary CSV, e.g. ../Data/mcCPLMarch27.csv
+    memory_map : bool, optional
+        Memory-map the Feather file instead of reading it into memory. The
+        columns are then read-only. Defaults to False.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        The summary, from the Feather file if it is current and pyarrow is
+        available, from the CSV otherwise.  Columns stored as float32 are
+        restored to the CSV's float64 values, in memory even when
+        memory-mapped.
+    """
+
+    feather = columnarPath(path)
+    if os.path.exists(feather) and (not os.path.exists(path) or
+                                    os.path.getmtime(feather) >= os.path.getmtime(path)):
+        try:
+            from pyarrow import feather as pf
+            df = pf.read_feather(feather, memory_map=memory_map)
+            for column in df.columns:
+                if df[column].dtype == np.float32:
+                    df[column] = roundSignificant(df[column])
+            return df
+        except ImportError:
+            pass
+
+    return pd.read_csv(path, float_precision="round_trip")
+# end function
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for path in sys.argv[1:]:
+        start = time.time()
+        df = pd.read_csv(path, float_precision="round_trip")
+        csvTime = time.time() - start
+
+        writeColumnar(df, path)
+
+        start = time.time()
+        loadSummary(path)
+        featherTime = time.time() - start
+
+        narrow = sum(dtype == np.float32 for dtype in columnDtypes(df).values())
+        print("%s: %d rows, %d/%d float32 columns, CSV %.1lf ms, Feather %.1lf ms" %
+              (columnarPath(path), len(df), narrow, len(df.columns),
+               1000*csvTime, 1000*featherTime))
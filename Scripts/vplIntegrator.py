@@ -0,0 +1,1159 @@
+#!/usr/bin/env python
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Pure NumPy stand-in for vplanet's coupled eqtide + stellar evolution of
+low-mass stars and binaries, so that the setup, process and analysis scripts
+can be run end to end without vplanet, e.g. in CI.  It reads the same vpl.in
+and body files, e.g. those the setup scripts write from BinaryIn/{CPL,CTL,
+Single}, and writes the same <system>.<body>.forward files, in each body's
+saOutputOrder, and a <system>.log whose FINAL SYSTEM PROPERTIES hold each
+body's LockTime [sec], as vplLog.parseLog expects.
+
+Physics, for circular, aligned spins:
+- eqtide: the constant phase lag (sTideModel p2, dTidalQ) and constant time
+  lag (t8, dTidalTau) models of Leconte+2010 and Heller+2011, as in vplanet,
+  evolve both spins, the semi-major axis and the eccentricity.
+- stellar: radii and radii of gyration follow stellarTrack.py, evaluated
+  for every star and stage time of a step at once, and spins change with the
+  moment of inertia at fixed angular momentum.
+- magnetic braking: Matt+2015 (sMagBrakingModel matt) with Cranmer & Saar
+  2011 convective turnover times, or Reiners & Mohanty 2012 (reiners).
+
+A star whose spin comes within dMaxLockDiff of the equilibrium rate is
+tidally locked: its spin is held at the equilibrium rate, and the orbit
+supplies the angular momentum braking and contraction take from it.  It stays
+locked as long as tides can hold it, i.e. while, at both edges of the
+dMaxLockDiff window, the net spin torque points back into it.  LockTime is
+the simulation time when a body first locked, -1 if it never did.
+
+Like vplanet, the equations are integrated with 4th order Runge-Kutta steps
+of dEta times the shortest timescale x/(dx/dt) of the spins, orbit and
+stellar structure, which are shortened to land on every output time.
+
+Near synchronous rotation those steps are set by the tides, which relax the
+spins onto the equilibrium rate far faster than anything else in the system
+changes, or, with the CPL model, flip their sign every time a spin crosses
+it.  Unless the spin is locked, explicit steps must resolve that.  With
+stiff=True (--stiff), spins are stepped as follows instead:
+- CTL: the tidal spin torque is linear in the spin, dw/dt = -lambda (w -
+  w_eq) + ..., with lambda = Z f5/(C n**2).  Freezing lambda and w_eq over a
+  step, the relaxation is integrated exactly, with exponential time
+  differencing Runge-Kutta (ETDRK4) steps, and only the remainder, braking,
+  contraction and the drift of lambda and w_eq, limits the step.
+- CPL: a spin that crosses the equilibrium rate in a step, or starts on it,
+  lands on it if tides can hold it there, as a backward Euler step of the
+  sign-switching torque would, instead of overshooting, and then follows it
+  as a locked spin does, whatever dMaxLockDiff.
+Locking and LockTime are otherwise unchanged.
+
+Simulations with the same bodies, tides and outputs, e.g. all of a Monte Carlo
+ensemble, can be evolved together in one process (see Ensemble and
+runBatch.py): their spins, orbits and parameters are held in arrays with one
+row per simulation, and every pass of the integrator advances each unfinished
+simulation by one step of its own size.  A simulation's results don't depend
+on which others it was evolved with.
+
+Units are those of the BinaryIn files: sUnitMass solar, sUnitLength aU and
+sUnitTime years, seconds or days.  Output options with a leading "-" are
+written in vplanet's output units (days, solar radii, ...), the rest in the
+system units; energies, angular momenta and fluxes are always SI.
+
+Usage (in a simulation directory, or as executor.py --exe):
+    python vplIntegrator.py vpl.in
+    python vplIntegrator.py vpl.in --stiff
+
+"""
+
+import os
+import sys
+import numpy as np
+from stellarTrack import trackRates, RSUN, YEARSEC
+
+BIGG = 6.67428e-11 # Gravitational constant [m^3/kg/s^2]
+MSUN = 1.988416e30 # Solar mass [kg]
+AUM = 1.49597870700e11 # Astronomical unit [m]
+DAYSEC = 86400.0 # Seconds in a day
+
+# Matt+2015 magnetic braking
+MATT_T0 = 6.3e23 # Torque normalization [J]
+MATT_CHI = 10.0 # Ro_sun/Ro_saturated
+MATT_P = 2.0 # Torque exponent
+MATT_OMEGASUN = 2.6e-6 # Solar rotation rate [rad/s]
+TEFFSUN = 5778.0 # Solar effective temperature [K]
+
+# Reiners & Mohanty 2012 magnetic braking
+RM12_C = 2.66e3 # Torque constant [g^5/3 cm^-10/3 s]
+RM12_OMEGACRIT = 8.56e-6 # Saturation rotation rate [rad/s]
+
+# System units the input files may use
+mass_units = {"solar" : MSUN, "kg" : 1.0, "g" : 1.0e-3}
+length_units = {"au" : AUM, "m" : 1.0, "cm" : 1.0e-2, "km" : 1.0e3, "solar" : RSUN}
+time_units = {"sec" : 1.0, "day" : DAYSEC, "year" : YEARSEC, "myr" : 1.0e6*YEARSEC,
+              "gyr" : 1.0e9*YEARSEC}
+
+# Output options: (dimension, vplanet output unit [SI]).  Dimensions are
+# converted to the system units when the option has no leading "-".
+output_units = {"Time" : ("time", YEARSEC),
+                "Semim" : ("length", AUM),
+                "Ecce" : (None, 1.0),
+                "Radius" : ("length", RSUN),
+                "RadGyra" : (None, 1.0),
+                "RotPer" : ("time", DAYSEC),
+                "RotRate" : ("rate", 1.0/DAYSEC),
+                "EqRotPer" : ("time", DAYSEC),
+                "OrbPeriod" : ("time", DAYSEC),
+                "OrbPer" : ("time", DAYSEC),
+                "MeanMotion" : ("rate", 1.0/DAYSEC),
+                "TotEn" : (None, 1.0),
+                "TotAngMom" : (None, 1.0),
+                "TotAng" : (None, 1.0),
+                "OrbAngMom" : (None, 1.0),
+                "LostAngMom" : (None, 1.0),
+                "SurfEnFluxTotal" : (None, 1.0),
+                "DRotPerDtEqtide" : (None, 1.0),
+                "DRotPerDtStellar" : (None, 1.0)}
+orbit_outputs = ("Semim", "Ecce", "EqRotPer", "OrbPeriod", "OrbPer", "MeanMotion",
+                 "OrbAngMom", "SurfEnFluxTotal", "DRotPerDtEqtide")
+braking_models = ("none", "matt", "reiners") # sMagBrakingModel options
+_slide_diff = 1.0e-6 # Relative offset at which stiff CPL steps test the tides hold a spin
+
+
+def readInput(path):
+    """
+    {option : [values]} of a vplanet input file, without comments, joining
+    array options continued onto the next line with a "$"
+    """
+
+    options = {}
+    key = None
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split("#")[0].split()
+            if key is not None:
+                fields = [key] + fields
+            key = None
+            if len(fields) > 1 and fields[-1].endswith("$"):
+                fields[-1] = fields[-1][:-1]
+                fields = [field for field in fields if field]
+                key = fields[0]
+            if len(fields) > 1:
+                options.setdefault(fields[0], []).extend(fields[1:])
+            elif key is not None:
+                options.setdefault(key, [])
+
+    return options
+# end function
+
+
+def _unit(units, name, kind):
+    """
+    SI value of a system unit, matched on its leading letters as vplanet does
+    """
+
+    name = name.lower()
+    for unit in sorted(units, key=len, reverse=True):
+        if name.startswith(unit) or (len(name) > 1 and unit.startswith(name)):
+            return units[unit]
+
+    raise ValueError("Unsupported %s unit %s" % (kind, name))
+# end function
+
+
+def cranmerSaarTauCZ(teff):
+    """
+    Convective turnover time [s] at effective temperature teff [K], Cranmer &
+    Saar (2011)
+    """
+
+    return (314.24*np.exp(-teff/1952.5 - (teff/6250.0)**18) + 0.002)*DAYSEC
+# end function
+
+
+def mattTorque(omega, mass, radius, teff):
+    """
+    Matt+2015 magnetic braking torque [J], dJ/dt < 0, on stars with spin
+    omega [rad/s], mass [kg], radius [m] and effective temperature teff [K]
+    """
+
+    t0 = MATT_T0*(radius/RSUN)**3.1*np.sqrt(mass/MSUN)
+    tauRatio = cranmerSaarTauCZ(teff)/cranmerSaarTauCZ(TEFFSUN)
+    omegaRatio = omega/MATT_OMEGASUN
+
+    # Saturated when Ro <= Ro_sun/chi, i.e. (tau/tau_sun)(omega/omega_sun) >= chi
+    unsaturated = -t0*tauRatio**MATT_P*omegaRatio**(MATT_P + 1.0)
+    saturated = -t0*MATT_CHI**MATT_P*omegaRatio
+    return np.where(tauRatio*omegaRatio < MATT_CHI, unsaturated, saturated)
+# end function
+
+
+def reinersTorque(omega, mass, radius):
+    """
+    Reiners & Mohanty (2012) magnetic braking torque [J], dJ/dt < 0, on
+    stars with spin omega [rad/s], mass [kg] and radius [m]
+    """
+
+    # In cgs, as published
+    scale = RM12_C*((radius*100.0)**16/(mass*1000.0)**2)**(1.0/3.0)
+    torque = -scale*omega*np.minimum(omega/RM12_OMEGACRIT, 1.0)**4
+
+    return torque*1.0e-7
+# end function
+
+
+def meanMotion(a, mass):
+    """
+    Mean motion [rad/s] of an orbit with semi-major axis a [m] about total
+    mass [kg]
+    """
+
+    return np.sqrt(BIGG*mass/a**3)
+# end function
+
+
+def cplEqRotRate(n, e):
+    """
+    CPL equilibrium spin rate, with vplanet's discrete rotation: synchronous
+    up to e = sqrt(1/19), 3:2 beyond
+    """
+
+    return np.where(e <= np.sqrt(1.0/19.0), n, 1.5*n)
+# end function
+
+
+def _ctlF(e):
+    """
+    Leconte+2010 eccentricity functions f1-f5
+    """
+
+    e2 = e*e
+    beta = np.sqrt(1.0 - e2)
+    f1 = (1.0 + 31.0/2*e2 + 255.0/8*e2**2 + 185.0/16*e2**3 + 25.0/64*e2**4)/beta**15
+    f2 = (1.0 + 15.0/2*e2 + 45.0/8*e2**2 + 5.0/16*e2**3)/beta**12
+    f3 = (1.0 + 15.0/4*e2 + 15.0/8*e2**2 + 5.0/64*e2**3)/beta**13
+    f4 = (1.0 + 3.0/2*e2 + 1.0/8*e2**2)/beta**10
+    f5 = (1.0 + 3.0*e2 + 3.0/8*e2**2)/beta**9
+
+    return f1, f2, f3, f4, f5
+# end function
+
+
+def ctlEqRotRate(n, e):
+    """
+    CTL equilibrium spin rate, Leconte+2010
+    """
+
+    _, f2, _, _, f5 = _ctlF(e)
+    return n*f2/f5
+# end function
+
+
+def cplRates(a, e, omega, mass, radius, radGyra, k2, tidalQ):
+    """
+    Constant phase lag (CPL) tidal evolution of binaries.
+
+    Parameters
+    ----------
+    a, e : float or array
+        Semi-major axis [m] and eccentricity of each binary
+    omega, mass, radius, radGyra, k2, tidalQ : array
+        Spin [rad/s], mass [kg], radius [m], radius of gyration, Love number
+        and tidal Q of both bodies, along the last axis
+
+    Returns
+    -------
+    dadt, dedt, domegadt : array
+        Each body's contribution to da/dt [m/s] and de/dt [1/s], and its
+        tidal spin rate of change [rad/s^2], shaped like omega
+    """
+
+    a = np.asarray(a)[...,None]
+    e = np.asarray(e)[...,None]
+    mp = mass[...,::-1]
+    n = meanMotion(a, mass.sum(axis=-1, keepdims=True))
+    z = 3.0*BIGG**2*k2*mp**2*(mass + mp)*radius**5/(tidalQ*a**9*n)
+
+    eps0 = np.sign(2.0*omega - 2.0*n)
+    eps1 = np.sign(2.0*omega - 3.0*n)
+    eps2 = np.sign(2.0*omega - n)
+    eps5 = 1.0
+
+    mu = BIGG*mass.prod(axis=-1, keepdims=True)
+    e2 = e*e
+    dadt = a**2/(4.0*mu)*z*(4.0*eps0 + e2*(-20.0*eps0 + 147.0/2*eps1 + 0.5*eps2 - 3.0*eps5))
+    dedt = -a*e/(8.0*mu)*z*(2.0*eps0 - 49.0/2*eps1 + 0.5*eps2 + 3.0*eps5)
+    domegadt = -z/(8.0*mass*radGyra**2*radius**2*n)*(4.0*eps0 + e2*(-20.0*eps0 + 49.0*eps1 + eps2))
+
+    return dadt, dedt, domegadt
+# end function
+
+
+def ctlRates(a, e, omega, mass, radius, radGyra, k2, tidalTau):
+    """
+    Constant time lag (CTL) tidal evolution of binaries, as cplRates with
+    each body's tidal time lag tidalTau [s] instead of its tidal Q
+    """
+
+    a = np.asarray(a)[...,None]
+    e = np.asarray(e)[...,None]
+    mp = mass[...,::-1]
+    n = meanMotion(a, mass.sum(axis=-1, keepdims=True))
+    z = 3.0*BIGG**2*k2*mp**2*(mass + mp)*radius**5*tidalTau/a**9
+    f1, f2, f3, f4, f5 = _ctlF(e)
+
+    mu = BIGG*mass.prod(axis=-1, keepdims=True)
+    dadt = 2.0*a**2/mu*z*(f2*omega/n - f1)
+    dedt = 11.0*a*e/(2.0*mu)*z*(f4*omega/n - 18.0/11*f3)
+    domegadt = z/(2.0*mass*radGyra**2*radius**2*n)*(2.0*f2 - 2.0*f5*omega/n)
+
+    return dadt, dedt, domegadt
+# end function
+
+
+def ctlSpinRelaxation(a, e, mass, radius, radGyra, k2, tidalTau):
+    """
+    Rate [1/s] at which CTL tides relax each body's spin onto the equilibrium
+    rate, lambda in dw/dt = -lambda (w - w_eq), arguments as ctlRates
+    """
+
+    a = np.asarray(a)[...,None]
+    e = np.asarray(e)[...,None]
+    mp = mass[...,::-1]
+    n = meanMotion(a, mass.sum(axis=-1, keepdims=True))
+    z = 3.0*BIGG**2*k2*mp**2*(mass + mp)*radius**5*tidalTau/a**9
+    f5 = _ctlF(e)[4]
+
+    return z*f5/(mass*radGyra**2*radius**2*n*n)
+# end function
+
+
+def _phi(z, points=32):
+    """
+    phi_1, phi_2 and phi_3 of exponential integrators, phi_1(z) = (exp(z) -
+    1)/z, ..., as means over a circle about z, Kassam & Trefethen (2005), so
+    they stay accurate as z goes to 0
+    """
+
+    zz = z[...,None] + np.exp(1j*np.pi*(np.arange(1, points + 1) - 0.5)/points)
+    ez = np.exp(zz)
+    phi1 = np.mean((ez - 1.0)/zz, axis=-1).real
+    phi2 = np.mean((ez - 1.0 - zz)/zz**2, axis=-1).real
+    phi3 = np.mean((ez - 1.0 - zz - 0.5*zz*zz)/zz**3, axis=-1).real
+
+    return phi1, phi2, phi3
+# end function
+
+
+def etdCoefficients(z, h):
+    """
+    Coefficients of a Krogstad (2005) ETDRK4 step of size h of du/dt = L u +
+    N(u, t), with z = L h, which are those of a classical RK4 step where z = 0
+
+    Returns
+    -------
+    coeffs : dict
+        "decay" and "halfDecay", exp(z) and exp(z/2); "a1", "b2", "c1" and
+        "c2", the weights of the stage rates in the stages; and "w1", "w2"
+        and "w3", their weights in the step
+    """
+
+    z = np.asarray(z, dtype=float)
+    coeffs = {"decay" : np.exp(z), "halfDecay" : np.exp(0.5*z),
+              "a1" : 0.5*h, "b2" : 0.5*h, "c1" : h, "c2" : h,
+              "w1" : h/6.0, "w2" : h/3.0, "w3" : h/6.0}
+
+    # Only where there's something to integrate exactly
+    stiff = z != 0
+    if np.any(stiff):
+        hs = h[stiff]
+        half1, half2, _ = _phi(0.5*z[stiff])
+        phi1, phi2, phi3 = _phi(z[stiff])
+        for name, value in (("a1", 0.5*hs*half1), ("b2", hs*half2), ("c1", hs*phi1),
+                            ("c2", 2.0*hs*phi2), ("w1", hs*(phi1 - 3.0*phi2 + 4.0*phi3)),
+                            ("w2", hs*(2.0*phi2 - 4.0*phi3)), ("w3", hs*(4.0*phi3 - phi2))):
+            coeffs[name] = np.array(np.broadcast_to(coeffs[name], z.shape))
+            coeffs[name][stiff] = value
+
+    return coeffs
+# end function
+
+
+class Body(object):
+    """
+    A star read from its body file
+    """
+
+    def __init__(self, path, units):
+        options = readInput(path)
+        uMass, uLength, uTime = units
+
+        def value(key, default=None):
+            if key not in options:
+                if default is None:
+                    raise ValueError("%s: no %s" % (path, key))
+                return default
+            return float(options[key][0])
+
+        self.name = options.get("sName", [os.path.splitext(os.path.basename(path))[0]])[0]
+        modules = [module.lower() for module in options.get("saModules", [])]
+        self.eqtide = "eqtide" in modules
+        if "stellar" not in modules:
+            raise ValueError("%s: only stars evolved by the stellar module are supported" % path)
+        if options.get("sStellarModel", ["baraffe"])[0].lower() != "baraffe":
+            raise ValueError("%s: unsupported sStellarModel" % path)
+
+        # Negative masses are Earth masses, negative periods days
+        mass = value("dMass")
+        self.mass = mass*uMass if mass > 0 else -mass*5.972186e24
+        self.age = value("dAge", 0.0)*uTime
+        rotPer = value("dRotPeriod", -1.0)
+        self.omega = 2.0*np.pi/(rotPer*uTime if rotPer > 0 else -rotPer*DAYSEC)
+
+        self.braking = options.get("sMagBrakingModel", ["none"])[0].lower()
+        if self.braking not in ("matt", "reiners", "none"):
+            raise ValueError("%s: unsupported sMagBrakingModel %s" % (path, self.braking))
+
+        # Tides, negative time lags are in seconds
+        self.tideModel = options.get("sTideModel", [None])[0]
+        self.perturbers = options.get("saTidePerts", [])
+        self.k2 = value("dK2", 0.5)
+        self.tidalQ = value("dTidalQ", 1.0e6)
+        tau = value("dTidalTau", -1.0)
+        self.tidalTau = tau*uTime if tau > 0 else -tau
+        self.maxLockDiff = value("dMaxLockDiff", 0.0)
+
+        # Orbit, if this body holds it: negative periods are days, negative
+        # semi-major axes AU
+        self.orbPeriod = None
+        self.semi = None
+        if "dOrbPeriod" in options:
+            period = value("dOrbPeriod")
+            self.orbPeriod = period*uTime if period > 0 else -period*DAYSEC
+        elif "dSemi" in options:
+            semi = value("dSemi")
+            self.semi = semi*uLength if semi > 0 else -semi*AUM
+        self.ecc = value("dEcc", 0.0)
+
+        self.outputs = options.get("saOutputOrder", [])
+        for name in self.outputs:
+            if name.lstrip("-") not in output_units:
+                raise ValueError("%s: unsupported output %s" % (path, name))
+# end class
+
+
+class Simulation(object):
+    """
+    A vplanet simulation, read from its vpl.in and body files.
+
+    e.g. sim = Simulation("simulation_0/vpl.in")
+         sim.run()
+    """
+
+    def __init__(self, infile="vpl.in"):
+        self.directory = os.path.dirname(os.path.abspath(infile))
+        options = readInput(infile)
+        self.name = options.get("sSystemName", ["bintides"])[0]
+
+        self.units = (_unit(mass_units, options.get("sUnitMass", ["solar"])[0], "mass"),
+                      _unit(length_units, options.get("sUnitLength", ["aU"])[0], "length"),
+                      _unit(time_units, options.get("sUnitTime", ["year"])[0], "time"))
+        uTime = self.units[2]
+
+        self.stopTime = float(options.get("dStopTime", ["0"])[0])*uTime
+        self.outputTime = float(options.get("dOutputTime", ["0"])[0])*uTime
+        self.eta = float(options.get("dEta", ["0.01"])[0])
+        self.minValue = float(options.get("dMinValue", ["0"])[0])
+        self.varDt = int(options.get("bVarDt", ["1"])[0]) != 0
+        self.timeStep = float(options.get("dTimeStep", ["0"])[0])*uTime
+        if self.outputTime <= 0:
+            self.outputTime = self.stopTime
+        if not self.varDt and self.timeStep <= 0:
+            raise ValueError("%s: bVarDt 0 needs dTimeStep" % infile)
+
+        self.bodies = [Body(os.path.join(self.directory, name), self.units)
+                       for name in options.get("saBodyFiles", [])]
+        if len(self.bodies) == 0:
+            raise ValueError("%s: no saBodyFiles" % infile)
+
+        self.mass = np.array([body.mass for body in self.bodies])
+        self.age = np.array([body.age for body in self.bodies])
+        self.k2 = np.array([body.k2 for body in self.bodies])
+        self.tidalQ = np.array([body.tidalQ for body in self.bodies])
+        self.tidalTau = np.array([body.tidalTau for body in self.bodies])
+        self.maxLockDiff = np.array([body.maxLockDiff for body in self.bodies])
+        self._setupTides(infile)
+        self._setupOutputs()
+    # end function
+
+    def _setupTides(self, infile):
+        """
+        The tidally interacting pair, if any, its tidal model and its orbit
+        """
+
+        tidal = [ii for ii, body in enumerate(self.bodies) if body.eqtide]
+        self.pair = None
+        if len(tidal) == 0:
+            return
+
+        names = [self.bodies[ii].name for ii in tidal]
+        if len(tidal) != 2 or self.bodies[tidal[0]].perturbers != [names[1]] or \
+           self.bodies[tidal[1]].perturbers != [names[0]]:
+            raise ValueError("%s: eqtide needs exactly two bodies perturbing each other" % infile)
+        self.pair = np.array(tidal)
+
+        models = [self.bodies[ii].tideModel for ii in tidal if self.bodies[ii].tideModel]
+        self.tideModel = models[0].lower() if models else "p2"
+        if self.tideModel not in ("p2", "t8"):
+            raise ValueError("%s: unsupported sTideModel %s" % (infile, self.tideModel))
+
+        holders = [ii for ii in tidal if self.bodies[ii].orbPeriod is not None or
+                   self.bodies[ii].semi is not None]
+        if len(holders) != 1:
+            raise ValueError("%s: exactly one tidal body needs dOrbPeriod or dSemi" % infile)
+        holder = self.bodies[holders[0]]
+        self.orbitBody = holders[0]
+
+        total = self.mass[self.pair].sum()
+        if holder.orbPeriod is not None:
+            self.a0 = (BIGG*total*holder.orbPeriod**2/(4.0*np.pi**2))**(1.0/3.0)
+        else:
+            self.a0 = holder.semi
+        self.e0 = holder.ecc
+    # end function
+
+    def _setupOutputs(self):
+        """
+        Conversion of every body's outputs from SI to the requested units
+        """
+
+        dims = {"time" : self.units[2], "length" : self.units[1], "rate" : 1.0/self.units[2]}
+        self.columns = []
+        for body in self.bodies:
+            columns = []
+            for option in body.outputs:
+                name = option.lstrip("-")
+                dim, unit = output_units[name]
+                if not option.startswith("-") and dim is not None:
+                    unit = dims[dim]
+                if name in orbit_outputs and self.pair is None:
+                    raise ValueError("%s: %s needs eqtide" % (body.name, name))
+                columns.append((name, unit))
+            self.columns.append(columns)
+    # end function
+
+    def layout(self):
+        """
+        What simulations evolved together in an Ensemble must share: the
+        number of bodies, which pair has tides and how, and the outputs
+        """
+
+        tides = None
+        if self.pair is not None:
+            tides = (tuple(self.pair), self.tideModel)
+        return (len(self.bodies), tides, tuple(tuple(columns) for columns in self.columns))
+    # end function
+
+    def run(self, stiff=False):
+        """
+        Evolve the system to dStopTime, writing the forward files and log.
+        Returns False if the run halted early, e.g. the stars merged.
+        """
+
+        return Ensemble([self], stiff=stiff).run()[0]
+    # end function
+# end class
+
+
+class Ensemble(object):
+    """
+    Simulations sharing a layout, e.g. the systems of a Monte Carlo ensemble,
+    evolved together in arrays with one row per simulation.  Each simulation
+    still takes its own adaptive steps and stops at its own dStopTime: every
+    pass advances each unfinished simulation by one step of its own size, and
+    simulations that finish are written out and dropped from the arrays.
+
+    e.g. sims = [Simulation(os.path.join(d, "vpl.in")) for d in dirs]
+         ok = Ensemble(sims).run()
+
+    With stiff=True, spins near synchronous rotation are stepped with the
+    exponential (CTL) or projected (CPL) tidal torque described above.  track,
+    a function like stellarTrack.trackRates, gives the stars' structure,
+    e.g. stellarTrack.trackTable().rates for a tabulated track.  Defaults to
+    trackRates.
+    """
+
+    def __init__(self, sims, stiff=False, track=trackRates):
+        if len(set(sim.layout() for sim in sims)) != 1:
+            raise ValueError("Simulations evolved together must share their bodies, tides and outputs")
+
+        first = sims[0]
+        self.sims = sims
+        self.stiff = stiff
+        self.nb = len(first.bodies)
+        self.pair = first.pair
+        self.tideModel = first.tideModel if first.pair is not None else None
+        self.columns = first.columns
+        self.track = track
+
+        def stack(name):
+            return np.array([getattr(sim, name) for sim in sims], dtype=float)
+
+        self.params = {name : stack(name) for name in ("mass", "age", "k2", "tidalQ",
+                                                       "tidalTau", "maxLockDiff", "stopTime",
+                                                       "outputTime", "eta", "minValue",
+                                                       "timeStep")}
+        self.params["varDt"] = np.array([sim.varDt for sim in sims])
+        self.params["braking"] = np.array([[braking_models.index(body.braking)
+                                            for body in sim.bodies] for sim in sims])
+
+        y = [[body.omega for body in sim.bodies] + [0.0]*self.nb for sim in sims]
+        if self.pair is not None:
+            y = [row + [sim.a0, sim.e0] for row, sim in zip(y, sims)]
+        self.y0 = np.array(y)
+    # end function
+
+    def _eqRotRate(self, p, a, e):
+        """
+        Equilibrium spin rate of each tidal pair
+        """
+
+        n = meanMotion(a, p["mass"][:,self.pair].sum(axis=-1))
+        if self.tideModel == "p2":
+            return cplEqRotRate(n, e)
+        return ctlEqRotRate(n, e)
+    # end function
+
+    def _tideRates(self, p, a, e, omega, radius, radGyra):
+        """
+        Tidal da/dt, de/dt and spin rates of change of the pairs' bodies
+        """
+
+        pair = self.pair
+        if self.tideModel == "p2":
+            return cplRates(a, e, omega, p["mass"][:,pair], radius[:,pair], radGyra[:,pair],
+                            p["k2"][:,pair], p["tidalQ"][:,pair])
+        return ctlRates(a, e, omega, p["mass"][:,pair], radius[:,pair], radGyra[:,pair],
+                        p["k2"][:,pair], p["tidalTau"][:,pair])
+    # end function
+
+    def _spinRelaxation(self, p, y, q, locked):
+        """
+        Rate [1/s] at which tides relax each unlocked CTL spin onto the
+        equilibrium rate, shaped like the states y and zero for everything
+        else, including CPL spins, whose tidal torque doesn't depend on how
+        fast they spin
+        """
+
+        rate = np.zeros_like(y)
+        if self.pair is not None and self.tideModel != "p2":
+            nb, pair = self.nb, self.pair
+            lam = ctlSpinRelaxation(y[:,2*nb], y[:,2*nb + 1], p["mass"][:,pair],
+                                    q["radius"][:,pair], q["radGyra"][:,pair],
+                                    p["k2"][:,pair], p["tidalTau"][:,pair])
+            rate[:,pair] = np.where(locked[:,pair], 0.0, lam)
+
+        return rate
+    # end function
+
+    def _brakingTorque(self, p, omega, radius, teff):
+        """
+        Magnetic braking torque on every body [J]
+        """
+
+        torque = np.zeros_like(omega)
+        for code, model in enumerate(braking_models):
+            use = p["braking"] == code
+            if model == "matt" and np.any(use):
+                torque[use] = mattTorque(omega[use], p["mass"][use], radius[use], teff[use])
+            elif model == "reiners" and np.any(use):
+                torque[use] = reinersTorque(omega[use], p["mass"][use], radius[use])
+
+        return torque
+    # end function
+
+    def _structure(self, p, *times):
+        """
+        Radius [m], radius of gyration, effective temperature [K], moment of
+        inertia [kg m^2] and dln(radius)/dt and dln(radius of gyration)/dt
+        [1/s] of every body at each of times, from one evaluation of the
+        track, as one dict per time
+        """
+
+        ages = np.concatenate([p["age"] + t[:,None] for t in times])/YEARSEC
+        mass = np.tile(p["mass"], (len(times), 1))
+        radius, radGyra, teff, dLnR, dLnRg = self.track(mass/MSUN, ages)
+        radius = radius*RSUN
+
+        s = {"radius" : radius, "radGyra" : radGyra, "teff" : teff,
+             "inertia" : mass*radGyra**2*radius**2, "dLnRadius" : dLnR/YEARSEC,
+             "dLnRadGyra" : dLnRg/YEARSEC}
+        split = {name : np.split(value, len(times)) for name, value in s.items()}
+
+        return [{name : value[k] for name, value in split.items()} for k in range(len(times))]
+    # end function
+
+    def _evaluate(self, p, t, y, locked, s=None):
+        """
+        Rates of change of the states y = [spins, lost angular momenta, a, e]
+        at times t, and the quantities they're made of.  s is the bodies'
+        structure at t, if it's already been looked up.
+        """
+
+        nb = self.nb
+        omega = y[:,:nb].copy()
+        if s is None:
+            s = self._structure(p, t)[0]
+        radius, radGyra, teff, inertia = s["radius"], s["radGyra"], s["teff"], s["inertia"]
+        dLnInertia = 2.0*(s["dLnRadius"] + s["dLnRadGyra"])
+
+        q = dict(s)
+
+        # Locked spins sit at the equilibrium rate
+        pair = self.pair
+        if pair is not None:
+            a, e = y[:,2*nb], y[:,2*nb + 1]
+            omegaEq = self._eqRotRate(p, a, e)
+            omega[:,pair] = np.where(locked[:,pair], omegaEq[:,None], omega[:,pair])
+            q["omegaEq"] = omegaEq
+
+        # Spin changes from braking and contraction at fixed angular momentum
+        torque = self._brakingTorque(p, omega, radius, teff)
+        dOmegaStellar = torque/inertia - omega*dLnInertia
+        dOmegaTide = np.zeros_like(omega)
+
+        dydt = np.zeros_like(y)
+        if pair is not None:
+            dadt, dedt, dOmegaTide[:,pair] = self._tideRates(p, a, e, omega[:,pair], radius,
+                                                             radGyra)
+            q["dadtTide"] = dadt
+            dadt = dadt.sum(axis=-1)
+
+            # The orbit supplies the angular momentum locked spins lose to
+            # braking and contraction, including what the spins must gain to
+            # stay at the equilibrium rate as the orbit changes
+            lk = locked[:,pair]
+            if np.any(lk):
+                mass = p["mass"][:,pair]
+                mu = mass.prod(axis=-1)/mass.sum(axis=-1)
+                orbAngMom = mu*np.sqrt(BIGG*mass.sum(axis=-1)*a*(1.0 - e*e))
+                spin = np.where(lk, inertia[:,pair]*omega[:,pair], 0.0)
+                drain = np.where(lk, torque[:,pair] - spin*dLnInertia[:,pair], 0.0)
+                dadt = dadt + 2.0*a*drain.sum(axis=-1)/(orbAngMom - 3.0*spin.sum(axis=-1))
+
+            dydt[:,2*nb] = dadt
+            dydt[:,2*nb + 1] = dedt.sum(axis=-1)
+
+        dydt[:,:nb] = np.where(locked, 0.0, dOmegaStellar + dOmegaTide)
+        dydt[:,nb:2*nb] = -torque
+
+        q.update(omega=omega, torque=torque, dOmegaStellar=dOmegaStellar,
+                 dOmegaTide=dOmegaTide)
+        return dydt, q
+    # end function
+
+    def _timestep(self, p, y, dydt, q, locked):
+        """
+        dEta times the shortest timescale of each system's spins, orbit and
+        structure
+        """
+
+        nb = self.nb
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fastest = np.max(np.where(locked, 0.0, np.fabs(dydt[:,:nb]/y[:,:nb])), axis=1)
+            fastest = np.maximum(fastest, np.max(np.fabs(q["dLnRadius"]), axis=1))
+            fastest = np.maximum(fastest, np.max(np.fabs(q["dLnRadGyra"]), axis=1))
+            if self.pair is not None:
+                a, e = y[:,2*nb], y[:,2*nb + 1]
+                fastest = np.maximum(fastest, np.fabs(dydt[:,2*nb]/a))
+                fastest = np.maximum(fastest, np.where(e > p["minValue"],
+                                                       np.fabs(dydt[:,2*nb + 1]/e), 0.0))
+            dt = np.where(fastest > 0, p["eta"]/fastest, p["outputTime"])
+
+        return np.where(p["varDt"], dt, p["timeStep"])
+    # end function
+
+    def _holds(self, p, y, q, diff=None):
+        """
+        Whether tides can hold each of the pairs' bodies within diff, by
+        default dMaxLockDiff, of the equilibrium rate, against braking and
+        contraction
+        """
+
+        nb = self.nb
+        a, e = y[:,2*nb], y[:,2*nb + 1]
+        omegaEq = q["omegaEq"][:,None]
+        external = q["dOmegaStellar"][:,self.pair]
+
+        if diff is None:
+            diff = p["maxLockDiff"][:,self.pair]
+        below = self._tideRates(p, a, e, omegaEq*(1.0 - diff), q["radius"], q["radGyra"])[2]
+        above = self._tideRates(p, a, e, omegaEq*(1.0 + diff), q["radius"], q["radGyra"])[2]
+
+        return (below + external > 0) & (above + external < 0)
+    # end function
+
+    def _forceBehavior(self, p, t, y, locked, lockTime, side=None, s=None):
+        """
+        Tidal locking between steps: lock spins that reach the equilibrium
+        rate, hold locked spins there, and release those tides can't hold.
+        With side, the sign of each pair spin's offset from the equilibrium
+        rate before the step, stiff CPL spins that crossed or started on it
+        are put on it if the tides hold them there.  s is the bodies'
+        structure at t, if it's already been looked up.
+        """
+
+        if self.pair is None:
+            return
+
+        nb = self.nb
+        pair = self.pair
+        y[:,2*nb + 1] = np.where(y[:,2*nb + 1] < p["minValue"], 0.0, y[:,2*nb + 1])
+
+        _, q = self._evaluate(p, t, y, locked, s)
+        omegaEq = q["omegaEq"][:,None]
+        if side is not None:
+            slide = ((np.sign(y[:,pair] - omegaEq) != side) | (side == 0)) & ~locked[:,pair]
+            if np.any(slide):
+                slide &= self._holds(p, y, q, diff=np.full(side.shape, _slide_diff))
+                y[:,pair] = np.where(slide, omegaEq, y[:,pair])
+        near = np.fabs(y[:,pair]/omegaEq - 1.0) < p["maxLockDiff"][:,pair]
+        holds = self._holds(p, y, q)
+
+        newLocked = np.where(locked[:,pair], holds, near & holds)
+        lockTime[:,pair] = np.where(newLocked & (lockTime[:,pair] < 0), t[:,None],
+                                    lockTime[:,pair])
+        y[:,pair] = np.where(newLocked, omegaEq, y[:,pair])
+        locked[:,pair] = newLocked
+    # end function
+
+    def _stiffStep(self, p, t, y, k1, q, s, locked, nextOutput):
+        """
+        One exponential time differencing 4th order Runge-Kutta step (ETDRK4,
+        Krogstad 2005) of each system, integrating the tidal relaxation of CTL
+        spins, frozen at its rate and equilibrium at the start of the step,
+        exactly.  Everything else takes a classical RK4 step.  Steps are
+        limited by the rest of each spin's rate of change where that's slower
+        than the whole.
+
+        Returns
+        -------
+        y, dt : array
+            States after, and sizes of, the steps
+        side : array or None
+            Sign of each pair spin's offset from the equilibrium rate before
+            the step, for CPL, or None
+        s : dict
+            Bodies' structure at the end of the steps
+        """
+
+        # CPL spins tides hold on the equilibrium rate move with it over the
+        # step, as locked ones do
+        pair = self.pair
+        side = None
+        if pair is not None and self.tideModel == "p2":
+            side = np.sign(y[:,pair] - q["omegaEq"][:,None])
+            held = (side == 0) & ~locked[:,pair]
+            if np.any(held):
+                held &= self._holds(p, y, q, diff=np.full(side.shape, _slide_diff))
+            if np.any(held):
+                locked = locked.copy()
+                locked[:,pair] |= held
+                k1, q = self._evaluate(p, t, y, locked, s)
+
+        lam = self._spinRelaxation(p, y, q, locked)
+        center = np.zeros_like(y)
+        if pair is not None:
+            center[:,pair] = np.where(lam[:,pair] > 0, q["omegaEq"][:,None], 0.0)
+
+        # Offsets from the frozen equilibrium, and rates of change without the
+        # frozen relaxation
+        u = y - center
+        g1 = k1 + lam*u
+        rates = np.where(np.fabs(g1) < np.fabs(k1), g1, k1)
+        dt = np.minimum(self._timestep(p, y, rates, q, locked), nextOutput - t)
+
+        h = np.broadcast_to(dt[:,None], y.shape)
+        c = etdCoefficients(-lam*h, h)
+        mid, end = self._structure(p, t + 0.5*dt, t + dt)
+
+        def rate(tt, uu, ss):
+            k, _ = self._evaluate(p, tt, uu + center, locked, ss)
+            return k + lam*uu
+        # end function
+
+        ua = c["halfDecay"]*u + c["a1"]*g1
+        ga = rate(t + 0.5*dt, ua, mid)
+        ub = ua + c["b2"]*(ga - g1)
+        gb = rate(t + 0.5*dt, ub, mid)
+        uc = c["decay"]*u + c["c1"]*g1 + c["c2"]*(gb - g1)
+        gc = rate(t + dt, uc, end)
+        u = c["decay"]*u + c["w1"]*g1 + c["w2"]*(ga + gb) + c["w3"]*gc
+
+        return u + center, dt, side, end
+    # end function
+
+    def _properties(self, p, t, y, q):
+        """
+        Every output and log quantity, in SI, as (systems, bodies) arrays
+        """
+
+        nb = self.nb
+        omega = q["omega"]
+        inertia = q["inertia"]
+        lost = y[:,nb:2*nb]
+
+        props = {"Time" : t, "Mass" : p["mass"], "Age" : p["age"] + t[:,None],
+                 "Radius" : q["radius"], "RadGyra" : q["radGyra"], "Temperature" : q["teff"],
+                 "RotRate" : omega, "RotPer" : 2.0*np.pi/omega, "LostAngMom" : lost,
+                 "DRotPerDtStellar" : -2.0*np.pi/omega**2*q["dOmegaStellar"]}
+        totEn = np.sum(0.5*inertia*omega**2, axis=1)
+        totAngMom = np.sum(inertia*omega + lost, axis=1)
+
+        pair = self.pair
+        if pair is not None:
+            a, e = y[:,2*nb], y[:,2*nb + 1]
+            mass = p["mass"][:,pair]
+            n = meanMotion(a, mass.sum(axis=-1))
+            orbAngMom = mass.prod(axis=-1)/mass.sum(axis=-1)*np.sqrt(BIGG*mass.sum(axis=-1)*a*(1.0 - e*e))
+            totEn = totEn - BIGG*mass.prod(axis=-1)/(2.0*a)
+            totAngMom = totAngMom + orbAngMom
+
+            # Tidal heating: the orbital and spin energy each body's tide
+            # dissipates
+            power = -(BIGG*mass.prod(axis=-1)/(2.0*a*a))[:,None]*q["dadtTide"] - \
+                    inertia[:,pair]*omega[:,pair]*q["dOmegaTide"][:,pair]
+            flux = np.zeros_like(omega)
+            flux[:,pair] = power/(4.0*np.pi*q["radius"][:,pair]**2)
+            eqRotPer = np.zeros_like(omega)
+            eqRotPer[:,pair] = 2.0*np.pi/q["omegaEq"][:,None]
+
+            props.update({"Semim" : a, "Ecce" : e, "OrbPeriod" : 2.0*np.pi/n,
+                          "OrbPer" : 2.0*np.pi/n, "MeanMotion" : n, "OrbAngMom" : orbAngMom,
+                          "EqRotPer" : eqRotPer, "SurfEnFluxTotal" : flux,
+                          "DRotPerDtEqtide" : -2.0*np.pi/omega**2*q["dOmegaTide"]})
+
+        props.update(TotEn=totEn, TotAngMom=totAngMom, TotAng=totAngMom)
+        for name, value in props.items():
+            props[name] = np.broadcast_to(value[:,None] if value.ndim == 1 else value,
+                                          omega.shape)
+
+        return props
+    # end function
+
+    def _rows(self, props):
+        """
+        Each body's output rows, in its saOutputOrder and units
+        """
+
+        rows = []
+        for ii, columns in enumerate(self.columns):
+            if columns:
+                rows.append(np.stack([props[name][:,ii]/unit for name, unit in columns], axis=1))
+            else:
+                rows.append(np.empty((len(props["Time"]), 0)))
+
+        return rows
+    # end function
+
+    def _writeLog(self, f, sim, stage, props, ii, steps=0):
+        """
+        Write one simulation's INITIAL or FINAL system properties to its log
+        """
+
+        def value(name, body=0):
+            return props[name][ii, body]
+
+        f.write("\n---- %s SYSTEM PROPERTIES ----\n" % stage)
+        f.write("(Age) System Age [sec]: %.6e \n" % props["Age"][ii].max())
+        f.write("(Time) Simulation Time [sec]: %.6e \n" % value("Time"))
+        f.write("(TotEn) Total System Energy [kg*m^2/sec^2]: %.6e \n" % value("TotEn"))
+        f.write("(TotAngMom) Total Angular Momentum [kg*m^2/sec]: %.6e \n" % value("TotAngMom"))
+        if steps > 0:
+            f.write("(DeltaTime) Average Timestep [sec]: %.6e \n" % (value("Time")/steps))
+
+        for jj, body in enumerate(sim.bodies):
+            f.write("\n----- BODY: %s ----\n" % body.name)
+            f.write("(Mass) Mass [kg]: %.6e \n" % value("Mass", jj))
+            f.write("(Age) Age [sec]: %.6e \n" % value("Age", jj))
+            f.write("(Radius) Radius [m]: %.6e \n" % value("Radius", jj))
+            f.write("(RadGyra) Radius of Gyration []: %.6f \n" % value("RadGyra", jj))
+            f.write("(Temperature) Effective Temperature [K]: %.6f \n" % value("Temperature", jj))
+            f.write("(RotRate) Rotational Frequency [/sec]: %.6e \n" % value("RotRate", jj))
+            f.write("(RotPer) Rotation Period [sec]: %.6e \n" % value("RotPer", jj))
+            f.write("(LostAngMom) Lost Angular Momentum [kg*m^2/sec]: %.6e \n" %
+                    value("LostAngMom", jj))
+            if body.eqtide:
+                if jj == sim.orbitBody:
+                    f.write("(Semim) Semi-Major Axis [m]: %.6e \n" % value("Semim", jj))
+                    f.write("(Ecce) Eccentricity []: %.6f \n" % value("Ecce", jj))
+                    f.write("(OrbPeriod) Orbital Period [sec]: %.6e \n" % value("OrbPeriod", jj))
+                f.write("(EqRotPer) Equilibrium Rotation Period [sec]: %.6e \n" %
+                        value("EqRotPer", jj))
+                f.write("(K2) Love Number k2 []: %.6f \n" % body.k2)
+                if sim.tideModel == "p2":
+                    f.write("(TidalQ) Tidal Q []: %.6e \n" % body.tidalQ)
+                else:
+                    f.write("(TidalTau) Time Lag [sec]: %.6e \n" % body.tidalTau)
+                f.write("(LockTime) Time when body tidally locked [sec]: %.6e \n" %
+                        value("LockTime", jj))
+            f.write("\nOutput Order: %s\n" % " ".join(body.outputs))
+    # end function
+
+    def _finish(self, sim, initial, final, ii, jj, rows, count, steps):
+        """
+        Write one finished simulation's forward files and log, from row ii of
+        initial and the output buffers, and row jj of final
+        """
+
+        for body, buffer in zip(sim.bodies, rows):
+            path = os.path.join(sim.directory, "%s.%s.forward" % (sim.name, body.name))
+            with open(path, 'w') as f:
+                np.savetxt(f, buffer[ii,:count], fmt="%.6e", delimiter=" ")
+
+        with open(os.path.join(sim.directory, sim.name + ".log"), 'w') as f:
+            f.write("-------- Log file %s.log -------\n\n" % sim.name)
+            f.write("Executable: %s\n" % os.path.basename(__file__))
+            f.write("System Name: %s\n" % sim.name)
+            if sim.pair is not None:
+                f.write("Tidal Model: %s\n" % ("CPL" if sim.tideModel == "p2" else "CTL"))
+            self._writeLog(f, sim, "INITIAL", initial, ii)
+            self._writeLog(f, sim, "FINAL", final, jj, steps=steps)
+    # end function
+
+    def run(self):
+        """
+        Evolve every simulation to its dStopTime, writing each one's forward
+        files and log as it finishes.
+
+        Returns
+        -------
+        ok : list
+            For each simulation, False if it halted early, e.g. the stars
+            merged
+        """
+
+        N, nb = len(self.sims), self.nb
+        p = dict(self.params)
+        y = self.y0.copy()
+        t = np.zeros(N)
+        locked = np.zeros((N, nb), dtype=bool)
+        lockTime = np.full((N, nb), -1.0)
+
+        s = self._structure(p, t)[0]
+        self._forceBehavior(p, t, y, locked, lockTime, s=s)
+        _, q = self._evaluate(p, t, y, locked, s)
+        initial = self._properties(p, t, y, q)
+        initial["LockTime"] = lockTime.copy()
+
+        # Every simulation's output rows until it finishes
+        nOutputs = np.ceil(p["stopTime"]/p["outputTime"]*(1.0 - 1.0e-12)).astype(int)
+        rows = [np.empty((N, nOutputs.max() + 1, row.shape[1])) for row in self._rows(initial)]
+        for buffer, row in zip(rows, self._rows(initial)):
+            buffer[:,0] = row
+        count = np.ones(N, dtype=int)
+
+        # Row of each live simulation in the original order
+        live = np.arange(N)
+        nOut = np.ones(N, dtype=int)
+        steps = np.zeros(N, dtype=int)
+        ok = [True]*N
+        while len(live) > 0:
+            nextOutput = np.minimum(nOut*p["outputTime"], p["stopTime"])
+
+            # 4th order Runge-Kutta, with locks fixed over the step.  The
+            # structure at the end of a step is that at the start of the next.
+            k1, q = self._evaluate(p, t, y, locked, s)
+            if self.stiff:
+                y, dt, side, s = self._stiffStep(p, t, y, k1, q, s, locked, nextOutput)
+            else:
+                dt = np.minimum(self._timestep(p, y, k1, q, locked), nextOutput - t)
+                mid, s = self._structure(p, t + 0.5*dt, t + dt)
+                k2, _ = self._evaluate(p, t + 0.5*dt, y + 0.5*dt[:,None]*k1, locked, mid)
+                k3, _ = self._evaluate(p, t + 0.5*dt, y + 0.5*dt[:,None]*k2, locked, mid)
+                k4, _ = self._evaluate(p, t + dt, y + dt[:,None]*k3, locked, s)
+                y = y + dt[:,None]/6.0*(k1 + 2.0*k2 + 2.0*k3 + k4)
+                side = None
+            hit = dt >= nextOutput - t
+            t = np.where(hit, nextOutput, t + dt)
+            steps += 1
+
+            self._forceBehavior(p, t, y, locked, lockTime, side=side, s=s)
+            halted = ~np.all(np.isfinite(y), axis=1)
+            if self.pair is not None:
+                a, e = y[:,2*nb], y[:,2*nb + 1]
+                with np.errstate(invalid="ignore"):
+                    halted |= a*(1.0 - e) <= q["radius"][:,self.pair].sum(axis=-1)
+
+            # Output rows
+            out = hit & ~halted
+            if np.any(out):
+                sub = {name : value[out] for name, value in p.items()}
+                _, qOut = self._evaluate(sub, t[out], y[out], locked[out],
+                                         {name : value[out] for name, value in s.items()})
+                index = live[out]
+                for buffer, row in zip(rows, self._rows(self._properties(sub, t[out], y[out], qOut))):
+                    buffer[index, count[index]] = row
+                count[index] += 1
+                nOut[out] += 1
+
+            # Write out and drop finished simulations
+            done = halted | (nOut > nOutputs[live])
+            if np.any(done):
+                sub = {name : value[done] for name, value in p.items()}
+                _, qDone = self._evaluate(sub, t[done], y[done], locked[done],
+                                          {name : value[done] for name, value in s.items()})
+                final = self._properties(sub, t[done], y[done], qDone)
+                final["LockTime"] = lockTime[done]
+                for jj, ii in enumerate(live[done]):
+                    sim = self.sims[ii]
+                    if halted[done][jj]:
+                        print("HALT %s at %.6e yr" % (sim.directory, t[done][jj]/YEARSEC))
+                        ok[ii] = False
+                    self._finish(sim, initial, final, ii, jj, rows, count[ii], steps[done][jj])
+
+                keep = ~done
+                live, t, y, locked, lockTime = live[keep], t[keep], y[keep], locked[keep], lockTime[keep]
+                nOut, steps = nOut[keep], steps[keep]
+                p = {name : value[keep] for name, value in p.items()}
+                s = {name : value[keep] for name, value in s.items()}
+
+        return ok
+    # end function
+# end class
+
+
+def runSimulations(sims, batch=1000, stiff=False, track=trackRates):
+    """
+    Evolve simulations in Ensembles of up to batch simulations that share a
+    layout, returning whether each one ran to its dStopTime.  stiff and track
+    are as for Ensemble.
+    """
+
+    groups = {}
+    for ii, sim in enumerate(sims):
+        groups.setdefault(sim.layout(), []).append(ii)
+
+    ok = [True]*len(sims)
+    for indices in groups.values():
+        for start in range(0, len(indices), batch):
+            chunk = indices[start:start + batch]
+            ensemble = Ensemble([sims[ii] for ii in chunk], stiff=stiff, track=track)
+            for ii, result in zip(chunk, ensemble.run()):
+                ok[ii] = result
+
+    return ok
+# end function
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("infile", help="vplanet input file, e.g. vpl.in")
+    parser.add_argument("--stiff", action="store_true",
+                        help="Step spins near synchronous rotation with the stiff tidal torque")
+    args = parser.parse_args()
+
+    sys.exit(0 if Simulation(args.infile).run(stiff=args.stiff) else 1)
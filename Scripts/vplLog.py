@@ -0,0 +1,110 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Streaming parser for vplanet log files.  A log is walked line by line, once,
+keeping track of which section each line belongs to: the INITIAL or FINAL
+SYSTEM PROPERTIES, and within those, the system itself or one of the "BODY:"
+sections.  Every "(Key) Description [unit]: value" line becomes an entry,
+converted to float where possible, so values are looked up by stage, body and
+key, e.g. log["FINAL"]["secondary"]["LockTime"], instead of by the position
+of matching lines.
+
+When the keys and bodies of interest are given, parsing stops as soon as all
+of them have been found.
+
+"""
+
+stages = ("INITIAL", "FINAL") # Log sections holding system properties
+system_name = "system" # Body name for system-wide properties
+
+
+def _value(text):
+    """
+    A log value as a float if it is one, else as a stripped string
+    """
+
+    text = text.strip()
+    try:
+        return float(text)
+    except ValueError:
+        return text
+# end function
+
+
+def parseLog(path, keys=None, stages=stages, bodies=None):
+    """
+    Read a vplanet log file.
+
+    Parameters
+    ----------
+    path : str
+        Log file, e.g. simulation_0/bintides.log
+    keys : iterable, optional
+        Keys to keep, e.g. ["LockTime"]. Defaults to None, keep every key.
+    stages : iterable, optional
+        Sections to keep. Defaults to ("INITIAL", "FINAL").
+    bodies : iterable, optional
+        Bodies to keep, including "system" for system-wide properties.
+        Defaults to None, keep every body.
+
+    Returns
+    -------
+    log : dict
+        {stage : {body : {key : value}}} for the stages present in the log,
+        e.g. a run that didn't finish has no "FINAL" entry
+
+    If keys and bodies are both given, reading stops once every requested key
+    has been found for every requested body in every requested stage.
+    """
+
+    keys = None if keys is None else set(keys)
+    bodies = None if bodies is None else set(bodies)
+    stages = set(stages)
+
+    # What's left to find, if we can tell when we're done
+    remaining = None
+    if keys is not None and bodies is not None:
+        remaining = set((stage, body, key) for stage in stages
+                        for body in bodies for key in keys)
+
+    log = {}
+    stage = None
+    body = None
+    with open(path, 'r') as f:
+        for line in f:
+            # Section headers
+            if line.startswith("----"):
+                if "SYSTEM PROPERTIES" in line:
+                    stage = line.strip("- \n").split()[0]
+                    body = system_name
+                    if stage in stages:
+                        log[stage] = {}
+                    else:
+                        stage = None
+                elif "BODY:" in line and stage is not None:
+                    body = line.split("BODY:")[1].strip("- \n")
+                else:
+                    stage = None
+                continue
+
+            # Entries: (Key) Description [unit]: value
+            if stage is None or not line.startswith("("):
+                continue
+            if bodies is not None and body not in bodies:
+                continue
+
+            key = line[1:line.index(")")]
+            if keys is not None and key not in keys:
+                continue
+
+            log[stage].setdefault(body, {})[key] = _value(line.rsplit(":", 1)[1])
+
+            if remaining is not None:
+                remaining.discard((stage, body, key))
+                if len(remaining) == 0:
+                    break
+
+    return log
+# end function
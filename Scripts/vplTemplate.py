@@ -0,0 +1,173 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Compiled vplanet input file templates.  A template is read and scanned once
+for every substitutable option, e.g. dMass, dTidalQ, dRotPeriod, and then
+rendered for any number of systems by joining the fixed text around those
+options with the new values.  This replaces re-reading the template and running
+one re.sub per option for every system in the setup scripts.
+
+Running this file benchmarks rendering 10^5 primary.in files both ways.
+
+"""
+
+import os
+import re
+
+# Options the setup scripts substitute into the BinaryIn templates
+templateKeys = ["dMass", "dTidalQ", "dTidalTau", "dRotPeriod", "dEcc",
+                "dOrbPeriod", "dStopTime", "saBodyFiles"]
+
+
+def formatValue(key, value):
+    """
+    Format a single option the same way the setup scripts always have: floats
+    as %.5e and anything else, e.g. saBodyFiles, as a plain string.
+    """
+
+    if isinstance(value, str):
+        return '%s %s #' % (key, value)
+    else:
+        return '%s %.5e #' % (key, value)
+# end function
+
+
+def writtenValue(value):
+    """
+    Value vplanet reads back from an option formatted by formatValue
+    """
+
+    if isinstance(value, str):
+        return value
+    else:
+        return float('%.5e' % value)
+# end function
+
+
+def readOptions(path, keys):
+    """
+    Values of numeric options, e.g. dMass, scraped from an input file
+    """
+
+    with open(path, 'r') as f:
+        text = f.read()
+
+    values = []
+    for key in keys:
+        # Find the line where key lives, remove whitespace, make it a float
+        value = re.findall('%s(.*?)#' % key, text)[0]
+        values.append(float("".join(value.split())))
+
+    return values
+# end function
+
+
+class VplTemplate(object):
+    """
+    A vplanet input file template parsed once for the options to substitute.
+
+    e.g. tmpl = VplTemplate("primary.in")
+         primary_in = tmpl.render(dMass=0.5, dRotPeriod=-3.0)
+    """
+
+    def __init__(self, path, keys=templateKeys):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the template input file
+        keys : iterable, optional
+            Option names to make substitutable.  Options that do not appear in
+            the template are ignored.  Defaults to templateKeys.
+        """
+
+        self.path = path
+        with open(path, 'r') as f:
+            self.text = f.read()
+
+        # Record the offsets of every "key ... #" span, i.e. exactly what
+        # re.sub('%s(.*?)#' % key, ...) would have replaced
+        spans = []
+        for key in keys:
+            for match in re.finditer('%s(.*?)#' % key, self.text):
+                spans.append((match.start(), match.end(), key))
+        spans.sort()
+
+        for ii in range(1, len(spans)):
+            if spans[ii][0] < spans[ii-1][1]:
+                raise ValueError("Overlapping template options %s and %s in %s" %
+                                 (spans[ii-1][2], spans[ii][2], path))
+
+        # Split the template into fixed chunks around the substitutable spans
+        self.chunks = []
+        self.keys = []
+        self.defaults = []
+        last = 0
+        for start, end, key in spans:
+            self.chunks.append(self.text[last:start])
+            self.keys.append(key)
+            self.defaults.append(self.text[start:end])
+            last = end
+        self.chunks.append(self.text[last:])
+    # end function
+
+    def render(self, **values):
+        """
+        Fill in the template.  Options not given keep the template's value.
+
+        Returns
+        -------
+        text : str
+            The input file contents
+        """
+
+        parts = [self.chunks[0]]
+        for ii, key in enumerate(self.keys):
+            if key in values:
+                parts.append(formatValue(key, values[key]))
+            else:
+                parts.append(self.defaults[ii])
+            parts.append(self.chunks[ii+1])
+
+        return "".join(parts)
+    # end function
+# end class
+
+
+if __name__ == "__main__":
+    import time
+    import numpy as np
+
+    num = 100000
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                        "BinaryIn", "CPL", "primary.in")
+    dRotPeriods = -np.random.uniform(0.8, 15.0, num)
+    dTidalQs = 10**np.random.uniform(4, 8, num)
+    dMasses = np.random.uniform(0.1, 1.0, num)
+
+    # Old way: re-read the template and re.sub each option for every system
+    start = time.time()
+    for ii in range(num):
+        with open(path, 'r') as f:
+            primary_in = f.read()
+        primary_in = re.sub('%s(.*?)#' % 'dRotPeriod', '%s %.5e #' % ('dRotPeriod', dRotPeriods[ii]), primary_in)
+        primary_in = re.sub('%s(.*?)#' % 'dTidalQ', '%s %.5e #' % ('dTidalQ', dTidalQs[ii]), primary_in)
+        primary_in = re.sub('%s(.*?)#' % 'dMass', '%s %.5e #' % ('dMass', dMasses[ii]), primary_in)
+    oldTime = time.time() - start
+
+    # New way: compile once, render with string joins
+    start = time.time()
+    tmpl = VplTemplate(path)
+    for ii in range(num):
+        new_in = tmpl.render(dRotPeriod=dRotPeriods[ii], dTidalQ=dTidalQs[ii],
+                             dMass=dMasses[ii])
+    newTime = time.time() - start
+
+    assert new_in == primary_in
+
+    print("Rendered %d primary.in files" % num)
+    print("re.sub + re-read: %.2lf s" % oldTime)
+    print("VplTemplate: %.2lf s" % newTime)
+    print("Speedup: %.1lfx" % (oldTime/newTime))
@@ -1,5 +1,4 @@
 # Run all vplanet simulations
-import subprocess
 import sys
 import os
 
@@ -7,9 +6,9 @@ import os
 dir_path = os.path.dirname(os.path.realpath(__file__))
 dirs = ["5", "10", "20", "30", "40", "50", "60"]
 
-# Run simulations
-for dir in dirs:
-    os.chdir(os.path.join(dir_path,dir))
+# Run simulations, all at once, with the ensemble executor
+sys.path.append(os.path.join(dir_path, "..", "..", "Scripts"))
+from executor import DirectoryJob, runEnsemble
 
-    # Run simulation
-    subprocess.call(['vplanet', 'vpl.in'])
+jobs = [DirectoryJob(os.path.join(dir_path, dir)) for dir in dirs]
+runEnsemble(jobs, workers=len(jobs), resume=False)
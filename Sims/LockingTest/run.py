@@ -1,5 +1,4 @@
 # Run all vplanet simulations
-import subprocess
 import sys
 import os
 
@@ -7,9 +6,9 @@ import os
 dir_path = os.path.dirname(os.path.realpath(__file__))
 dirs = ["single", "q7", "q8", "tau0_01NoLock", "tau0_1NoLock", "q7NoLock", "q8NoLock", "tau0_01", "tau0_1"]
 
-# Run simulations
-for dir in dirs:
-    os.chdir(os.path.join(dir_path,dir))
+# Run simulations, all at once, with the ensemble executor
+sys.path.append(os.path.join(dir_path, "..", "..", "Scripts"))
+from executor import DirectoryJob, runEnsemble
 
-    # Run simulation
-    subprocess.call(['vplanet', 'vpl.in'])
+jobs = [DirectoryJob(os.path.join(dir_path, dir)) for dir in dirs]
+runEnsemble(jobs, workers=len(jobs), resume=False)
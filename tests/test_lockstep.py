@@ -0,0 +1,71 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+vplIntegrator.runSimulations evolving CPL and CTL binaries with different
+stop and output times in lockstep, one of which merges early, against
+evolving each one alone.
+
+"""
+
+import os
+import filecmp
+import numpy as np
+import pytest
+
+from vplCases import copyCase
+from vplIntegrator import runSimulations, DAYSEC, YEARSEC
+from stellarTrack import trackRates, RSUN
+
+# (Sims/ directory, stopTime [yr], outputTime [yr]) of each system
+systems = [("CTLTestMatt/5", 3.0e8, 1.0e7),
+           ("CTLTestMatt/10", 1.0e8, 2.0e7),
+           ("CPLTestMatt/5", 2.0e8, 1.0e7),
+           ("CTLTestMatt/30", 2.0e8, 5.0e6),
+           ("CTLTestMatt/5", 1.0e3, 10.0),
+           ("CPLTestMatt/30", 3.0e8, 3.0e7)]
+merger = 4 # System that merges after a few outputs
+
+
+def ensemble(root):
+    """
+    Copies of every system in root/simulation_*
+    """
+
+    sims = []
+    for ii, (src, stopTime, outputTime) in enumerate(systems):
+        sim = copyCase(src, os.path.join(root, "simulation_%d" % ii), stopTime, outputTime)
+        if ii == merger:
+            # Slowly spinning 1 Msun stars 1.3 times their summed radii apart
+            # spiral in
+            radius = trackRates(np.array([1.0]), np.array([sim.age[0]/YEARSEC]))[0][0]*RSUN
+            sim.a0 = 2.6*radius
+            for body in sim.bodies:
+                body.omega = 2.0*np.pi/(20.0*DAYSEC)
+        sims.append(sim)
+
+    return sims
+# end function
+
+
+@pytest.mark.parametrize("batch", [1000, 2])
+def test_lockstep_matches_alone(tmp_path, batch):
+    together = runSimulations(ensemble(str(tmp_path / "together")), batch=batch)
+    alone = [sim.run() for sim in ensemble(str(tmp_path / "alone"))]
+
+    assert together == alone
+    assert alone == [ii != merger for ii in range(len(systems))]
+    for ii in range(len(systems)):
+        left = str(tmp_path / "together" / ("simulation_%d" % ii))
+        right = str(tmp_path / "alone" / ("simulation_%d" % ii))
+        names = sorted(os.listdir(left))
+        assert names == sorted(os.listdir(right))
+        match, mismatch, errors = filecmp.cmpfiles(left, right, names, shallow=False)
+        assert mismatch == [] and errors == [], "simulation_%d" % ii
+
+    # The merger halted after some, but not all, of its outputs
+    rows = np.loadtxt(str(tmp_path / "together" / ("simulation_%d" % merger) /
+                          "bintides.secondary.forward"))
+    assert 1 < len(rows) < systems[merger][1]/systems[merger][2]
+# end function
@@ -0,0 +1,70 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+resample.interpolateRows against np.interp, one row at a time.
+
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "Scripts"))
+from resample import interpolateRows
+
+
+def randomRows(rng, num=500, steps=20, k=8, empty=0.0):
+    """
+    Padded time series like cube.py writes, with a fraction empty of rows
+    without output, and ages to evaluate them at
+    """
+
+    lengths = rng.integers(1, steps + 1, num)
+    lengths[rng.random(num) < empty] = 0
+    times = np.cumsum(rng.uniform(0.1, 10.0, (num, steps)), axis=1)
+    values = rng.uniform(1.0, 100.0, (num, steps))
+    pad = np.arange(steps) >= lengths[:,None]
+    times[pad] = np.nan
+    values[pad] = np.nan
+    ages = rng.uniform(-10.0, 10.0*steps + 10.0, (num, k))
+
+    return times, values, lengths, ages
+# end function
+
+
+def check(times, values, lengths, ages, log=False):
+    """
+    Compare every row to np.interp
+    """
+
+    result = interpolateRows(times, values, lengths, ages, log=log)
+    for ii, n in enumerate(lengths):
+        if n == 0:
+            assert np.all(np.isnan(result[ii]))
+        elif log:
+            expect = np.exp(np.interp(ages[ii], times[ii,:n], np.log(values[ii,:n])))
+            np.testing.assert_allclose(result[ii], expect, rtol=1.0e-10)
+        else:
+            np.testing.assert_allclose(result[ii], np.interp(ages[ii], times[ii,:n], values[ii,:n]),
+                                       rtol=1.0e-10)
+# end function
+
+
+def test_interpolate_rows():
+    check(*randomRows(np.random.default_rng(1)))
+# end function
+
+
+def test_interpolate_rows_with_empty_rows():
+    rng = np.random.default_rng(2)
+    check(*randomRows(rng, empty=0.2))
+    check(*randomRows(rng, empty=0.2), log=True)
+# end function
+
+
+def test_interpolate_rows_all_empty():
+    times, values, lengths, ages = randomRows(np.random.default_rng(3), num=10, empty=1.0)
+    assert np.all(np.isnan(interpolateRows(times, values, lengths, ages)))
+# end function
@@ -0,0 +1,107 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+vplIntegrator.py's stiff spin stepping: explicit steps are unchanged, stiff
+steps agree with explicit ones, also without locking, where explicit steps of
+the same size don't, and stiff CPL spins that cross the equilibrium rate are
+put on it and locked.
+
+"""
+
+import os
+import numpy as np
+import pytest
+
+from vplCases import reference_dir, copyCase, runCase
+from vplIntegrator import Ensemble, YEARSEC
+from vplLog import parseLog
+
+# Outputs compared between stiff and explicit runs
+period_names = ("RotPer", "EqRotPer", "OrbPer")
+
+
+def periods(directory, names):
+    """
+    The secondary's output periods, as a (steps, len(period_names)) array
+    """
+
+    data = np.loadtxt(os.path.join(directory, "bintides.secondary.forward"))
+    return data[:,[names.index(name) for name in period_names]]
+# end function
+
+
+def test_explicit_matches_reference(tmp_path):
+    assert runCase("CTL5NoLock", str(tmp_path / "sim"))
+
+    for body in ("primary", "secondary"):
+        forward = "bintides.%s.forward" % body
+        np.testing.assert_allclose(np.loadtxt(str(tmp_path / "sim" / forward)),
+                                   np.loadtxt(os.path.join(reference_dir, "CTL5NoLock", forward)),
+                                   rtol=1.0e-5, atol=1.0e-30)
+# end function
+
+
+def test_stiff_agrees_with_explicit(tmp_path):
+    explicit = copyCase("CTLTestMatt/5", str(tmp_path / "explicit"))
+    stiff = copyCase("CTLTestMatt/5", str(tmp_path / "stiff"))
+    assert Ensemble([explicit]).run() == [True]
+    assert Ensemble([stiff], stiff=True).run() == [True]
+
+    names = [name for name, _ in explicit.columns[1]]
+    np.testing.assert_allclose(periods(str(tmp_path / "stiff"), names),
+                               periods(str(tmp_path / "explicit"), names), rtol=5.0e-5)
+# end function
+
+
+def test_stiff_without_locking_matches_fine_explicit(tmp_path):
+    sim = copyCase("CTLTestMatt/5", str(tmp_path / "sim"), nolock=True)
+    assert Ensemble([sim], stiff=True).run() == [True]
+
+    # Explicit steps 100 times shorter
+    names = [name for name, _ in sim.columns[1]]
+    np.testing.assert_allclose(periods(str(tmp_path / "sim"), names),
+                               periods(os.path.join(reference_dir, "CTL5NoLockFine"), names),
+                               rtol=1.0e-5)
+# end function
+
+
+@pytest.mark.parametrize("sign", [1.0, -1.0])
+def test_cpl_crossing_locks(tmp_path, sign):
+    ensemble = Ensemble([copyCase("CPLTestMatt/5", str(tmp_path / "sim"))], stiff=True)
+    p = dict(ensemble.params)
+    t = np.array([2.5e7*YEARSEC])
+    y = ensemble.y0.copy()
+    pair = ensemble.pair
+    locked = np.zeros(y[:,:ensemble.nb].shape, dtype=bool)
+    _, q = ensemble._evaluate(p, t, y, locked)
+    omegaEq = q["omegaEq"][:,None]
+
+    # Spins 5% past the equilibrium rate, outside the dMaxLockDiff window,
+    # lock only if they crossed it during the step
+    for side, expect in ((np.full((1, 2), sign), True), (np.full((1, 2), -sign), False),
+                         (None, False)):
+        y[:,pair] = omegaEq*(1.0 - 0.05*sign)
+        lk = locked.copy()
+        lockTime = np.full(lk.shape, -1.0)
+        ensemble._forceBehavior(p, t, y, lk, lockTime, side=side)
+
+        assert np.all(lk[:,pair] == expect)
+        if expect:
+            assert np.all(y[:,pair] == omegaEq)
+            assert np.all(lockTime[:,pair] == t[0])
+        else:
+            assert np.all(lockTime[:,pair] == -1.0)
+# end function
+
+
+def test_cpl_stiff_run_locks(tmp_path):
+    sim = copyCase("CPLTestMatt/5", str(tmp_path / "sim"), eta=0.3)
+    assert Ensemble([sim], stiff=True).run() == [True]
+
+    log = parseLog(str(tmp_path / "sim" / "bintides.log"), stages=["FINAL"])["FINAL"]
+    for body in ("primary", "secondary"):
+        assert 0.0 < log[body]["LockTime"] < sim.stopTime
+        assert log[body]["RotPer"] == pytest.approx(log[body]["EqRotPer"], rel=1.0e-6)
+# end function
@@ -0,0 +1,77 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+vplIntegrator.py on shortened CPL and CTL binaries from Sims/: against stored
+forward files, conservation of angular momentum, its log against its forward
+files, and Simulation.run against a one-member Ensemble.
+
+"""
+
+import os
+import filecmp
+import numpy as np
+import pytest
+
+from vplCases import reference_dir, copyCase, runCase, forwardFiles
+from vplIntegrator import Ensemble
+from vplLog import parseLog
+
+
+@pytest.mark.parametrize("name", ["CPL5", "CTL10"])
+def test_matches_reference(tmp_path, name):
+    assert runCase(name, str(tmp_path / name))
+
+    expected = forwardFiles(os.path.join(reference_dir, name))
+    assert forwardFiles(str(tmp_path / name)) == expected
+    for forward in expected:
+        np.testing.assert_allclose(np.loadtxt(str(tmp_path / name / forward)),
+                                   np.loadtxt(os.path.join(reference_dir, name, forward)),
+                                   rtol=1.0e-5, atol=1.0e-30)
+# end function
+
+
+@pytest.mark.parametrize("src", ["CPLTestMatt/5", "CTLTestMatt/10"])
+def test_angular_momentum_conserved(tmp_path, src):
+    sim = copyCase(src, str(tmp_path / "sim"))
+    for body in sim.bodies:
+        body.braking = "none"
+    assert sim.run()
+
+    log = parseLog(str(tmp_path / "sim" / "bintides.log"), keys=["TotAngMom"],
+                   bodies=["system"])
+    initial = log["INITIAL"]["system"]["TotAngMom"]
+    final = log["FINAL"]["system"]["TotAngMom"]
+    assert abs(final/initial - 1.0) < 1.0e-4
+# end function
+
+
+@pytest.mark.parametrize("src", ["CPLTestMatt/5", "CTLTestMatt/10"])
+def test_log_matches_forward(tmp_path, src):
+    sim = copyCase(src, str(tmp_path / "sim"))
+    assert sim.run()
+
+    # The log is in SI, the forward files in each column's output units
+    log = parseLog(str(tmp_path / "sim" / "bintides.log"))["FINAL"]
+    for body, columns in zip(sim.bodies, sim.columns):
+        last = np.loadtxt(str(tmp_path / "sim" / ("bintides.%s.forward" % body.name)))[-1]
+        for (name, unit), value in zip(columns, last):
+            section = "system" if name in ("TotEn", "TotAngMom") else body.name
+            if name in log[section]:
+                np.testing.assert_allclose(value*unit, log[section][name], rtol=1.0e-5,
+                                           atol=1.0e-6, err_msg="%s %s" % (body.name, name))
+# end function
+
+
+@pytest.mark.parametrize("src", ["CPLTestMatt/5", "CTLTestMatt/10"])
+def test_run_matches_ensemble(tmp_path, src):
+    assert copyCase(src, str(tmp_path / "run")).run()
+    assert Ensemble([copyCase(src, str(tmp_path / "ensemble"))]).run() == [True]
+
+    names = sorted(os.listdir(str(tmp_path / "run")))
+    assert names == sorted(os.listdir(str(tmp_path / "ensemble")))
+    match, mismatch, errors = filecmp.cmpfiles(str(tmp_path / "run"), str(tmp_path / "ensemble"),
+                                               names, shallow=False)
+    assert mismatch == [] and errors == []
+# end function
@@ -0,0 +1,89 @@
+"""
+
+@author: David P. Fleming, University of Washington, Seattle
+@email: dflemin3 (at) uw (dot) edu
+
+Shortened copies of the Sims/ binaries for the vplIntegrator.py tests, and
+the stored forward files they're checked against.  Each reference case is a
+Sims/ directory evolved for stopTime [yr] with outputs every outputTime [yr]
+and dEta eta, optionally with dMaxLockDiff 0 (nolock) and stiff steps.
+
+Running this file regenerates the stored references, e.g. after a deliberate
+change to the integrator:
+    python vplCases.py
+
+"""
+
+import os
+import sys
+import shutil
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "Scripts"))
+from vplIntegrator import Simulation, Ensemble, YEARSEC
+
+sims_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "Sims")
+reference_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data", "vplIntegrator")
+
+# Reference case: (Sims/ directory, stopTime [yr], outputTime [yr], dEta,
+# nolock, stiff)
+reference_cases = {"CPL5" : ("CPLTestMatt/5", 3.0e8, 1.0e7, 0.01, False, False),
+                   "CTL10" : ("CTLTestMatt/10", 3.0e8, 1.0e7, 0.01, False, False),
+                   "CTL5NoLock" : ("CTLTestMatt/5", 3.0e8, 1.0e7, 0.01, True, False),
+                   "CTL5NoLockFine" : ("CTLTestMatt/5", 3.0e8, 1.0e7, 1.0e-4, True, False)}
+
+
+def copyCase(src, dst, stopTime=3.0e8, outputTime=1.0e7, eta=0.01, nolock=False):
+    """
+    Copy Sims/src to dst and read it as a Simulation evolved for stopTime [yr]
+    with outputs every outputTime [yr]
+    """
+
+    shutil.copytree(os.path.join(sims_dir, src), dst)
+    sim = Simulation(os.path.join(dst, "vpl.in"))
+    sim.stopTime = stopTime*YEARSEC
+    sim.outputTime = outputTime*YEARSEC
+    sim.eta = eta
+    if nolock:
+        sim.maxLockDiff[:] = 0.0
+
+    return sim
+# end function
+
+
+def runCase(name, dst):
+    """
+    Evolve reference case name in dst, returning whether it finished
+    """
+
+    src, stopTime, outputTime, eta, nolock, stiff = reference_cases[name]
+    sim = copyCase(src, dst, stopTime, outputTime, eta, nolock)
+
+    return Ensemble([sim], stiff=stiff).run()[0]
+# end function
+
+
+def forwardFiles(directory):
+    """
+    Names of the forward files in directory
+    """
+
+    return sorted(name for name in os.listdir(directory) if name.endswith(".forward"))
+# end function
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    scratch = tempfile.mkdtemp(prefix="vplCases")
+    try:
+        for name in reference_cases:
+            runCase(name, os.path.join(scratch, name))
+            dst = os.path.join(reference_dir, name)
+            if not os.path.isdir(dst):
+                os.makedirs(dst)
+            for forward in forwardFiles(os.path.join(scratch, name)):
+                shutil.copyfile(os.path.join(scratch, name, forward), os.path.join(dst, forward))
+            print("Wrote %s" % dst)
+    finally:
+        shutil.rmtree(scratch)